@@ -1,55 +1,63 @@
-# FastAPI dependencies: DB session, current user from JWT
+# FastAPI dependencies: DB session, current user (or just its id) from JWT, admin key
+import secrets
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer, APIKeyHeader
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.database import get_db
-from app.core.security import decode_access_token
 from app.models import User
+from app.services.users import resolve_user_id
 
 http_bearer = HTTPBearer(auto_error=False)
 optional_api_key = APIKeyHeader(name="x-user-api-key", auto_error=False)
+admin_api_key = APIKeyHeader(name="x-admin-key", auto_error=False)
 
 
-async def get_current_user_optional(
+def _bearer_token(
+    credentials: HTTPAuthorizationCredentials | None,
+    api_key: str | None,
+) -> str | None:
+    if credentials and credentials.credentials:
+        return credentials.credentials
+    return api_key or None
+
+
+async def get_current_user_id_optional(
     db: AsyncSession = Depends(get_db),
     credentials: HTTPAuthorizationCredentials | None = Depends(http_bearer),
     api_key: str | None = Depends(optional_api_key),
-) -> User | None:
-    """Resolve user from JWT or x-user-api-key (treat api_key as token). Returns None if no auth."""
-    token = None
-    if credentials and credentials.credentials:
-        token = credentials.credentials
-    elif api_key:
-        token = api_key
+) -> UUID | None:
+    """User id from JWT or x-user-api-key without loading the User row. None if no auth."""
+    token = _bearer_token(credentials, api_key)
     if not token:
         return None
-    payload = decode_access_token(token)
-    if not payload:
-        return None
-    
-    # Sync user from token to DB
-    # We trust the email from the token because it's signed by our shared secret (via NextAuth)
-    result = await db.execute(select(User).where(User.email == payload.email))
-    user = result.scalar_one_or_none()
+    return await resolve_user_id(db, token)
+
 
-    if not user:
-        # Create new user
-        user = User(
-            email=payload.email,
-            # full_name and picture might not be in the minimal payload, 
-            # but usually NextAuth JWT has name/picture. 
-            # We'd need to update TokenPayloadSchema to include them to extract them here.
-            # For now, create with email.
+async def get_current_user_id(
+    user_id: UUID | None = Depends(get_current_user_id_optional),
+) -> UUID:
+    """Require authentication for routes that only need the user id; raise 401 if missing."""
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
         )
-        db.add(user)
-        await db.commit()
-        await db.refresh(user)
-    
-    return user
+    return user_id
+
+
+async def get_current_user_optional(
+    db: AsyncSession = Depends(get_db),
+    user_id: UUID | None = Depends(get_current_user_id_optional),
+) -> User | None:
+    """Resolve user from JWT or x-user-api-key (treat api_key as token). Returns None if no auth."""
+    if user_id is None:
+        return None
+    return await db.get(User, user_id)
 
 
 async def get_current_user(
@@ -63,3 +71,12 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     return user
+
+
+async def require_admin(key: str | None = Depends(admin_api_key)) -> None:
+    """Require x-admin-key to match ADMIN_API_KEY; admin endpoints are off when it is unset."""
+    if not settings.admin_api_key or not key or not secrets.compare_digest(key, settings.admin_api_key):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
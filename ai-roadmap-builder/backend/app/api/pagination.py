@@ -0,0 +1,22 @@
+# Opaque keyset cursors for paginated list endpoints
+import base64
+from typing import Any
+
+import orjson
+from fastapi import HTTPException, status
+
+
+def encode_cursor(*values: Any) -> str:
+    """Pack the sort key of the last returned row (datetimes/UUIDs become strings)."""
+    return base64.urlsafe_b64encode(orjson.dumps(values)).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list[Any]:
+    """Unpack a cursor from encode_cursor; 400 if it is malformed or has the wrong arity."""
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, orjson.JSONDecodeError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
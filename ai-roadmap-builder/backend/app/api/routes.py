@@ -1,29 +1,61 @@
-# FastAPI route definitions: auth, roadmaps, generate (SSE)
+# FastAPI route definitions: auth, roadmaps, generate (SSE), admin
+import asyncio
+import hashlib
+import logging
+import tempfile
+import time
 import uuid
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from fastapi.responses import StreamingResponse
-from sqlalchemy import select
+from sqlalchemy import Row, Text, cast, func, insert, literal, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, get_current_user_optional
+from app.api.conditional import is_not_modified, not_modified, set_validators
+from app.api.deps import get_current_user_id, get_current_user_id_optional, require_admin
+from app.api.pagination import decode_cursor, encode_cursor
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.database import get_db, async_session_factory
+from app.core.metrics import registry
 from app.core.security import create_access_token
-from app.models import Roadmap, User
+from app.models import ConceptPrerequisite, Roadmap, RoadmapNode
 from app.schemas.auth import LoginRequestSchema, TokenResponseSchema
+from app.schemas.concept import ConceptCountSchema
 from app.schemas.roadmap import (
     GenerateRequestSchema,
     RoadmapCreateSchema,
     RoadmapFullSchema,
+    RoadmapGraphPatchSchema,
+    RoadmapLayoutSchema,
     RoadmapListItemSchema,
+    RoadmapSearchResultSchema,
     RoadmapUpdateSchema,
+    RoadmapVersionSchema,
 )
-from app.services.orchestrator import generate_roadmap_stream
-from app.services.sse import sse_event
+from app.services.admission import AdmissionRejected, Ticket, admission
+from app.services.concepts import concept_key, drop_roadmap_concepts, sync_roadmap_concepts
+from app.services.generation_log import GenerationLog, generation_logs, parse_event_id
+from app.services.graph_ops import changes_concepts, changes_text, graph_update_values
+from app.services.ingest import FORMATS as INGEST_FORMATS, get_ingest_job, start_ingest_job
+from app.services.layout import StreamingLayout, layered_layout, place_nodes
+from app.services.llm import LLMError
+from app.services.orchestrator import generate_stage_seconds, stream_roadmap
+from app.services.roadmap_search import hybrid_search, schedule_embedding_refresh
+from app.services.sse import StreamEvent, json_array, sse_event
+from app.services.users import get_or_create_user_id
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+MAX_PAGE_SIZE = 500
+
 
 # --- Auth ---
 @router.post("/auth/login", response_model=TokenResponseSchema)
@@ -32,92 +64,265 @@ async def login(
     db: AsyncSession = Depends(get_db),
 ) -> TokenResponseSchema:
     """Issue JWT for the given email. Creates user if not exists."""
-    result = await db.execute(select(User).where(User.email == body.email))
-    user = result.scalar_one_or_none()
-    if user is None:
-        user = User(email=body.email)
-        db.add(user)
-        await db.flush()
-    token = create_access_token(str(user.id), user.email)
+    user_id = await get_or_create_user_id(db, body.email)
+    token = create_access_token(str(user_id), body.email)
     return TokenResponseSchema(access_token=token)
 
 
 # --- Roadmaps (authenticated) ---
 @router.get("/roadmaps", response_model=list[RoadmapListItemSchema])
 async def list_roadmaps(
+    request: Request,
+    response: Response,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; omit for all"),
+    cursor: str | None = Query(None, description="X-Next-Cursor from the previous page"),
+    include_total: bool = Query(False, description="Also send X-Total-Count"),
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
-) -> list[RoadmapListItemSchema]:
-    """Fetch all roadmap titles and IDs for the authenticated user."""
-    result = await db.execute(
-        select(Roadmap).where(Roadmap.user_id == user.id).order_by(Roadmap.created_at.desc())
+    user_id: uuid.UUID = Depends(get_current_user_id),
+) -> list[RoadmapListItemSchema] | Response:
+    """Fetch roadmap titles and IDs for the authenticated user, newest first.
+
+    Only the listed columns are selected (nodes/edges JSONB is never read). Pages are keyset
+    on (created_at, id) via ix_roadmaps_user_list; when more rows exist the cursor for the
+    next page is sent in X-Next-Cursor. The ETag is derived from the page's own rows (read
+    from the index alone), so no extra query runs for it; a matching If-None-Match gets a 304.
+    """
+    stmt = (
+        select(Roadmap.id, Roadmap.title, Roadmap.created_at, Roadmap.updated_at)
+        .where(Roadmap.user_id == user_id)
+        .order_by(Roadmap.created_at.desc(), Roadmap.id.desc())
     )
-    roadmaps = result.scalars().all()
+    if cursor:
+        created_at, last_id = decode_cursor(cursor, 2)
+        try:
+            key = (datetime.fromisoformat(created_at), uuid.UUID(last_id))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        stmt = stmt.where(tuple_(Roadmap.created_at, Roadmap.id) < key)
+    if limit is not None:
+        stmt = stmt.limit(limit + 1)
+
+    rows = (await db.execute(stmt)).all()
+    total = None
+    if include_total:
+        total = await db.scalar(select(func.count()).where(Roadmap.user_id == user_id))
+    # Edits advance a row's updated_at; creates and deletes change the ids on the page (or
+    # whether a next page exists, via the extra row fetched past `limit`)
+    etag = _list_etag(rows, total, request.url.query)
+    changed = max((r.updated_at for r in rows if r.updated_at), default=None)
+    # A delete doesn't advance max(updated_at), so only the ETag is honoured here
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_validators(response, etag, changed)
+
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
     return [
         RoadmapListItemSchema(
             id=str(r.id),
             title=r.title,
             created_at=r.created_at.isoformat() if r.created_at else "",
         )
-        for r in roadmaps
+        for r in rows
     ]
 
 
-@router.get("/roadmaps/{roadmap_id}", response_model=RoadmapFullSchema)
-async def get_roadmap(
-    roadmap_id: uuid.UUID,
+def _list_etag(rows: Sequence[Row], total: int | None, query: str) -> str:
+    digest = hashlib.sha256(f"{total}\x1f{query}".encode("utf-8"))
+    for r in rows:
+        stamp = r.updated_at.isoformat() if r.updated_at else ""
+        digest.update(f"\x1e{r.id}\x1f{stamp}".encode("utf-8"))
+    return f'W/"{digest.hexdigest()[:24]}"'
+
+
+def _roadmap_etag(version: int) -> str:
+    return f'W/"v{version}"'
+
+
+@router.get("/roadmaps/search", response_model=list[RoadmapSearchResultSchema])
+async def search_roadmaps(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="X-Next-Cursor from the previous page"),
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
-) -> RoadmapFullSchema:
-    """Fetch full roadmap (nodes/edges) for a specific id. Must belong to user."""
-    result = await db.execute(
-        select(Roadmap).where(
-            Roadmap.id == roadmap_id,
-            Roadmap.user_id == user.id,
+    user_id: uuid.UUID = Depends(get_current_user_id),
+) -> list[RoadmapSearchResultSchema]:
+    """Search the user's roadmaps by title, query and node text, best match first.
+
+    Full-text rank (title, query, node labels and descriptions) and embedding similarity are
+    fused with reciprocal rank fusion; pages are keyset on (score, id) via X-Next-Cursor.
+    """
+    after = None
+    if cursor:
+        score, last_id = decode_cursor(cursor, 2)
+        try:
+            after = (float(score), uuid.UUID(last_id))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    hits = await hybrid_search(db, user_id, q, limit + 1, after)
+    if len(hits) > limit:
+        hits = hits[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(hits[-1].score, hits[-1].id)
+    return [
+        RoadmapSearchResultSchema(
+            id=str(h.id),
+            title=h.title,
+            created_at=h.created_at.isoformat() if h.created_at else "",
+            score=h.score,
         )
-    )
-    roadmap = result.scalar_one_or_none()
-    if not roadmap:
+        for h in hits
+    ]
+
+
+# The RoadmapFullSchema document rendered by Postgres as JSON text: nodes/edges are copied
+# from JSONB into the response bytes without being decoded or re-encoded in Python
+_ROADMAP_DOCUMENT = cast(
+    func.jsonb_build_object(
+        literal("id", Text), cast(Roadmap.id, Text),
+        literal("title", Text), Roadmap.title,
+        literal("topic_query", Text), Roadmap.topic_query,
+        literal("nodes", Text), Roadmap.nodes,
+        literal("edges", Text), Roadmap.edges,
+        literal("created_at", Text), func.coalesce(
+            func.to_char(func.timezone("UTC", Roadmap.created_at), 'YYYY-MM-DD"T"HH24:MI:SS.US"+00:00"'), ""
+        ),
+        literal("version", Text), Roadmap.version,
+    ),
+    Text,
+)
+
+
+async def _roadmap_response(db: AsyncSession, roadmap_id: uuid.UUID, user_id: uuid.UUID) -> Response:
+    """Stored roadmap as a raw JSON response (same shape as RoadmapFullSchema) with validators."""
+    row = (
+        await db.execute(
+            select(_ROADMAP_DOCUMENT, Roadmap.version, Roadmap.updated_at).where(
+                Roadmap.id == roadmap_id,
+                Roadmap.user_id == user_id,
+            )
+        )
+    ).one_or_none()
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Roadmap not found",
         )
-    return RoadmapFullSchema(
-        id=str(roadmap.id),
-        title=roadmap.title,
-        topic_query=roadmap.topic_query,
-        nodes=roadmap.nodes or [],
-        edges=roadmap.edges or [],
-        created_at=roadmap.created_at.isoformat() if roadmap.created_at else "",
-    )
+    response = Response(content=row[0], media_type="application/json")
+    set_validators(response, _roadmap_etag(row.version), row.updated_at)
+    return response
+
+
+@router.get("/roadmaps/{roadmap_id}", response_model=RoadmapFullSchema)
+async def get_roadmap(
+    roadmap_id: uuid.UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    user_id: uuid.UUID = Depends(get_current_user_id),
+) -> Response:
+    """Fetch full roadmap (nodes/edges) for a specific id. Must belong to user.
+
+    Sends ETag (from `version`) and Last-Modified. Conditional requests are first checked
+    against ix_roadmaps_validators, so a 304 never loads or serializes the JSONB.
+    """
+    if "if-none-match" in request.headers or "if-modified-since" in request.headers:
+        validators = (
+            await db.execute(
+                select(Roadmap.version, Roadmap.updated_at).where(
+                    Roadmap.id == roadmap_id,
+                    Roadmap.user_id == user_id,
+                )
+            )
+        ).one_or_none()
+        if validators is not None:
+            etag = _roadmap_etag(validators.version)
+            if is_not_modified(request, etag, validators.updated_at):
+                return not_modified(etag, validators.updated_at)
+    return await _roadmap_response(db, roadmap_id, user_id)
+
+
+# Saves bump the version, so a cached layout never goes stale; it just stops being asked for
+_layouts: TTLCache[tuple[uuid.UUID, int], RoadmapLayoutSchema] = TTLCache(
+    maxsize=settings.layout_cache_max_entries
+)
+_LAYOUT_GRAPH = (
+    text("ARRAY(SELECT e->>'id' FROM jsonb_array_elements(roadmaps.nodes) AS e)"),
+    text("ARRAY(SELECT e->>'source' FROM jsonb_array_elements(roadmaps.edges) AS e)"),
+    text("ARRAY(SELECT e->>'target' FROM jsonb_array_elements(roadmaps.edges) AS e)"),
+)
+
+
+@router.get("/roadmaps/{roadmap_id}/layout", response_model=RoadmapLayoutSchema)
+async def get_roadmap_layout(
+    roadmap_id: uuid.UUID,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    user_id: uuid.UUID = Depends(get_current_user_id),
+) -> RoadmapLayoutSchema | Response:
+    """Layered layout of a saved roadmap (positions by node id), computed once per version.
+
+    Only node ids and edge endpoints are read from the JSONB; validators match the roadmap's.
+    """
+    owned = (Roadmap.id == roadmap_id, Roadmap.user_id == user_id)
+    validators = (
+        await db.execute(select(Roadmap.version, Roadmap.updated_at).where(*owned))
+    ).one_or_none()
+    if validators is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Roadmap not found")
+    etag = _roadmap_etag(validators.version)
+    if is_not_modified(request, etag, validators.updated_at):
+        return not_modified(etag, validators.updated_at)
+    layout = _layouts.get((roadmap_id, validators.version))
+    if layout is None:
+        # The graph is read with its own version, so a save landing in between can't get the
+        # new graph cached (or served) under the old version
+        row = (
+            await db.execute(select(Roadmap.version, Roadmap.updated_at, *_LAYOUT_GRAPH).where(*owned))
+        ).one_or_none()
+        if row is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Roadmap not found")
+        validators, (node_ids, sources, targets) = row, row[2:]
+        etag = _roadmap_etag(validators.version)
+        edges = [(s, t) for s, t in zip(sources, targets) if s is not None and t is not None]
+        # Large graphs take a while; keep the event loop free
+        positions = await anyio.to_thread.run_sync(
+            layered_layout, [i for i in node_ids if i is not None], edges
+        )
+        layout = RoadmapLayoutSchema(
+            version=validators.version,
+            positions={i: {"x": x, "y": y} for i, (x, y) in positions.items()},
+        )
+        _layouts.set((roadmap_id, validators.version), layout)
+    set_validators(response, etag, validators.updated_at)
+    return layout
 
 
 @router.post("/roadmaps", response_model=RoadmapFullSchema)
 async def create_roadmap(
     body: RoadmapCreateSchema,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
-) -> RoadmapFullSchema:
+    user_id: uuid.UUID = Depends(get_current_user_id),
+) -> Response:
     """Create a new roadmap manually (e.g. saving an anonymous generation)."""
     roadmap = Roadmap(
-        user_id=user.id,
+        id=uuid.uuid4(),
+        user_id=user_id,
         title=body.title,
         topic_query=body.topic_query,
         nodes=body.nodes,
         edges=body.edges,
     )
     db.add(roadmap)
+    await db.flush()
+    await sync_roadmap_concepts(db, [roadmap.id])
     await db.commit()
-    await db.refresh(roadmap)
-
-    return RoadmapFullSchema(
-        id=str(roadmap.id),
-        title=roadmap.title,
-        topic_query=roadmap.topic_query,
-        nodes=roadmap.nodes or [],
-        edges=roadmap.edges or [],
-        created_at=roadmap.created_at.isoformat() if roadmap.created_at else "",
-    )
+    schedule_embedding_refresh(roadmap.id)
+    return await _roadmap_response(db, roadmap.id, user_id)
 
 
 @router.patch("/roadmaps/{roadmap_id}", response_model=RoadmapFullSchema)
@@ -125,14 +330,14 @@ async def update_roadmap(
     roadmap_id: uuid.UUID,
     body: RoadmapUpdateSchema,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
-) -> RoadmapFullSchema:
+    user_id: uuid.UUID = Depends(get_current_user_id),
+) -> Response:
     """Update roadmap title, nodes, or edges. Must belong to user."""
     result = await db.execute(
         select(Roadmap).where(
             Roadmap.id == roadmap_id,
-            Roadmap.user_id == user.id,
-        )
+            Roadmap.user_id == user_id,
+        ).with_for_update()
     )
     roadmap = result.scalar_one_or_none()
     if not roadmap:
@@ -140,6 +345,8 @@ async def update_roadmap(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Roadmap not found",
         )
+    if body.version is not None and body.version != roadmap.version:
+        raise _version_conflict(roadmap.version)
 
     if body.title is not None:
         roadmap.title = body.title
@@ -147,18 +354,64 @@ async def update_roadmap(
         roadmap.nodes = body.nodes
     if body.edges is not None:
         roadmap.edges = body.edges
+    roadmap.version += 1
 
     db.add(roadmap)
+    if body.nodes is not None or body.edges is not None:
+        await db.flush()
+        await sync_roadmap_concepts(db, [roadmap_id])
     await db.commit()
-    await db.refresh(roadmap)
-
-    return RoadmapFullSchema(
-        id=str(roadmap.id),
-        title=roadmap.title,
-        topic_query=roadmap.topic_query,
-        nodes=roadmap.nodes or [],
-        edges=roadmap.edges or [],
-        created_at=roadmap.created_at.isoformat() if roadmap.created_at else "",
+    if body.title is not None or body.nodes is not None:
+        schedule_embedding_refresh(roadmap_id)
+    return await _roadmap_response(db, roadmap_id, user_id)
+
+
+@router.patch("/roadmaps/{roadmap_id}/graph", response_model=RoadmapVersionSchema)
+async def patch_roadmap_graph(
+    roadmap_id: uuid.UUID,
+    body: RoadmapGraphPatchSchema,
+    db: AsyncSession = Depends(get_db),
+    user_id: uuid.UUID = Depends(get_current_user_id),
+) -> RoadmapVersionSchema:
+    """Apply node/edge ops (see GraphOpSchema) in the database without resending the roadmap.
+
+    The whole batch is one UPDATE guarded by `version`, so it applies atomically or not at
+    all; only the new version is returned. 409 (with the current version) on a stale version.
+    """
+    values: dict[str, Any] = graph_update_values(body.ops)
+    if body.title is not None:
+        values["title"] = body.title
+    stmt = (
+        update(Roadmap)
+        .where(Roadmap.id == roadmap_id, Roadmap.user_id == user_id)
+        .values(version=Roadmap.version + 1, **values)
+        .returning(Roadmap.version)
+    )
+    if body.version is not None:
+        stmt = stmt.where(Roadmap.version == body.version)
+    version = (await db.execute(stmt)).scalar_one_or_none()
+    if version is None:
+        current = await db.scalar(
+            select(Roadmap.version).where(Roadmap.id == roadmap_id, Roadmap.user_id == user_id)
+        )
+        if current is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Roadmap not found",
+            )
+        raise _version_conflict(current)
+    if changes_concepts(body.ops):
+        await sync_roadmap_concepts(db, [roadmap_id])
+    await db.commit()
+    if body.title is not None or changes_text(body.ops):
+        schedule_embedding_refresh(roadmap_id)
+    return RoadmapVersionSchema(id=str(roadmap_id), version=version)
+
+
+def _version_conflict(current: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={"message": "Roadmap was modified by another editor", "version": current},
     )
 
 
@@ -166,13 +419,13 @@ async def update_roadmap(
 async def delete_roadmap(
     roadmap_id: uuid.UUID,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user_id: uuid.UUID = Depends(get_current_user_id),
 ) -> None:
     """Delete a roadmap. Must belong to user."""
     result = await db.execute(
         select(Roadmap).where(
             Roadmap.id == roadmap_id,
-            Roadmap.user_id == user.id,
+            Roadmap.user_id == user_id,
         )
     )
     roadmap = result.scalar_one_or_none()
@@ -182,61 +435,393 @@ async def delete_roadmap(
             detail="Roadmap not found",
         )
 
+    await drop_roadmap_concepts(db, [roadmap_id])
     await db.delete(roadmap)
     await db.commit()
 
 
-# --- Generate (SSE); optional auth (if present, save roadmap when stream ends) ---
-async def _stream_and_optionally_save(
-    query: str,
-    db: AsyncSession,
-    user: User | None,
-) -> Any:
-    collected_nodes: list[dict[str, Any]] = []
-    collected_edges: list[dict[str, Any]] = []
-    async for event in generate_roadmap_stream(query, db):
-        if event.get("type") == "concept":
-            collected_nodes.append(event)
-        elif event.get("type") == "edge":
-            collected_edges.append(
-                {
-                    "id": event.get("id"),
-                    "source": event.get("source"),
-                    "target": event.get("target"),
-                    "source_handle": event.get("source_handle"),
-                    "target_handle": event.get("target_handle"),
-                }
+# --- Concepts (normalized across roadmaps, see app/services/concepts.py) ---
+@router.get("/concepts/roadmaps", response_model=list[RoadmapListItemSchema])
+async def roadmaps_with_concept(
+    label: str = Query(..., min_length=1, max_length=512),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+    user_id: uuid.UUID = Depends(get_current_user_id),
+) -> list[RoadmapListItemSchema]:
+    """The user's roadmaps containing a concept (matched on normalized label), newest first."""
+    containing = select(RoadmapNode.roadmap_id).where(
+        RoadmapNode.user_id == user_id,
+        RoadmapNode.label_key == concept_key(label),
+    )
+    rows = (
+        await db.execute(
+            select(Roadmap.id, Roadmap.title, Roadmap.created_at)
+            .where(Roadmap.id.in_(containing))
+            .order_by(Roadmap.created_at.desc(), Roadmap.id.desc())
+            .limit(limit)
+        )
+    ).all()
+    return [
+        RoadmapListItemSchema(
+            id=str(r.id),
+            title=r.title,
+            created_at=r.created_at.isoformat() if r.created_at else "",
+        )
+        for r in rows
+    ]
+
+
+@router.get("/concepts/prerequisites", response_model=list[ConceptCountSchema])
+async def concept_prerequisites(
+    label: str = Query(..., min_length=1, max_length=512),
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    _: uuid.UUID = Depends(get_current_user_id),
+) -> list[ConceptCountSchema]:
+    """Concepts most often placed directly before this one, counted over all roadmaps.
+
+    Reads the top of ix_concept_prerequisites_rank, so cost does not grow with the table.
+    """
+    rows = (
+        await db.execute(
+            select(ConceptPrerequisite.source_label, ConceptPrerequisite.source_key, ConceptPrerequisite.edge_count)
+            .where(
+                ConceptPrerequisite.target_key == concept_key(label),
+                ConceptPrerequisite.edge_count > 0,
             )
-        yield sse_event(event)
-    if user and collected_nodes:
+            .order_by(ConceptPrerequisite.edge_count.desc())
+            .limit(limit)
+        )
+    ).all()
+    return [ConceptCountSchema(label=r.source_label, key=r.source_key, count=r.edge_count) for r in rows]
+
+
+# --- Generate (SSE); optional auth (if present, save roadmap as it streams) ---
+client_disconnects = registry.counter(
+    "generate_client_disconnects_total",
+    "Generations whose clients all left and did not reconnect in time, by policy (cancel, continue, queued)",
+)
+
+# Running generations and pending reaps (strong refs until done)
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _spawn(coro: Any) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+def _collect(event: StreamEvent, nodes: list[bytes], edges: list[bytes]) -> None:
+    # Keep the encoded records; the save splices them into JSON arrays without decoding
+    if event.type == "concept":
+        nodes.append(event.record)
+    elif event.type == "edge":
+        edges.append(event.record)
+
+
+async def _save_generated_roadmap(
+    query: str,
+    user_id: uuid.UUID,
+    nodes: list[bytes],
+    edges: list[bytes],
+    saved: tuple[uuid.UUID, int] | None = None,
+) -> tuple[uuid.UUID, int] | None:
+    """Insert the generated roadmap, or overwrite the graph of its last checkpoint.
+
+    Returns (id, version); None if the checkpointed row was edited or deleted meanwhile
+    (the user's change wins and the generation stops saving).
+    """
+    graph = {
+        "nodes": cast(literal(json_array(nodes), Text), JSONB),
+        "edges": cast(literal(json_array(edges), Text), JSONB),
+    }
+    if saved is None:
+        roadmap_id, version = uuid.uuid4(), 1
         title = query[:200].strip() or "Untitled Roadmap"
-        roadmap = Roadmap(
-            user_id=user.id,
-            title=title,
-            topic_query=query,
-            nodes=collected_nodes,
-            edges=collected_edges,
+        stmt = insert(Roadmap).values(
+            id=roadmap_id, user_id=user_id, title=title, topic_query=query, version=version, **graph
+        )
+    else:
+        roadmap_id, version = saved[0], saved[1] + 1
+        stmt = (
+            update(Roadmap)
+            .where(Roadmap.id == roadmap_id, Roadmap.version == saved[1])
+            .values(version=version, **graph)
         )
+    with generate_stage_seconds.time(stage="save"):
         async with async_session_factory() as save_session:
-            save_session.add(roadmap)
+            if (await save_session.execute(stmt)).rowcount == 0:
+                return None
+            await sync_roadmap_concepts(save_session, [roadmap_id])
             await save_session.commit()
-            await save_session.refresh(roadmap)
-            yield sse_event({"type": "meta", "id": str(roadmap.id)})
+    return roadmap_id, version
+
+
+async def _run_generation(
+    log: GenerationLog,
+    query: str,
+    user_id: uuid.UUID | None,
+    ticket: Ticket,
+) -> None:
+    """Stream one generation into its log, independently of the clients following it.
+
+    Nodes are laid out as they arrive ("position" events) and once more over the whole
+    graph at the end. Signed-in users' roadmaps are saved at the first checkpoint and
+    updated at later ones and at the end, so a generation that dies midway still leaves its
+    partial roadmap; the log is spilled to Postgres at the same points.
+    """
+    nodes: list[bytes] = []
+    edges: list[bytes] = []
+    layout = StreamingLayout()
+    saved: tuple[uuid.UUID, int] | None = None
+    saving = user_id is not None
+    dirty = False  # collected or moved something since the last save
+    interval = settings.generate_checkpoint_seconds
+
+    async def checkpoint() -> None:
+        nonlocal saved, saving, dirty
+        if saving and nodes and dirty:
+            first = saved is None
+            try:
+                result = await _save_generated_roadmap(
+                    query, user_id, place_nodes(nodes, layout.positions), edges, saved
+                )
+            except Exception:
+                # Keep streaming; the next checkpoint retries with everything collected so far
+                logger.warning("Saving generated roadmap failed", exc_info=True)
+                return
+            saved, saving, dirty = result, result is not None, False
+            if first and saved is not None:
+                log.append(sse_event({"type": "meta", "id": str(saved[0])}))
+
+    try:
+        # Identical in-flight queries share one LLM stream; each generation still saves its own copy
+        events = stream_roadmap(query)
+        due = time.monotonic() + interval
+        try:
+            async for event in events:
+                _collect(event, nodes, edges)
+                log.append(event.frame)
+                moved = layout.feed(event)
+                if moved is not None:
+                    log.append(moved)
+                dirty = True
+                if interval > 0 and time.monotonic() >= due:
+                    await checkpoint()
+                    await generation_logs.spill(log)
+                    due = time.monotonic() + interval
+        except LLMError as e:
+            # Surface provider failures to the client; whatever streamed so far is still saved
+            log.append(sse_event({"type": "error", "message": str(e)}))
+        finally:
+            # The generation keeps its admission slot until it is really done
+            admission.release(ticket)
+            # Unsubscribes from the single-flight; the upstream stops once nobody is listening
+            await events.aclose()
+        # The full layout pass is CPU-bound and grows with the graph; keep the event loop free
+        moved = await anyio.to_thread.run_sync(layout.finish)
+        if moved is not None:
+            log.append(moved)
+            dirty = True
+        await checkpoint()
+        if saved is not None:
+            schedule_embedding_refresh(saved[0])
+    finally:
+        await generation_logs.finish(log)
+
+
+async def _reap_if_abandoned(log: GenerationLog) -> None:
+    """Apply the disconnect policy if no client has come back within the grace period."""
+    await asyncio.sleep(settings.generate_resume_grace_seconds)
+    if log.subscribers or log.done or log.task is None:
+        return
+    keep = log.user_id is not None and settings.generate_save_on_disconnect
+    client_disconnects.inc(policy="continue" if keep else "cancel")
+    if not keep:
+        log.task.cancel()
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    # The JSON body is already consumed, so the next ASGI message is the disconnect
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def _follow_generation(
+    log: GenerationLog,
+    after: int,
+    request: Request,
+    disconnected: asyncio.Task | None = None,
+) -> Any:
+    """Send the log's frames after `after`, then its live tail, until it ends or the client leaves."""
+    if disconnected is None:
+        disconnected = asyncio.create_task(_wait_for_disconnect(request))
+    frames = log.follow(after)
+    step: asyncio.Future | None = None
+    log.subscribers += 1
+    try:
+        while True:
+            step = asyncio.ensure_future(frames.__anext__())
+            await asyncio.wait((step, disconnected), return_when=asyncio.FIRST_COMPLETED)
+            if not step.done():
+                return
+            try:
+                frame = step.result()
+            except StopAsyncIteration:
+                return
+            finally:
+                step = None
+            yield frame
+    finally:
+        log.subscribers -= 1
+        disconnected.cancel()
+        if step is not None:
+            step.cancel()
+            await asyncio.wait((step,))
+        await frames.aclose()
+        if not log.subscribers and not log.done and log.task is not None:
+            _spawn(_reap_if_abandoned(log))
+
+
+async def _stream_and_optionally_save(
+    query: str,
+    user_id: uuid.UUID | None,
+    request: Request,
+    ticket: Ticket,
+) -> Any:
+    disconnected = asyncio.create_task(_wait_for_disconnect(request))
+    ticket.claimed = True
+    admitted = False
+    try:
+        # Over capacity: hold the connection open and report the queue position until admitted
+        position = admission.position(ticket)
+        reported = 0
+        while position:
+            if position != reported:
+                yield sse_event({"type": "queue", "position": position})
+                reported = position
+            moved = asyncio.ensure_future(admission.next_position(ticket, position))
+            await asyncio.wait((moved, disconnected), return_when=asyncio.FIRST_COMPLETED)
+            if not moved.done():
+                moved.cancel()
+                client_disconnects.inc(policy="queued")
+                return
+            position = moved.result()
+        admitted = True
+    finally:
+        if not admitted:
+            admission.release(ticket)
+            disconnected.cancel()
+
+    # The generation runs as its own task (which now owns the admission slot) so a client
+    # that drops can reconnect with Last-Event-ID; the first frame already carries an id
+    log = generation_logs.create(user_id)
+    log.append(sse_event({"type": "generation", "id": log.id}))
+    log.task = _spawn(_run_generation(log, query, user_id, ticket))
+    async for frame in _follow_generation(log, 0, request, disconnected):
+        yield frame
+
+
+class _AdmittedStreamingResponse(StreamingResponse):
+    """Frees the admission slot if the client is gone before the body generator ever runs."""
+
+    def __init__(self, content: AsyncIterator[bytes], ticket: Ticket, **kwargs: Any) -> None:
+        super().__init__(content, **kwargs)
+        self.ticket = ticket
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            if not self.ticket.claimed:
+                admission.release(self.ticket)
+
+
+_SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+}
 
 
 @router.post("/generate")
 async def generate(
+    request: Request,
     body: GenerateRequestSchema,
     db: AsyncSession = Depends(get_db),
-    user: User | None = Depends(get_current_user_optional),
+    user_id: uuid.UUID | None = Depends(get_current_user_id_optional),
 ) -> StreamingResponse:
-    """Stream a new roadmap as SSE. If authenticated, save the roadmap when stream ends."""
-    return StreamingResponse(
-        _stream_and_optionally_save(body.query, db, user),
+    """Stream a new roadmap as SSE. If authenticated, save the roadmap as it streams.
+
+    A request with Last-Event-ID resumes that generation instead: the events after the
+    given id are replayed, then the live ones follow (410 once the log has expired).
+    """
+    # Release the pooled connection used by the auth lookup before the long-lived stream starts
+    await db.close()
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id:
+        resume = parse_event_id(last_event_id)
+        log = await generation_logs.find(resume[0], user_id) if resume else None
+        if log is None:
+            raise HTTPException(status_code=status.HTTP_410_GONE, detail="Generation is no longer available")
+        return StreamingResponse(
+            _follow_generation(log, resume[1], request),
+            media_type="text/event-stream",
+            headers=_SSE_HEADERS,
+        )
+    client_key = f"user:{user_id}" if user_id else f"ip:{request.client.host if request.client else 'unknown'}"
+    try:
+        ticket = admission.reserve(client_key, authenticated=user_id is not None)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=e.reason,
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    return _AdmittedStreamingResponse(
+        _stream_and_optionally_save(body.query, user_id, request, ticket),
+        ticket,
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
+        headers=_SSE_HEADERS,
     )
+
+
+# --- Admin: bulk resource ingestion (x-admin-key) ---
+@router.post(
+    "/admin/resources/ingest",
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(require_admin)],
+)
+async def ingest_resources(
+    request: Request,
+    format: str = Query("jsonl", description="jsonl or csv"),
+) -> dict[str, str]:
+    """Stream a JSONL/CSV body to a temp file, then ingest it in the background."""
+    if format not in INGEST_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"format must be one of {', '.join(INGEST_FORMATS)}",
+        )
+    # Spool to disk chunk by chunk so memory stays flat for multi-GB uploads
+    with tempfile.NamedTemporaryFile(suffix=f".{format}", delete=False) as tmp:
+        path = tmp.name
+    async with await anyio.open_file(path, "wb") as f:
+        async for chunk in request.stream():
+            await f.write(chunk)
+    job_id = start_ingest_job(path, format)
+    return {"job_id": job_id}
+
+
+@router.get("/admin/resources/ingest/{job_id}", dependencies=[Depends(require_admin)])
+async def ingest_status(job_id: str) -> dict[str, Any]:
+    stats = get_ingest_job(job_id)
+    if stats is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ingest job not found",
+        )
+    return stats.as_dict()
@@ -0,0 +1,176 @@
+# Response compression (gzip, brotli if installed) that keeps SSE streams flushed per event
+import zlib
+from typing import Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import registry
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+SSE_TYPE = "text/event-stream"
+# End of one SSE event; the compressor is flushed there so clients get each event immediately
+_EVENT_BOUNDARY = b"\n\n"
+
+compression_bytes = registry.counter(
+    "http_compression_bytes_total", "Response body bytes before (identity) and after compression, by encoding"
+)
+
+
+class _Encoder(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+    def flush(self) -> bytes: ...
+    def finish(self) -> bytes: ...
+
+
+class _GzipEncoder:
+    def __init__(self, level: int) -> None:
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._z.compress(data)
+
+    def flush(self) -> bytes:
+        return self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._z.flush(zlib.Z_FINISH)
+
+
+class _BrotliEncoder:
+    def __init__(self, quality: int) -> None:
+        self._c = brotli.Compressor(mode=brotli.MODE_TEXT, quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.process(data)
+
+    def flush(self) -> bytes:
+        return self._c.flush()
+
+    def finish(self) -> bytes:
+        return self._c.finish()
+
+
+def negotiate(accept_encoding: str, brotli_available: bool = brotli is not None) -> str | None:
+    """Pick "br" or "gzip" from an Accept-Encoding header (q=0 excludes), preferring br."""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+    wildcard = accepted.get("*", 0.0)
+    candidates = ("br", "gzip") if brotli_available else ("gzip",)
+    for name in candidates:
+        if accepted.get(name, wildcard) > 0:
+            return name
+    return None
+
+
+class CompressionMiddleware:
+    """Pure ASGI compression middleware (safe for streaming bodies).
+
+    Compresses compressible responses of at least `minimum_size` bytes, or of unknown size
+    (streamed). `text/event-stream` is always compressed as a stream and the compressor is
+    flushed at every event boundary, so events reach the client as soon as they would
+    uncompressed; only the bytes on the wire drop.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _encoder(self, encoding: str) -> _Encoder:
+        if encoding == "br":
+            return _BrotliEncoder(self.brotli_quality)
+        return _GzipEncoder(self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        encoder: _Encoder | None = None
+        passthrough = False
+        sse = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, encoder, passthrough, sse
+            if message["type"] == "http.response.start":
+                # Held until the first body chunk shows whether compressing is worthwhile
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+            body: bytes = message.get("body", b"")
+            more = message.get("more_body", False)
+
+            if start is not None:
+                headers = MutableHeaders(scope=start)
+                content_type = headers.get("content-type", "")
+                sse = content_type.startswith(SSE_TYPE)
+                if (
+                    start["status"] < 200
+                    or start["status"] in (204, 304)
+                    or "content-encoding" in headers
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                    or (not more and len(body) < self.minimum_size)
+                ):
+                    passthrough = True
+                    await send(start)
+                    start = None
+                    await send(message)
+                    return
+                encoder = self._encoder(encoding)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if "content-length" in headers:
+                    del headers["content-length"]
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    # The compressed bytes differ, so a strong validator no longer holds
+                    headers["ETag"] = f"W/{etag}"
+                await send(start)
+                start = None
+
+            data = encoder.compress(body)
+            if not more:
+                data += encoder.finish()
+            elif sse and body.endswith(_EVENT_BOUNDARY):
+                data += encoder.flush()
+            compression_bytes.inc(len(body), encoding="identity")
+            compression_bytes.inc(len(data), encoding=encoding)
+            if data or not more:
+                await send({"type": "http.response.body", "body": data, "more_body": more})
+
+        await self.app(scope, receive, send_compressed)
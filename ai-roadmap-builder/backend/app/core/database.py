@@ -1,20 +1,136 @@
 # Async SQLAlchemy engine/session and pgvector setup
+import asyncio
+import time
 from collections.abc import AsyncGenerator
+from typing import Any
+from uuid import uuid4
 
-from sqlalchemy import text
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from app.core.config import settings
+from app.core.metrics import registry
+from app.core.timing import record_db_time
+from app.core.vector_index import ensure_resource_index
 from app.models import Base
+from app.models.resource import EMBEDDING_DIM
+from app.models.roadmap import SEARCH_VECTOR_SQL
+
+POOL_MODES = ("pooled", "pgbouncer", "null")
+
+# Idempotent DDL for tables that predate a model change (create_all never alters existing tables)
+SCHEMA_UPGRADES: list[str] = [
+    "CREATE UNIQUE INDEX IF NOT EXISTS resources_url_key ON resources (url)",
+    "ALTER TABLE roadmaps ADD COLUMN IF NOT EXISTS version integer NOT NULL DEFAULT 1",
+    "ALTER TABLE roadmaps ADD COLUMN IF NOT EXISTS updated_at timestamptz NOT NULL DEFAULT now()",
+    "CREATE INDEX IF NOT EXISTS ix_roadmaps_user_list ON roadmaps (user_id, created_at DESC, id DESC)"
+    " INCLUDE (title, updated_at)",
+    "DROP INDEX IF EXISTS ix_roadmaps_user_created",
+    "CREATE INDEX IF NOT EXISTS ix_roadmaps_validators ON roadmaps (id) INCLUDE (user_id, version, updated_at)",
+    "ALTER TABLE roadmaps ADD COLUMN IF NOT EXISTS search_vector tsvector"
+    f" GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_roadmaps_user_search ON roadmaps USING gin (user_id, search_vector)",
+    f"ALTER TABLE roadmaps ADD COLUMN IF NOT EXISTS embedding vector({EMBEDDING_DIM})",
+    "ALTER TABLE roadmaps ADD COLUMN IF NOT EXISTS embedding_model varchar(128)",
+    "ALTER TABLE roadmaps ADD COLUMN IF NOT EXISTS embedding_key varchar(64)",
+    f"ALTER TABLE roadmaps ADD COLUMN IF NOT EXISTS embedding_bits bit({EMBEDDING_DIM})",
+    "CREATE INDEX IF NOT EXISTS ix_roadmaps_user_embedding_bits ON roadmaps (user_id, embedding_model)"
+    " INCLUDE (embedding_bits)",
+]
+
+pool_wait_seconds = registry.histogram(
+    "db_pool_wait_seconds", "Time spent waiting to check out a pooled connection"
+)
+db_query_seconds = registry.histogram(
+    "db_query_seconds", "Statement execution time by leading SQL keyword (SELECT, INSERT, ...)"
+)
+_QUERY_VERBS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "CREATE", "DROP", "ALTER"})
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that tracks checkout waiters and wait time."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # Per pool: scripts, tests and pools recreated by dispose() each count their own
+        self.waiters = 0
+        self.timeouts = 0
+
+    def _do_get(self) -> Any:
+        self.waiters += 1
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            self.timeouts += 1
+            raise
+        finally:
+            self.waiters -= 1
+            pool_wait_seconds.observe(time.perf_counter() - start)
+
+
+def _engine_kwargs() -> dict[str, Any]:
+    """Build create_async_engine kwargs for the configured pool mode."""
+    mode = (settings.db_pool_mode or "pooled").strip().lower()
+    if mode not in POOL_MODES:
+        raise ValueError(f"Unknown DB_POOL_MODE: {mode}. Use one of {', '.join(POOL_MODES)}.")
+
+    connect_args: dict[str, Any] = {}
+    if mode == "pgbouncer":
+        # Transaction pooling hands each transaction a different server connection,
+        # so named prepared statements must be unique and never reused from a cache.
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    else:
+        connect_args["statement_cache_size"] = settings.db_statement_cache_size
+        connect_args["prepared_statement_cache_size"] = settings.db_statement_cache_size
+
+    kwargs: dict[str, Any] = {"connect_args": connect_args}
+    if mode == "null":
+        kwargs["poolclass"] = NullPool
+        return kwargs
+    kwargs.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+    )
+    return kwargs
+
 
 engine = create_async_engine(
     settings.async_database_url,
     echo=False,
     future=True,
-    poolclass=NullPool,
+    **_engine_kwargs(),
 )
 
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    head = statement.lstrip()[:8].split(None, 1)
+    verb = head[0].upper() if head else ""
+    db_query_seconds.observe(elapsed, statement=verb if verb in _QUERY_VERBS else "OTHER")
+    record_db_time(elapsed)
+
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def _handle_error(context) -> None:
+    starts = context.connection.info.get("query_start") if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
 async_session_factory = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -39,4 +155,75 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 async def init_db() -> None:
     async with engine.begin() as conn:
         await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gin"))
         await conn.run_sync(Base.metadata.create_all)
+        for statement in SCHEMA_UPGRADES:
+            await conn.execute(text(statement))
+        await ensure_resource_index(conn)
+
+
+async def warm_pool(connections: int | None = None) -> int:
+    """Open up to `connections` pooled connections concurrently so first requests skip connect/TLS."""
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return 0
+    n = min(
+        settings.db_pool_warmup if connections is None else connections,
+        settings.db_pool_size,
+    )
+    if n <= 0:
+        return 0
+
+    async def _open() -> Any:
+        conn = await engine.connect()
+        await conn.execute(text("SELECT 1"))
+        return conn
+
+    conns = await asyncio.gather(*(_open() for _ in range(n)), return_exceptions=True)
+    opened = 0
+    for conn in conns:
+        if isinstance(conn, BaseException):
+            continue
+        opened += 1
+        await conn.close()  # returns the connection to the pool
+    return opened
+
+
+def pool_stats() -> dict[str, Any]:
+    """Snapshot of pool usage for monitoring (checked-out, waiters, wait time)."""
+    pool = engine.pool
+    stats: dict[str, Any] = {"mode": settings.db_pool_mode, "pool": type(pool).__name__}
+    if isinstance(pool, InstrumentedQueuePool):
+        wait = pool_wait_seconds.snapshot()
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            waiters=pool.waiters,
+            timeouts=pool.timeouts,
+            wait_count=wait["count"],
+            wait_seconds_total=round(wait["sum"], 6),
+            wait_seconds_p99=wait["p99"],
+        )
+    return stats
+
+
+_pool_gauges = {
+    key: registry.gauge(f"db_pool_{key}", f"Connection pool {key.replace('_', ' ')}")
+    for key in ("size", "checked_in", "checked_out", "overflow", "waiters", "timeouts")
+}
+
+
+def _collect_pool_stats() -> None:
+    stats = pool_stats()
+    for key, gauge in _pool_gauges.items():
+        if key in stats:
+            gauge.set(stats[key])
+
+
+registry.add_collector(_collect_pool_stats)
+
+
+async def dispose_engine() -> None:
+    await engine.dispose()
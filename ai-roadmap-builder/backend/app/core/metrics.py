@@ -0,0 +1,209 @@
+# In-process metrics: counters and histograms shared by services and health routes
+import math
+import threading
+import time
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+
+# Latency buckets in seconds (upper bounds); +Inf is implicit
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels."""
+
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help = help_text
+        self._values: dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> dict[LabelKey, float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class Histogram:
+    """Fixed-bucket histogram (Prometheus semantics: cumulative buckets, sum, count)."""
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[LabelKey, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            # Layout: [bucket counts..., +Inf count, sum]
+            series = self._series.get(key)
+            if series is None:
+                series = [0.0] * (len(self.buckets) + 2)
+                self._series[key] = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def snapshot(self, **labels: str) -> dict[str, float]:
+        """Count, sum and approximate p50/p99 (bucket upper bound) for one label set."""
+        series = self._series.get(_label_key(labels))
+        if not series:
+            return {"count": 0, "sum": 0.0, "p50": 0.0, "p99": 0.0}
+        counts = series[:-1]
+        total = sum(counts)
+        return {
+            "count": total,
+            "sum": series[-1],
+            "p50": self._quantile(counts, total, 0.5),
+            "p99": self._quantile(counts, total, 0.99),
+        }
+
+    def _quantile(self, counts: list[float], total: float, q: float) -> float:
+        if not total:
+            return 0.0
+        rank = q * total
+        running = 0.0
+        for i, c in enumerate(counts[:-1]):
+            running += c
+            if running >= rank:
+                return self.buckets[i]
+        # Above the largest bucket: report its bound so snapshots stay JSON-safe
+        return self.buckets[-1]
+
+    def samples(self) -> dict[LabelKey, list[float]]:
+        with self._lock:
+            return {k: list(v) for k, v in self._series.items()}
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the wall time of the block (also on error)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+
+class Gauge:
+    """Point-in-time value, optionally split by labels (set by collectors before rendering)."""
+
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help = help_text
+        self._values: dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[_label_key(labels)] = float(value)
+
+    def samples(self) -> dict[LabelKey, float]:
+        return dict(self._values)
+
+
+class Registry:
+    """Get-or-create registry so modules can declare metrics at import time."""
+
+    def __init__(self) -> None:
+        self.counters: dict[str, Counter] = {}
+        self.histograms: dict[str, Histogram] = {}
+        self.gauges: dict[str, Gauge] = {}
+        self._collectors: list[Callable[[], None]] = []
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        if name not in self.counters:
+            self.counters[name] = Counter(name, help_text)
+        return self.counters[name]
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        if name not in self.histograms:
+            self.histograms[name] = Histogram(name, help_text, buckets)
+        return self.histograms[name]
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        if name not in self.gauges:
+            self.gauges[name] = Gauge(name, help_text)
+        return self.gauges[name]
+
+    def add_collector(self, collect: Callable[[], None]) -> None:
+        """Register a callback that refreshes gauges right before each render."""
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        for collect in self._collectors:
+            collect()
+        lines: list[str] = []
+        for counter in self.counters.values():
+            lines += _header(counter.name, counter.help, "counter")
+            for key, value in counter.samples().items():
+                lines.append(f"{counter.name}{_labels(key)} {_num(value)}")
+        for gauge in self.gauges.values():
+            lines += _header(gauge.name, gauge.help, "gauge")
+            for key, value in gauge.samples().items():
+                lines.append(f"{gauge.name}{_labels(key)} {_num(value)}")
+        for hist in self.histograms.values():
+            lines += _header(hist.name, hist.help, "histogram")
+            for key, series in hist.samples().items():
+                running = 0.0
+                for bound, count in zip((*hist.buckets, math.inf), series[:-1]):
+                    running += count
+                    le = "+Inf" if bound == math.inf else _num(bound)
+                    lines.append(f"{hist.name}_bucket{_labels(key, le=le)} {_num(running)}")
+                lines.append(f"{hist.name}_sum{_labels(key)} {_num(series[-1])}")
+                lines.append(f"{hist.name}_count{_labels(key)} {_num(running)}")
+        return "\n".join(lines) + "\n"
+
+
+def _header(name: str, help_text: str, kind: str) -> list[str]:
+    help_text = help_text.replace("\\", "\\\\").replace("\n", "\\n")
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(key: LabelKey, **extra: str) -> str:
+    pairs = [*key, *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + "}"
+
+
+def _num(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+registry = Registry()
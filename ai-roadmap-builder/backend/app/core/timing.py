@@ -0,0 +1,64 @@
+# Request timing: per-request DB time, request latency histogram and the Server-Timing header
+import time
+from contextvars import ContextVar
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import registry
+
+http_request_seconds = registry.histogram(
+    "http_request_seconds", "Request duration by method, route template and status (SSE: whole stream)"
+)
+
+# Mutable cell so DB time recorded in child tasks (same context copy) still reaches the request
+_db_seconds: ContextVar[list[float] | None] = ContextVar("db_seconds", default=None)
+
+
+def record_db_time(seconds: float) -> None:
+    """Add statement time to the current request's Server-Timing (no-op outside requests)."""
+    cell = _db_seconds.get()
+    if cell is not None:
+        cell[0] += seconds
+
+
+class ServerTimingMiddleware:
+    """Pure ASGI middleware (safe for streaming bodies).
+
+    Adds `Server-Timing: db;dur=..., app;dur=...` to non-streaming responses and records
+    http_request_seconds labelled by route template, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        cell = [0.0]
+        token = _db_seconds.set(cell)
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                if not headers.get("content-type", "").startswith("text/event-stream"):
+                    app_ms = (time.perf_counter() - start) * 1000
+                    headers.append("Server-Timing", f"db;dur={cell[0] * 1000:.1f}, app;dur={app_ms:.1f}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _db_seconds.reset(token)
+            route = scope.get("route")
+            http_request_seconds.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status),
+            )
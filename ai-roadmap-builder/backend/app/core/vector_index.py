@@ -0,0 +1,71 @@
+# pgvector ANN index management for resources.embedding (HNSW or IVFFlat, cosine distance)
+import math
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.core.config import settings
+
+INDEX_TYPES = ("hnsw", "ivfflat", "none")
+RESOURCE_INDEX_NAMES = {
+    "hnsw": "ix_resources_embedding_hnsw",
+    "ivfflat": "ix_resources_embedding_ivfflat",
+}
+
+
+def ivfflat_lists_for(rows: int) -> int:
+    """pgvector guidance: rows/1000 lists up to 1M rows, sqrt(rows) beyond."""
+    if rows <= 1_000_000:
+        return max(1, rows // 1000)
+    return int(math.sqrt(rows))
+
+
+def index_ddl(
+    index_type: str,
+    table: str = "resources",
+    column: str = "embedding",
+    name: str | None = None,
+    lists: int | None = None,
+    concurrently: bool = False,
+) -> str:
+    """CREATE INDEX statement for a cosine-distance ANN index."""
+    if index_type not in RESOURCE_INDEX_NAMES:
+        raise ValueError(f"Unknown vector index type: {index_type}. Use hnsw or ivfflat.")
+    name = name or RESOURCE_INDEX_NAMES[index_type]
+    conc = "CONCURRENTLY " if concurrently else ""
+    if index_type == "hnsw":
+        params = (
+            f"m = {int(settings.resource_hnsw_m)}, "
+            f"ef_construction = {int(settings.resource_hnsw_ef_construction)}"
+        )
+    else:
+        params = f"lists = {int(lists or 1)}"
+    return (
+        f"CREATE INDEX {conc}IF NOT EXISTS {name} ON {table} "
+        f"USING {index_type} ({column} vector_cosine_ops) WITH ({params})"
+    )
+
+
+async def ensure_resource_index(conn: AsyncConnection, index_type: str | None = None) -> str:
+    """Create the configured ANN index on resources.embedding if no ANN index exists yet.
+
+    Cheap and safe on every start: an existing index (of either type) is never dropped or
+    rebuilt here, since that would lock resources during startup. Switching types and
+    rebuilding are left to scripts/vector_index.py (CONCURRENTLY). Returns the active type.
+    """
+    index_type = (index_type or settings.resource_index_type or "hnsw").strip().lower()
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown RESOURCE_INDEX_TYPE: {index_type}. Use one of {', '.join(INDEX_TYPES)}.")
+    for existing, name in RESOURCE_INDEX_NAMES.items():
+        if (await conn.execute(text("SELECT to_regclass(:name)"), {"name": name})).scalar_one() is not None:
+            return existing
+    if index_type == "none":
+        return index_type
+    lists = None
+    if index_type == "ivfflat":
+        lists = settings.resource_ivfflat_lists
+        if not lists:
+            rows = (await conn.execute(text("SELECT count(*) FROM resources"))).scalar_one()
+            lists = ivfflat_lists_for(rows)
+    await conn.execute(text(index_ddl(index_type, lists=lists)))
+    return index_type
@@ -1,7 +1,13 @@
 # SQLAlchemy & pgvector models
 from app.models.roadmap import Roadmap, User
 from app.models.resource import Resource
+from app.models.cache import GenerationCacheEntry, SemanticCacheEntry
+from app.models.concept import ConceptPrerequisite, RoadmapEdge, RoadmapNode
+from app.models.generation_log import GenerationLogEvent
 
 from .base import Base
 
-__all__ = ["Base", "User", "Roadmap", "Resource"]
+__all__ = [
+    "Base", "User", "Roadmap", "Resource", "GenerationCacheEntry", "SemanticCacheEntry",
+    "RoadmapNode", "RoadmapEdge", "ConceptPrerequisite", "GenerationLogEvent",
+]
@@ -0,0 +1,66 @@
+# Normalized roadmap concepts: one row per node / edge, plus global prerequisite counts
+import uuid
+
+from sqlalchemy import ForeignKey, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+# Concept keys are normalized labels (lowercase, single spaces), truncated to this length
+CONCEPT_KEY_LENGTH = 255
+
+
+class RoadmapNode(Base):
+    """A node of roadmaps.nodes; rebuilt from the JSONB whenever the roadmap is saved."""
+
+    __tablename__ = "roadmap_nodes"
+    __table_args__ = (
+        # "Which of my roadmaps contain concept X"
+        Index("ix_roadmap_nodes_user_label", "user_id", "label_key"),
+    )
+
+    roadmap_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("roadmaps.id", ondelete="CASCADE"), primary_key=True
+    )
+    node_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)  # copy of roadmaps.user_id
+    label: Mapped[str] = mapped_column(Text, nullable=False)
+    label_key: Mapped[str] = mapped_column(String(CONCEPT_KEY_LENGTH), nullable=False)
+
+
+class RoadmapEdge(Base):
+    """An edge of roadmaps.edges whose endpoints both exist, with the endpoints' concept keys."""
+
+    __tablename__ = "roadmap_edges"
+    __table_args__ = (
+        Index("ix_roadmap_edges_target_source", "target_key", "source_key"),
+    )
+
+    roadmap_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("roadmaps.id", ondelete="CASCADE"), primary_key=True
+    )
+    edge_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    source_node_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    target_node_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    source_key: Mapped[str] = mapped_column(String(CONCEPT_KEY_LENGTH), nullable=False)
+    target_key: Mapped[str] = mapped_column(String(CONCEPT_KEY_LENGTH), nullable=False)
+
+
+class ConceptPrerequisite(Base):
+    """How many roadmap edges lead from `source_key` into `target_key`, across all roadmaps.
+
+    Maintained incrementally with roadmap_edges so ranking prerequisites reads a few index
+    entries instead of aggregating every edge (rows may sit at 0 after deletes).
+    """
+
+    __tablename__ = "concept_prerequisites"
+    __table_args__ = (
+        Index("ix_concept_prerequisites_rank", "target_key", "edge_count",
+              postgresql_ops={"edge_count": "DESC"}),
+    )
+
+    target_key: Mapped[str] = mapped_column(String(CONCEPT_KEY_LENGTH), primary_key=True)
+    source_key: Mapped[str] = mapped_column(String(CONCEPT_KEY_LENGTH), primary_key=True)
+    source_label: Mapped[str] = mapped_column(Text, nullable=False)
+    edge_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
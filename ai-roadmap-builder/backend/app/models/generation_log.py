@@ -0,0 +1,22 @@
+# Resumable /generate streams: SSE frames of recent generations, replayed on Last-Event-ID reconnects
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, Integer, String, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class GenerationLogEvent(Base):
+    """One numbered SSE frame of a generation; `final` marks the last frame of a finished one."""
+
+    __tablename__ = "generation_log_events"
+
+    generation_id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    seq: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    frame: Mapped[str] = mapped_column(Text, nullable=False)  # complete frame, "id:" line included
+    final: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
@@ -2,11 +2,22 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, Text
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Computed, DateTime, ForeignKey, Index, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import BIT, JSONB, TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
+from app.models.resource import EMBEDDING_DIM
+
+# Full-text document for /roadmaps/search: title (A), query and node labels (B), descriptions (C).
+# Only immutable functions, so Postgres can maintain it as a stored generated column.
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A')"
+    " || setweight(to_tsvector('english', coalesce(topic_query, '')), 'B')"
+    " || setweight(jsonb_to_tsvector('english', jsonb_path_query_array(nodes, '$[*].data.label'), '[\"string\"]'), 'B')"
+    " || setweight(jsonb_to_tsvector('english', jsonb_path_query_array(nodes, '$[*].data.description'), '[\"string\"]'), 'C')"
+)
 
 
 class User(Base):
@@ -25,6 +36,19 @@ class User(Base):
 
 class Roadmap(Base):
     __tablename__ = "roadmaps"
+    __table_args__ = (
+        # Serves the per-user list newest first (keyset pages and its ETag) from the index alone
+        Index("ix_roadmaps_user_list", "user_id", "created_at", "id",
+              postgresql_ops={"created_at": "DESC", "id": "DESC"},
+              postgresql_include=["title", "updated_at"]),
+        # Conditional GETs compare validators without touching the heap or the JSONB
+        Index("ix_roadmaps_validators", "id", postgresql_include=["user_id", "version", "updated_at"]),
+        # Per-user full-text search (btree_gin lets user_id share the GIN index)
+        Index("ix_roadmaps_user_search", "user_id", "search_vector", postgresql_using="gin"),
+        # Per-user vector shortlist by Hamming distance, read from the index alone (no TOAST)
+        Index("ix_roadmaps_user_embedding_bits", "user_id", "embedding_model",
+              postgresql_include=["embedding_bits"]),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -36,6 +60,20 @@ class Roadmap(Base):
     topic_query: Mapped[str] = mapped_column(Text, nullable=False)
     nodes: Mapped[list] = mapped_column(JSONB, nullable=False, default=list)
     edges: Mapped[list] = mapped_column(JSONB, nullable=False, default=list)
+    # Optimistic concurrency: every write bumps it; editors send the version they loaded
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, server_default=func.now()
+    )
+    # Search columns are deferred so loading a roadmap never pulls them
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True), deferred=True
+    )
+    embedding: Mapped[list[float] | None] = mapped_column(Vector(EMBEDDING_DIM), nullable=True, deferred=True)
+    embedding_model: Mapped[str | None] = mapped_column(String(128), nullable=True, deferred=True)
+    embedding_key: Mapped[str | None] = mapped_column(String(64), nullable=True, deferred=True)  # hash of embedded text
+    # Sign bit per dimension of `embedding` (96 bytes, stored inline); see roadmap_search
+    embedding_bits: Mapped[str | None] = mapped_column(BIT(EMBEDDING_DIM), nullable=True, deferred=True)
 
     user: Mapped["User"] = relationship("User", back_populates="roadmaps")
@@ -4,21 +4,33 @@ from app.schemas.auth import (
     TokenPayloadSchema,
     TokenResponseSchema,
 )
+from app.schemas.concept import ConceptCountSchema
 from app.schemas.roadmap import (
     EdgeSchema,
     GenerateRequestSchema,
+    GraphOpSchema,
     NodeSchema,
     RoadmapFullSchema,
+    RoadmapGraphPatchSchema,
+    RoadmapLayoutSchema,
     RoadmapListItemSchema,
+    RoadmapSearchResultSchema,
+    RoadmapVersionSchema,
 )
 
 __all__ = [
+    "ConceptCountSchema",
     "EdgeSchema",
     "GenerateRequestSchema",
+    "GraphOpSchema",
     "LoginRequestSchema",
     "NodeSchema",
     "RoadmapFullSchema",
+    "RoadmapGraphPatchSchema",
+    "RoadmapLayoutSchema",
     "RoadmapListItemSchema",
+    "RoadmapSearchResultSchema",
+    "RoadmapVersionSchema",
     "TokenPayloadSchema",
     "TokenResponseSchema",
 ]
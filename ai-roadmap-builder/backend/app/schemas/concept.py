@@ -0,0 +1,9 @@
+# Cross-roadmap concept queries
+from pydantic import BaseModel
+
+
+class ConceptCountSchema(BaseModel):
+    label: str
+    key: str
+    """Normalized label used for matching (lowercase, single spaces)."""
+    count: int
@@ -1,7 +1,7 @@
 # Pydantic v2 schemas for roadmap nodes/edges and API (mirror frontend contracts)
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import BaseModel, Field
 
@@ -32,6 +32,10 @@ class NodeSchema(BaseModel):
         """Payload sent in SSE; frontend checks type === 'concept' and addNode(payload)."""
         return self.model_dump(mode="json")
 
+    def to_sse_json(self) -> bytes:
+        """Same payload as to_sse_payload, serialized straight to JSON bytes (no dict round-trip)."""
+        return self.__pydantic_serializer__.to_json(self)
+
 
 # --- Edge (connection between nodes) ---
 class EdgeSchema(BaseModel):
@@ -56,6 +60,11 @@ class RoadmapListItemSchema(BaseModel):
         from_attributes = True
 
 
+class RoadmapSearchResultSchema(RoadmapListItemSchema):
+    score: float
+    """Reciprocal-rank-fusion score of the full-text and embedding ranks; higher is better."""
+
+
 class RoadmapFullSchema(BaseModel):
     id: str
     title: str
@@ -63,6 +72,8 @@ class RoadmapFullSchema(BaseModel):
     nodes: list[dict[str, Any]] = Field(default_factory=list)
     edges: list[dict[str, Any]] = Field(default_factory=list)
     created_at: str
+    version: int = 1
+    """Bumped on every change; send it back to reject edits made against a stale copy."""
 
     class Config:
         from_attributes = True
@@ -72,6 +83,39 @@ class RoadmapUpdateSchema(BaseModel):
     title: str | None = Field(None, min_length=1, max_length=512)
     nodes: list[dict[str, Any]] | None = None
     edges: list[dict[str, Any]] | None = None
+    version: int | None = None
+    """Expected current version (409 if it changed); omit for last-write-wins."""
+
+
+class GraphOpSchema(BaseModel):
+    """One node/edge edit addressed by id (not array index, so concurrent edits don't shift it).
+
+    upsert: `value` is the whole element (added if new). update: `value` keys are merged into
+    the element's top level, e.g. {"position": {...}} for a drag. delete: removes the element;
+    deleting a node also removes its edges.
+    """
+    op: Literal["upsert", "update", "delete"]
+    kind: Literal["node", "edge"]
+    id: str = Field(..., min_length=1, max_length=255)
+    value: dict[str, Any] | None = None
+
+
+class RoadmapGraphPatchSchema(BaseModel):
+    ops: list[GraphOpSchema] = Field(default_factory=list, max_length=1000)
+    title: str | None = Field(None, min_length=1, max_length=512)
+    version: int | None = None
+    """Expected current version (409 if it changed); omit for last-write-wins."""
+
+
+class RoadmapVersionSchema(BaseModel):
+    id: str
+    version: int
+
+
+class RoadmapLayoutSchema(BaseModel):
+    """Server-computed positions of a saved roadmap's nodes, by node id."""
+    version: int
+    positions: dict[str, PositionSchema]
 
 
 class RoadmapCreateSchema(BaseModel):
@@ -0,0 +1,253 @@
+# Admission control for /generate: concurrency caps, token-bucket rate limits, priority wait queue
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import registry
+
+# Idle per-user buckets are forgotten after this long (a full bucket carries no state)
+_BUCKET_TTL_SECONDS = 3600
+_MAX_TRACKED_USERS = 50_000
+
+admission_decisions = registry.counter(
+    "admission_decisions_total",
+    "/generate admission decisions by tier (user, anon) and decision (admitted, queued, rejected_rate, rejected_queue)",
+)
+admission_wait = registry.histogram(
+    "admission_queue_wait_seconds", "Time queued requests waited before starting"
+)
+
+
+class AdmissionRejected(Exception):
+    """Request refused before streaming; surfaced as 429 with Retry-After."""
+
+    def __init__(self, reason: str, retry_after: float) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `burst`."""
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available (0 if one is available now)."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill(time.monotonic())
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        if self.rate > 0:
+            self.tokens -= 1
+
+
+class Ticket:
+    """One /generate request's place in admission: queued until `admitted`, held until released."""
+
+    __slots__ = ("key", "priority", "admitted", "released", "claimed", "since", "changed")
+
+    def __init__(self, key: str, priority: int) -> None:
+        self.key = key
+        self.priority = priority
+        self.admitted = False
+        self.released = False
+        self.claimed = False  # set by the consumer that will release it (e.g. the SSE stream)
+        self.since = time.monotonic()  # enqueue time, then admission time
+        self.changed = asyncio.Event()
+
+
+class AdmissionController:
+    """Admits /generate streams up to global and per-user concurrency limits.
+
+    Requests beyond the limits wait in a bounded queue where authenticated users (priority 0)
+    go ahead of anonymous ones (priority 1), FIFO within each tier. A waiter blocked only by
+    its own per-user limit does not hold up others. Rate limits are checked on arrival.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_per_user: int,
+        queue_size: int,
+        rate: float,
+        burst: float,
+        user_rate: float,
+        user_burst: float,
+        anon_rate: float,
+        anon_burst: float,
+    ) -> None:
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_per_user = max(1, max_per_user)
+        self.queue_size = queue_size
+        self._global_bucket = TokenBucket(rate, burst)
+        self._user_limits = {0: (user_rate, user_burst), 1: (anon_rate, anon_burst)}
+        self._buckets: TTLCache[str, TokenBucket] = TTLCache(
+            maxsize=_MAX_TRACKED_USERS, ttl=_BUCKET_TTL_SECONDS
+        )
+        self._queues: dict[int, deque[Ticket]] = {0: deque(), 1: deque()}
+        self._active = 0
+        self._active_by_key: dict[str, int] = {}
+        # Moving average of how long a stream holds its slot; drives the Retry-After estimate
+        self._avg_hold = 30.0
+
+    def _bucket(self, key: str, priority: int) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(*self._user_limits[priority])
+            self._buckets.set(key, bucket)
+        return bucket
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def _can_run(self, key: str) -> bool:
+        return self._active < self.max_concurrent and self._active_by_key.get(key, 0) < self.max_per_user
+
+    def reserve(self, key: str, authenticated: bool) -> Ticket:
+        """Admit now or enqueue; raises AdmissionRejected when rate-limited or the queue is full."""
+        priority = 0 if authenticated else 1
+        tier = "user" if authenticated else "anon"
+        run_now = self._can_run(key) and self.queued == 0
+        if not run_now and self.queued >= self.queue_size:
+            admission_decisions.inc(tier=tier, decision="rejected_queue")
+            backlog = self.queued + 1
+            raise AdmissionRejected(
+                "Too many generations in progress", self._avg_hold * backlog / self.max_concurrent
+            )
+        user_bucket = self._bucket(key, priority)
+        wait = max(self._global_bucket.wait_time(), user_bucket.wait_time())
+        if wait > 0:
+            admission_decisions.inc(tier=tier, decision="rejected_rate")
+            raise AdmissionRejected("Rate limit exceeded", wait)
+        self._global_bucket.take()
+        user_bucket.take()
+
+        ticket = Ticket(key, priority)
+        if run_now:
+            self._start(ticket)
+            admission_decisions.inc(tier=tier, decision="admitted")
+        else:
+            self._queues[priority].append(ticket)
+            admission_decisions.inc(tier=tier, decision="queued")
+            self._dispatch()
+        return ticket
+
+    def position(self, ticket: Ticket) -> int:
+        """1-based place in the wait queue (authenticated tier first); 0 once admitted."""
+        if ticket.admitted:
+            return 0
+        ahead = 0
+        for priority in sorted(self._queues):
+            queue = self._queues[priority]
+            if priority == ticket.priority:
+                return ahead + queue.index(ticket) + 1
+            ahead += len(queue)
+        return 0
+
+    async def next_position(self, ticket: Ticket, last: int) -> int:
+        """Wait until the ticket's position differs from `last`; returns it (0 = admitted).
+
+        The event is cleared before the position is read, so a change made while the caller
+        was busy (e.g. admitted during its previous yield) is returned at once, never lost.
+        """
+        while True:
+            ticket.changed.clear()
+            position = self.position(ticket)
+            if position != last:
+                return position
+            await ticket.changed.wait()
+
+    def release(self, ticket: Ticket) -> None:
+        """Give back the slot (or leave the queue). Safe to call more than once."""
+        if ticket.released:
+            return
+        ticket.released = True
+        if ticket.admitted:
+            self._active -= 1
+            left = self._active_by_key.get(ticket.key, 1) - 1
+            if left:
+                self._active_by_key[ticket.key] = left
+            else:
+                self._active_by_key.pop(ticket.key, None)
+            held = time.monotonic() - ticket.since
+            self._avg_hold += 0.1 * (held - self._avg_hold)
+        else:
+            self._queues[ticket.priority].remove(ticket)
+        self._dispatch()
+
+    def _start(self, ticket: Ticket) -> None:
+        ticket.admitted = True
+        self._active += 1
+        self._active_by_key[ticket.key] = self._active_by_key.get(ticket.key, 0) + 1
+
+    def _dispatch(self) -> None:
+        """Admit waiters in priority order while capacity allows, then notify position changes."""
+        for priority in sorted(self._queues):
+            queue = self._queues[priority]
+            for ticket in list(queue):
+                if self._active >= self.max_concurrent:
+                    break
+                if self._can_run(ticket.key):
+                    queue.remove(ticket)
+                    self._start(ticket)
+                    now = time.monotonic()
+                    admission_wait.observe(now - ticket.since)
+                    ticket.since = now
+                    ticket.changed.set()
+        for queue in self._queues.values():
+            for ticket in queue:
+                ticket.changed.set()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "active": self._active,
+            "max_concurrent": self.max_concurrent,
+            "queued": self.queued,
+            "queued_users": len(self._queues[0]),
+            "queued_anon": len(self._queues[1]),
+            "queue_size": self.queue_size,
+        }
+
+
+admission = AdmissionController(
+    max_concurrent=settings.admission_max_concurrent,
+    max_per_user=settings.admission_max_per_user,
+    queue_size=settings.admission_queue_size,
+    rate=settings.admission_rate_per_second,
+    burst=settings.admission_burst,
+    user_rate=settings.admission_user_rate_per_minute / 60,
+    user_burst=settings.admission_user_burst,
+    anon_rate=settings.admission_anon_rate_per_minute / 60,
+    anon_burst=settings.admission_anon_burst,
+)
+
+
+_admission_gauges = {
+    key: registry.gauge(f"admission_{key}", f"/generate admission: {key.replace('_', ' ')}")
+    for key in ("active", "queued_users", "queued_anon")
+}
+
+
+def _collect_admission_stats() -> None:
+    stats = admission.stats()
+    for key, gauge in _admission_gauges.items():
+        gauge.set(stats[key])
+
+
+registry.add_collector(_collect_admission_stats)
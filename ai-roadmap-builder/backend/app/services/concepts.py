@@ -0,0 +1,176 @@
+# Concept index: keeps roadmap_nodes / roadmap_edges / concept_prerequisites in sync with roadmaps' JSONB
+import uuid
+from collections import Counter
+
+import orjson
+from sqlalchemy import Text, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import TextClause
+
+from app.core.metrics import registry
+from app.models.concept import CONCEPT_KEY_LENGTH
+
+concept_sync_rows = registry.counter(
+    "concept_sync_rows_total", "Rows written to the concept index by table (nodes, edges)"
+)
+
+# Same normalization as concept_key(), applied in SQL to the node label
+_LABEL = "COALESCE(e->'data'->>'label', '')"
+_KEY_SQL = f"left(lower(regexp_replace(btrim({_LABEL}), '\\s+', ' ', 'g')), {CONCEPT_KEY_LENGTH})"
+
+
+def _by_ids(sql: str) -> TextClause:
+    return text(sql).bindparams(bindparam("ids", type_=ARRAY(UUID(as_uuid=True))))
+
+
+_DELETE_EDGES = _by_ids(
+    "DELETE FROM roadmap_edges WHERE roadmap_id = ANY(:ids) RETURNING source_key, target_key"
+)
+_DELETE_NODES = _by_ids("DELETE FROM roadmap_nodes WHERE roadmap_id = ANY(:ids)")
+
+# What the index should hold, read straight from the stored JSONB so every save path (ORM
+# writes, Core inserts, in-database graph ops) syncs the same way without decoding in Python.
+# The first element wins when an id repeats.
+_WANTED = f"""
+wanted_nodes AS (
+    SELECT DISTINCT ON (r.id, e->>'id')
+        r.id AS roadmap_id, e->>'id' AS node_id, r.user_id, {_LABEL} AS label, {_KEY_SQL} AS label_key
+    FROM roadmaps AS r
+    CROSS JOIN LATERAL jsonb_array_elements(r.nodes) WITH ORDINALITY AS x(e, ord)
+    WHERE r.id = ANY(:ids)
+      AND length(e->>'id') BETWEEN 1 AND 255
+      AND {_KEY_SQL} <> ''
+    ORDER BY r.id, e->>'id', x.ord
+),
+wanted_edges AS (
+    SELECT DISTINCT ON (r.id, e->>'id')
+        r.id AS roadmap_id, e->>'id' AS edge_id, s.node_id AS source_node_id, t.node_id AS target_node_id,
+        s.label_key AS source_key, t.label_key AS target_key, s.label AS source_label
+    FROM roadmaps AS r
+    CROSS JOIN LATERAL jsonb_array_elements(r.edges) WITH ORDINALITY AS x(e, ord)
+    JOIN wanted_nodes AS s ON s.roadmap_id = r.id AND s.node_id = e->>'source'
+    JOIN wanted_nodes AS t ON t.roadmap_id = r.id AND t.node_id = e->>'target'
+    WHERE r.id = ANY(:ids)
+      AND length(e->>'id') BETWEEN 1 AND 255
+      AND s.label_key <> t.label_key
+    ORDER BY r.id, e->>'id', x.ord
+)"""
+
+# Sync is a diff: rows that no longer match the JSONB go, missing ones are added, and rows
+# already in place are left untouched (a streaming checkpoint or a label edit writes a few rows)
+_DELETE_STALE_EDGES = _by_ids(f"""
+WITH {_WANTED}
+DELETE FROM roadmap_edges AS re
+WHERE re.roadmap_id = ANY(:ids)
+  AND NOT EXISTS (
+    SELECT 1 FROM wanted_edges AS w
+    WHERE w.roadmap_id = re.roadmap_id AND w.edge_id = re.edge_id
+      AND w.source_node_id = re.source_node_id AND w.target_node_id = re.target_node_id
+      AND w.source_key = re.source_key AND w.target_key = re.target_key
+  )
+RETURNING re.source_key, re.target_key
+""")
+
+_DELETE_STALE_NODES = _by_ids(f"""
+WITH {_WANTED}
+DELETE FROM roadmap_nodes AS n
+WHERE n.roadmap_id = ANY(:ids)
+  AND NOT EXISTS (SELECT 1 FROM wanted_nodes AS w WHERE w.roadmap_id = n.roadmap_id AND w.node_id = n.node_id)
+""")
+
+_UPSERT_NODES = _by_ids(f"""
+WITH {_WANTED}
+INSERT INTO roadmap_nodes (roadmap_id, node_id, user_id, label, label_key)
+SELECT roadmap_id, node_id, user_id, label, label_key FROM wanted_nodes
+ON CONFLICT (roadmap_id, node_id) DO UPDATE
+SET user_id = excluded.user_id, label = excluded.label, label_key = excluded.label_key
+WHERE (roadmap_nodes.user_id, roadmap_nodes.label, roadmap_nodes.label_key)
+    IS DISTINCT FROM (excluded.user_id, excluded.label, excluded.label_key)
+""")
+
+# Edges still in place were kept by _DELETE_STALE_EDGES, so only new ones insert
+_INSERT_EDGES = _by_ids(f"""
+WITH {_WANTED},
+inserted AS (
+    INSERT INTO roadmap_edges (roadmap_id, edge_id, source_node_id, target_node_id, source_key, target_key)
+    SELECT roadmap_id, edge_id, source_node_id, target_node_id, source_key, target_key FROM wanted_edges
+    ON CONFLICT DO NOTHING
+    RETURNING roadmap_id, edge_id, source_key, target_key
+)
+SELECT i.source_key, i.target_key, w.source_label AS label
+FROM inserted AS i
+JOIN wanted_edges AS w ON w.roadmap_id = i.roadmap_id AND w.edge_id = i.edge_id
+""")
+
+# Rows are applied in key order so concurrent saves lock shared counters in the same order
+_APPLY_DELTA = text("""
+INSERT INTO concept_prerequisites (target_key, source_key, source_label, edge_count)
+SELECT d.target_key, d.source_key, d.source_label, d.delta
+FROM jsonb_to_recordset(CAST(:delta AS jsonb)) AS d(target_key text, source_key text, source_label text, delta int)
+ORDER BY d.target_key, d.source_key
+ON CONFLICT (target_key, source_key) DO UPDATE
+SET edge_count = concept_prerequisites.edge_count + excluded.edge_count,
+    source_label = CASE WHEN excluded.edge_count > 0
+        THEN excluded.source_label ELSE concept_prerequisites.source_label END
+""").bindparams(bindparam("delta", type_=Text))
+
+
+def concept_key(label: str) -> str:
+    """Normalized concept label used for matching across roadmaps (mirrors _KEY_SQL)."""
+    return " ".join(label.lower().split())[:CONCEPT_KEY_LENGTH]
+
+
+async def _apply_delta(
+    db: AsyncSession,
+    removed: Counter[tuple[str, str]],
+    added: Counter[tuple[str, str]],
+    labels: dict[str, str],
+) -> None:
+    delta = Counter(added)
+    delta.subtract(removed)
+    rows = [
+        {"source_key": source, "target_key": target, "source_label": labels.get(source, source), "delta": n}
+        for (source, target), n in delta.items()
+        if n
+    ]
+    if rows:
+        await db.execute(_APPLY_DELTA, {"delta": orjson.dumps(rows).decode("utf-8")})
+
+
+async def _remove(db: AsyncSession, ids: list[uuid.UUID]) -> Counter[tuple[str, str]]:
+    removed = Counter(
+        (row.source_key, row.target_key) for row in await db.execute(_DELETE_EDGES, {"ids": ids})
+    )
+    await db.execute(_DELETE_NODES, {"ids": ids})
+    return removed
+
+
+async def sync_roadmap_concepts(db: AsyncSession, roadmap_ids: list[uuid.UUID]) -> None:
+    """Bring the concept rows of `roadmap_ids` in line with their current nodes/edges.
+
+    Only rows that differ are written. Call after the roadmap write, in the same transaction
+    (the caller commits). Idempotent, so it is also the backfill step.
+    """
+    if not roadmap_ids:
+        return
+    params = {"ids": roadmap_ids}
+    removed = Counter(
+        (row.source_key, row.target_key) for row in await db.execute(_DELETE_STALE_EDGES, params)
+    )
+    await db.execute(_DELETE_STALE_NODES, params)
+    nodes = await db.execute(_UPSERT_NODES, params)
+    added: Counter[tuple[str, str]] = Counter()
+    labels: dict[str, str] = {}
+    for row in await db.execute(_INSERT_EDGES, params):
+        added[(row.source_key, row.target_key)] += 1
+        labels[row.source_key] = row.label
+    concept_sync_rows.inc(max(nodes.rowcount, 0), table="nodes")
+    concept_sync_rows.inc(sum(added.values()), table="edges")
+    await _apply_delta(db, removed, added, labels)
+
+
+async def drop_roadmap_concepts(db: AsyncSession, roadmap_ids: list[uuid.UUID]) -> None:
+    """Remove the concept rows of roadmaps about to be deleted (before the DELETE cascades)."""
+    if roadmap_ids:
+        await _apply_delta(db, await _remove(db, roadmap_ids), Counter(), {})
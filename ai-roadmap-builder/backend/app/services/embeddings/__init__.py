@@ -0,0 +1,14 @@
+from app.services.embeddings.base import BaseEmbeddingService
+from app.services.embeddings.batching import BatchingEmbeddingService
+from app.services.embeddings.factory import create_embedding_provider, get_embedding_service
+from app.services.embeddings.gemini import GeminiEmbeddingService
+from app.services.embeddings.hashing import HashingEmbeddingService
+
+__all__ = [
+    "BaseEmbeddingService",
+    "BatchingEmbeddingService",
+    "GeminiEmbeddingService",
+    "HashingEmbeddingService",
+    "create_embedding_provider",
+    "get_embedding_service",
+]
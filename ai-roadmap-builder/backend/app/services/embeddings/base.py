@@ -0,0 +1,27 @@
+# Abstract base class: contract all embedding implementations must follow
+from abc import ABC, abstractmethod
+
+from app.models.resource import EMBEDDING_DIM
+
+
+class BaseEmbeddingService(ABC):
+    """Interface for embedding providers. Vectors must have `dim` entries (Resource.embedding)."""
+
+    model_name: str = ""
+    """Identifier of the embedding model; vectors from different models are not comparable."""
+    dim: int = EMBEDDING_DIM
+
+    @abstractmethod
+    async def embed_batch(
+        self,
+        texts: list[str],
+        kind: str = "query",
+    ) -> list[list[float]]:
+        """
+        Embed several texts in one provider call, preserving order.
+        `kind` is "query" (search input) or "document" (indexed content).
+        """
+        ...
+
+    async def embed(self, text: str, kind: str = "query") -> list[float]:
+        return (await self.embed_batch([text], kind))[0]
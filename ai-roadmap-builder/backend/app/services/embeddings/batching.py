@@ -0,0 +1,116 @@
+# Micro-batching + LRU memoization wrapper around any BaseEmbeddingService
+import asyncio
+import hashlib
+
+from app.core.cache import TTLCache
+from app.core.metrics import registry
+from app.services.embeddings.base import BaseEmbeddingService
+
+embedding_requests = registry.counter(
+    "embedding_requests_total", "Embedding lookups by result (cache_hit, coalesced, miss)"
+)
+embedding_batch_size = registry.histogram(
+    "embedding_batch_size",
+    "Texts per upstream embedding call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+
+
+def _text_key(kind: str, text: str) -> bytes:
+    return hashlib.sha256(f"{kind}\x1f{text}".encode("utf-8")).digest()
+
+
+class BatchingEmbeddingService(BaseEmbeddingService):
+    """Coalesces concurrent embed calls arriving within `window_ms` into one upstream batch.
+
+    Results are memoized by text hash, so repeated queries never reach the provider, and
+    identical texts pending in the same window share one slot in the batch.
+    """
+
+    def __init__(
+        self,
+        inner: BaseEmbeddingService,
+        window_ms: float = 5.0,
+        max_batch: int = 64,
+        cache_size: int = 10_000,
+    ) -> None:
+        self.inner = inner
+        self.model_name = inner.model_name
+        self.dim = inner.dim
+        self.window = max(0.0, window_ms) / 1000.0
+        self.max_batch = max(1, max_batch)
+        self._cache: TTLCache[bytes, list[float]] = TTLCache(maxsize=cache_size)
+        # kind -> {text hash: (text, future)}; one pending batch per kind
+        self._pending: dict[str, dict[bytes, tuple[str, asyncio.Future]]] = {}
+        # Every text hash that is pending or in flight, so duplicates share one future
+        self._futures: dict[bytes, asyncio.Future] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+
+    async def embed_batch(
+        self,
+        texts: list[str],
+        kind: str = "query",
+    ) -> list[list[float]]:
+        results: list[list[float] | None] = [None] * len(texts)
+        waits: list[tuple[int, asyncio.Future]] = []
+        for i, text in enumerate(texts):
+            key = _text_key(kind, text)
+            cached = self._cache.get(key)
+            if cached is not None:
+                embedding_requests.inc(result="cache_hit")
+                results[i] = cached
+                continue
+            waits.append((i, self._enqueue(kind, key, text)))
+        for i, fut in waits:
+            # Shield: the future is shared with other callers waiting on the same text
+            results[i] = await asyncio.shield(fut)
+        return results  # type: ignore[return-value]
+
+    def _enqueue(self, kind: str, key: bytes, text: str) -> asyncio.Future:
+        existing = self._futures.get(key)
+        if existing is not None:
+            embedding_requests.inc(result="coalesced")
+            return existing
+        embedding_requests.inc(result="miss")
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._futures[key] = fut
+        pending = self._pending.setdefault(kind, {})
+        pending[key] = (text, fut)
+        if len(pending) >= self.max_batch:
+            self._schedule_flush(kind, now=True)
+        elif kind not in self._timers:
+            self._timers[kind] = loop.call_later(self.window, self._schedule_flush, kind)
+        return fut
+
+    def _schedule_flush(self, kind: str, now: bool = False) -> None:
+        timer = self._timers.pop(kind, None)
+        if timer is not None and now:
+            timer.cancel()
+        batch = self._pending.pop(kind, None)
+        if batch:
+            asyncio.get_running_loop().create_task(self._flush(kind, batch))
+
+    async def _flush(self, kind: str, batch: dict[bytes, tuple[str, asyncio.Future]]) -> None:
+        keys = list(batch)
+        texts = [batch[k][0] for k in keys]
+        embedding_batch_size.observe(len(texts))
+        try:
+            vectors = await self.inner.embed_batch(texts, kind)
+            if len(vectors) != len(texts):
+                raise ValueError(f"Embedder returned {len(vectors)} vectors for {len(texts)} texts")
+        except Exception as e:
+            for key in keys:
+                self._futures.pop(key, None)
+            for _, fut in batch.values():
+                if not fut.done():
+                    fut.set_exception(e)
+                    # Retrieve once so callers that went away don't log "exception never retrieved"
+                    fut.exception()
+            return
+        for key, vector in zip(keys, vectors):
+            self._cache.set(key, vector)
+            self._futures.pop(key, None)
+            fut = batch[key][1]
+            if not fut.done():
+                fut.set_result(vector)
@@ -0,0 +1,31 @@
+# Embedding router: returns the configured embedding service, wrapped with batching + cache
+from functools import lru_cache
+
+from app.core.config import settings
+from app.services.embeddings.base import BaseEmbeddingService
+from app.services.embeddings.batching import BatchingEmbeddingService
+from app.services.embeddings.gemini import GeminiEmbeddingService
+from app.services.embeddings.hashing import HashingEmbeddingService
+
+
+def create_embedding_provider() -> BaseEmbeddingService:
+    """Bare provider without batching/cache (bulk jobs that batch themselves)."""
+    provider = (settings.embedding_provider or "gemini").strip().lower()
+    if provider == "gemini":
+        return GeminiEmbeddingService()
+    if provider == "hashing":
+        return HashingEmbeddingService()
+    raise ValueError(
+        f"Unknown embedding provider: {provider}. Set EMBEDDING_PROVIDER=gemini or hashing."
+    )
+
+
+@lru_cache(maxsize=1)
+def get_embedding_service() -> BaseEmbeddingService:
+    """Return the configured embedder (micro-batched and memoized). Cached per process."""
+    return BatchingEmbeddingService(
+        create_embedding_provider(),
+        window_ms=settings.embedding_batch_window_ms,
+        max_batch=settings.embedding_max_batch,
+        cache_size=settings.embedding_cache_size,
+    )
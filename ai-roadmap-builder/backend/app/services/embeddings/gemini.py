@@ -0,0 +1,37 @@
+# Google Gemini implementation of BaseEmbeddingService
+import google.generativeai as genai
+
+from app.core.config import settings
+from app.services.embeddings.base import BaseEmbeddingService
+
+_TASK_TYPES = {"query": "retrieval_query", "document": "retrieval_document"}
+# Most texts batchEmbedContents accepts in one request
+_MAX_TEXTS_PER_CALL = 100
+
+
+class GeminiEmbeddingService(BaseEmbeddingService):
+    """Gemini batch embeddings via the async SDK entry point."""
+
+    model_name = "models/text-embedding-004"  # 768 dims, matches EMBEDDING_DIM
+
+    def __init__(self, api_key: str | None = None) -> None:
+        key = api_key or settings.gemini_api_key
+        if not key:
+            raise ValueError("GEMINI_API_KEY is required for GeminiEmbeddingService")
+        genai.configure(api_key=key)
+
+    async def embed_batch(
+        self,
+        texts: list[str],
+        kind: str = "query",
+    ) -> list[list[float]]:
+        vectors: list[list[float]] = []
+        # The batch endpoint caps texts per call; larger inputs (e.g. ingest batches) go in chunks
+        for start in range(0, len(texts), _MAX_TEXTS_PER_CALL):
+            result = await genai.embed_content_async(
+                model=self.model_name,
+                content=texts[start:start + _MAX_TEXTS_PER_CALL],
+                task_type=_TASK_TYPES.get(kind, "retrieval_query"),
+            )
+            vectors.extend(list(v) for v in result["embedding"])
+        return vectors
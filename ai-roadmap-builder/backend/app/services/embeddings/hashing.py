@@ -0,0 +1,47 @@
+# Deterministic local embedder (feature hashing); no network, for offline RAG and benchmarks
+import hashlib
+import math
+import re
+
+from app.services.embeddings.base import BaseEmbeddingService
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbeddingService(BaseEmbeddingService):
+    """Signed feature hashing of word unigrams/bigrams and character trigrams, L2-normalized.
+
+    Same text always yields the same vector, and texts sharing words/subwords land close
+    under cosine distance. Not semantic, but good enough to exercise pgvector paths offline.
+    """
+
+    model_name = "local/hashing-v1"
+
+    def _features(self, text: str) -> list[str]:
+        words = _TOKEN_RE.findall(text.lower())
+        feats = [f"w:{w}" for w in words]
+        feats.extend(f"b:{a} {b}" for a, b in zip(words, words[1:]))
+        for w in words:
+            padded = f"#{w}#"
+            feats.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return feats
+
+    def embed_one(self, text: str) -> list[float]:
+        vec = [0.0] * self.dim
+        for feat in self._features(text):
+            h = int.from_bytes(hashlib.blake2b(feat.encode("utf-8"), digest_size=8).digest(), "little")
+            idx = h % self.dim
+            vec[idx] += 1.0 if (h >> 63) & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vec))
+        if norm == 0.0:
+            # pgvector cosine distance is undefined for the zero vector
+            vec[0] = 1.0
+            return vec
+        return [v / norm for v in vec]
+
+    async def embed_batch(
+        self,
+        texts: list[str],
+        kind: str = "query",
+    ) -> list[list[float]]:
+        return [self.embed_one(t) for t in texts]
@@ -0,0 +1,119 @@
+# Generation cache: replay finished roadmaps for repeated intents without calling the LLM
+import hashlib
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Text, cast, delete, literal, select
+from sqlalchemy.dialects.postgresql import JSONB, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.core.metrics import registry
+from app.models.cache import GenerationCacheEntry
+from app.services.sse import StreamEvent, events_from_json, json_array
+
+logger = logging.getLogger(__name__)
+
+# Prune the shared tier on roughly 1 in N writes to keep the DELETE off most requests
+_PRUNE_EVERY = 50
+
+cache_requests = registry.counter(
+    "generation_cache_requests_total", "Generation cache lookups by result (memory, db, miss)"
+)
+
+# Holds the encoded events themselves, so memory hits replay without any JSON work
+_memory: TTLCache[str, list[StreamEvent]] = TTLCache(
+    maxsize=settings.generation_cache_max_entries,
+    ttl=settings.generation_cache_ttl_seconds,
+)
+
+
+def cache_key(intent: str, prompt_version: str, model: str) -> str:
+    """Stable key for an exact-match lookup."""
+    raw = f"{prompt_version}\x1f{model}\x1f{intent}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def get_cached_events(db: AsyncSession, key: str) -> list[StreamEvent] | None:
+    """Return cached node/edge events for `key` (in-process tier first, then Postgres)."""
+    if not settings.generation_cache_enabled:
+        return None
+    events = _memory.get(key)
+    if events is not None:
+        cache_requests.inc(result="memory")
+        return events
+
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        select(GenerationCacheEntry.events).where(
+            GenerationCacheEntry.key == key,
+            GenerationCacheEntry.expires_at > now,
+        )
+    )
+    rows = result.scalar_one_or_none()
+    if rows is None:
+        cache_requests.inc(result="miss")
+        return None
+    cache_requests.inc(result="db")
+    events = events_from_json(rows)
+    _memory.set(key, events)
+    return events
+
+
+async def store_events(
+    key: str,
+    intent: str,
+    prompt_version: str,
+    model: str,
+    events: list[StreamEvent],
+) -> None:
+    """Write a finished generation to both tiers. Uses its own session (called after streaming)."""
+    if not settings.generation_cache_enabled or not events:
+        return
+    _memory.set(key, events)
+
+    now = datetime.now(timezone.utc)
+    # Bind the already-encoded event bytes as JSON text instead of re-serializing dicts
+    body = json_array([e.data for e in events])
+    values = {
+        "key": key,
+        "intent": intent,
+        "prompt_version": prompt_version,
+        "model": model,
+        "events": cast(literal(body, Text), JSONB),
+        "size_bytes": len(body),
+        "created_at": now,
+        "expires_at": now + timedelta(seconds=settings.generation_cache_ttl_seconds),
+    }
+    stmt = insert(GenerationCacheEntry).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[GenerationCacheEntry.key],
+        set_={k: stmt.excluded[k] for k in ("events", "size_bytes", "created_at", "expires_at")},
+    )
+    try:
+        async with async_session_factory() as session:
+            await session.execute(stmt)
+            if random.randrange(_PRUNE_EVERY) == 0:
+                await _prune(session, now)
+            await session.commit()
+    except Exception as e:
+        # Cache writes are best-effort; the generation itself already succeeded
+        logger.warning("Generation cache write failed: %s", e)
+
+
+async def _prune(session: AsyncSession, now: datetime) -> None:
+    """Drop expired rows and the oldest rows beyond generation_cache_max_rows."""
+    await session.execute(
+        delete(GenerationCacheEntry).where(GenerationCacheEntry.expires_at <= now)
+    )
+    overflow = (
+        select(GenerationCacheEntry.key)
+        .order_by(GenerationCacheEntry.created_at.desc())
+        .offset(settings.generation_cache_max_rows)
+    )
+    await session.execute(
+        delete(GenerationCacheEntry).where(GenerationCacheEntry.key.in_(overflow))
+    )
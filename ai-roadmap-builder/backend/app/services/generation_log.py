@@ -0,0 +1,211 @@
+# Generation logs: numbered SSE frames per /generate run, replayed to clients resuming with Last-Event-ID
+import asyncio
+import logging
+import random
+import secrets
+import time
+import uuid
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import Insert, insert
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.core.metrics import registry
+from app.models import GenerationLogEvent
+
+logger = logging.getLogger(__name__)
+
+# Prune expired rows on roughly 1 in N spills to keep the DELETE off most writes
+_PRUNE_EVERY = 50
+# Frames per INSERT: 6 bind parameters each, well under asyncpg's 32767-parameter limit
+_SPILL_BATCH = 1000
+# Following a log that lives on another worker: poll interval, and give up after this much silence
+_POLL_SECONDS = 1.0
+_POLL_STALL_SECONDS = 60.0
+
+generation_resumes = registry.counter(
+    "generation_resumes_total", "Last-Event-ID reconnects to /generate by source (memory, db, expired)"
+)
+
+
+def parse_event_id(event_id: str) -> tuple[str, int] | None:
+    """Split a "<generation id>:<seq>" event id; None if it isn't one of ours."""
+    generation_id, _, seq = event_id.strip().rpartition(":")
+    if not generation_id or not seq.isdigit():
+        return None
+    return generation_id, int(seq)
+
+
+class GenerationLog:
+    """SSE frames of one generation, numbered from 1 ("id: <generation id>:<seq>").
+
+    Appended to by the task running the generation and followed by any number of client
+    connections. `remote` logs were found only in Postgres (another worker runs them, or they
+    left the memory tier) and are followed by polling.
+    """
+
+    __slots__ = ("id", "user_id", "frames", "done", "remote", "subscribers", "task", "_flushed", "_changed")
+
+    def __init__(self, generation_id: str, user_id: uuid.UUID | None, remote: bool = False) -> None:
+        self.id = generation_id
+        self.user_id = user_id
+        self.frames: list[bytes] = []
+        self.done = False
+        self.remote = remote
+        self.subscribers = 0
+        self.task: asyncio.Task | None = None
+        self._flushed = 0  # frames already written to Postgres
+        self._changed = asyncio.Event()
+
+    def append(self, frame: bytes) -> None:
+        """Number an SSE frame (b"data: ...\\n\\n") and wake the followers."""
+        self.frames.append(b"id: %s:%d\n" % (self.id.encode(), len(self.frames) + 1) + frame)
+        self._notify()
+
+    def close(self) -> None:
+        self.done = True
+        self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def follow(self, after: int) -> AsyncIterator[bytes]:
+        """Frames numbered after `after`, then new ones as they arrive, until the log is closed."""
+        if self.remote:
+            async for frame in _follow_persisted(self.id, after):
+                yield frame
+            return
+        sent = after
+        while True:
+            while sent < len(self.frames):
+                sent += 1
+                yield self.frames[sent - 1]
+            if self.done:
+                return
+            await self._changed.wait()
+
+
+async def _follow_persisted(generation_id: str, after: int) -> AsyncIterator[bytes]:
+    sent = after
+    quiet_since = time.monotonic()
+    while True:
+        async with async_session_factory() as session:
+            rows = (
+                await session.execute(
+                    select(GenerationLogEvent.seq, GenerationLogEvent.frame, GenerationLogEvent.final)
+                    .where(GenerationLogEvent.generation_id == generation_id, GenerationLogEvent.seq > sent)
+                    .order_by(GenerationLogEvent.seq)
+                )
+            ).all()
+        for row in rows:
+            sent = row.seq
+            yield row.frame.encode("utf-8")
+            if row.final:
+                return
+        if rows:
+            quiet_since = time.monotonic()
+        elif time.monotonic() - quiet_since > _POLL_STALL_SECONDS:
+            return  # the worker running it is gone
+        await asyncio.sleep(_POLL_SECONDS)
+
+
+def _upsert_frames(rows: list[dict]) -> Insert:
+    stmt = insert(GenerationLogEvent).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[GenerationLogEvent.generation_id, GenerationLogEvent.seq],
+        set_={"final": stmt.excluded.final, "expires_at": stmt.excluded.expires_at},
+    )
+
+
+class GenerationLogStore:
+    """Logs of running generations, plus recently finished ones (memory, then Postgres)."""
+
+    def __init__(self) -> None:
+        self._live: dict[str, GenerationLog] = {}
+        self._finished: TTLCache[str, GenerationLog] = TTLCache(
+            maxsize=settings.generation_log_max_entries,
+            ttl=settings.generation_log_ttl_seconds,
+        )
+
+    def create(self, user_id: uuid.UUID | None) -> GenerationLog:
+        log = GenerationLog(secrets.token_urlsafe(12), user_id)
+        self._live[log.id] = log
+        return log
+
+    async def find(self, generation_id: str, user_id: uuid.UUID | None) -> GenerationLog | None:
+        """The log a client may resume: unknown, expired and other users' logs are None."""
+        log = self._live.get(generation_id) or self._finished.get(generation_id)
+        source = "memory"
+        if log is None:
+            log, source = await self._find_persisted(generation_id), "db"
+        if log is None or (log.user_id is not None and log.user_id != user_id):
+            generation_resumes.inc(source="expired")
+            return None
+        generation_resumes.inc(source=source)
+        return log
+
+    async def _find_persisted(self, generation_id: str) -> GenerationLog | None:
+        try:
+            async with async_session_factory() as session:
+                row = (
+                    await session.execute(
+                        select(GenerationLogEvent.user_id)
+                        .where(
+                            GenerationLogEvent.generation_id == generation_id,
+                            GenerationLogEvent.expires_at > func.now(),
+                        )
+                        .limit(1)
+                    )
+                ).one_or_none()
+        except Exception as e:
+            logger.warning("Generation log lookup failed: %s", e)
+            return None
+        return None if row is None else GenerationLog(generation_id, row.user_id, remote=True)
+
+    async def spill(self, log: GenerationLog) -> None:
+        """Write frames not yet in Postgres (best-effort); a closed log also marks its last frame final."""
+        start = log._flushed
+        if log.done and log.frames:
+            start = min(start, len(log.frames) - 1)  # rewrite the last frame with final=true
+        if start >= len(log.frames):
+            return
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=settings.generation_log_ttl_seconds)
+        last = len(log.frames)
+        rows = [
+            {
+                "generation_id": log.id,
+                "seq": seq,
+                "user_id": log.user_id,
+                "frame": log.frames[seq - 1].decode("utf-8"),
+                "final": log.done and seq == last,
+                "expires_at": expires_at,
+            }
+            for seq in range(start + 1, last + 1)
+        ]
+        try:
+            async with async_session_factory() as session:
+                for i in range(0, len(rows), _SPILL_BATCH):
+                    await session.execute(_upsert_frames(rows[i:i + _SPILL_BATCH]))
+                if random.randrange(_PRUNE_EVERY) == 0:
+                    await session.execute(delete(GenerationLogEvent).where(GenerationLogEvent.expires_at <= now))
+                await session.commit()
+            log._flushed = last
+        except Exception as e:
+            # The memory tier still serves resumes on this worker
+            logger.warning("Generation log spill failed: %s", e)
+
+    async def finish(self, log: GenerationLog) -> None:
+        """Close the log, wake its followers, and keep it replayable for generation_log_ttl_seconds."""
+        log.close()
+        self._live.pop(log.id, None)
+        self._finished.set(log.id, log)
+        await self.spill(log)
+
+
+generation_logs = GenerationLogStore()
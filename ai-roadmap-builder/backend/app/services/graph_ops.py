@@ -0,0 +1,106 @@
+# Server-side node/edge edits: fold a batch of id-addressed ops and apply them in one UPDATE
+from typing import Any
+
+import orjson
+from sqlalchemy import Text, bindparam, text
+from sqlalchemy.sql.elements import TextClause
+
+from app.schemas.roadmap import GraphOpSchema
+
+# One pass over the stored array: drop deleted ids (and, for edges, edges touching deleted
+# nodes), replace upserted ids, shallow-merge updated ids, then append upserts that were new.
+# Elements without an id are kept as-is. {col} is "nodes" or "edges"; :{p} is the folded ops.
+_ARRAY_SQL = """COALESCE((
+    SELECT jsonb_agg(CASE
+        WHEN ops.v->'upsert' ? COALESCE(t.e->>'id', '') THEN ops.v->'upsert'->(t.e->>'id')
+        WHEN ops.v->'merge' ? COALESCE(t.e->>'id', '') THEN t.e || (ops.v->'merge'->(t.e->>'id'))
+        ELSE t.e END ORDER BY t.ord)
+    FROM jsonb_array_elements(roadmaps.{col}) WITH ORDINALITY AS t(e, ord)
+    WHERE NOT ops.v->'delete' ? COALESCE(t.e->>'id', '')
+      AND NOT ops.v->'detach' ? COALESCE(t.e->>'source', '')
+      AND NOT ops.v->'detach' ? COALESCE(t.e->>'target', '')
+), '[]'::jsonb) || COALESCE((
+    SELECT jsonb_agg(ops.v->'upsert'->n.id ORDER BY n.ord)
+    FROM jsonb_array_elements_text(ops.v->'order') WITH ORDINALITY AS n(id, ord)
+    WHERE NOT EXISTS (SELECT 1 FROM jsonb_array_elements(roadmaps.{col}) AS x(e) WHERE x.e->>'id' = n.id)
+), '[]'::jsonb)"""
+_WRAPPED_SQL = "(SELECT {expr} FROM (SELECT CAST(:{p} AS jsonb) AS v) AS ops)"
+
+
+class _Fold:
+    """Net effect of a batch on one array, keyed by element id (later ops win)."""
+
+    def __init__(self) -> None:
+        self.upsert: dict[str, dict[str, Any]] = {}
+        self.merge: dict[str, dict[str, Any]] = {}
+        self.delete: set[str] = set()
+        self.detach: set[str] = set()
+
+    def __bool__(self) -> bool:
+        return bool(self.upsert or self.merge or self.delete or self.detach)
+
+    def apply(self, op: GraphOpSchema) -> None:
+        key = op.id
+        if op.op == "delete":
+            self.upsert.pop(key, None)
+            self.merge.pop(key, None)
+            self.delete.add(key)
+        elif op.op == "upsert":
+            self.merge.pop(key, None)
+            self.delete.discard(key)
+            self.upsert[key] = {**(op.value or {}), "id": key}
+        elif key in self.upsert:
+            self.upsert[key].update(op.value or {})
+        elif key not in self.delete:
+            # Updating an id that does not exist is a no-op, as in the SQL
+            self.merge.setdefault(key, {}).update(op.value or {})
+
+    def to_json(self) -> str:
+        return orjson.dumps({
+            "upsert": self.upsert,
+            "order": list(self.upsert),
+            "merge": self.merge,
+            "delete": sorted(self.delete),
+            "detach": sorted(self.detach),
+        }).decode("utf-8")
+
+
+def _expression(column: str, fold: _Fold) -> TextClause:
+    param = f"{column}_ops"
+    sql = _WRAPPED_SQL.format(expr=_ARRAY_SQL.format(col=column), p=param)
+    return text(sql).bindparams(bindparam(param, fold.to_json(), type_=Text))
+
+
+def graph_update_values(ops: list[GraphOpSchema]) -> dict[str, TextClause]:
+    """SET values for `nodes`/`edges` applying `ops` in order; arrays without ops are left out.
+
+    Leaving an untouched column out of the UPDATE keeps its TOASTed value as-is, so a node
+    drag rewrites only the nodes document and never the edges.
+    """
+    nodes, edges = _Fold(), _Fold()
+    for op in ops:
+        (nodes if op.kind == "node" else edges).apply(op)
+    # Deleting a node also removes the edges attached to it
+    edges.detach = set(nodes.delete)
+    values = {}
+    if nodes:
+        values["nodes"] = _expression("nodes", nodes)
+    if edges:
+        values["edges"] = _expression("edges", edges)
+    return values
+
+
+def changes_text(ops: list[GraphOpSchema]) -> bool:
+    """False when the batch only moves nodes or edits edges (nothing searchable changed)."""
+    return any(
+        op.kind == "node" and not (op.op == "update" and set(op.value or {}) <= {"position"})
+        for op in ops
+    )
+
+
+def changes_concepts(ops: list[GraphOpSchema]) -> bool:
+    """True when the batch can change the concept index: node text, or edges added, removed or re-pointed."""
+    return changes_text(ops) or any(
+        op.kind == "edge" and (op.op != "update" or not {"source", "target"}.isdisjoint(op.value or {}))
+        for op in ops
+    )
@@ -0,0 +1,167 @@
+# Streaming graph validation of LLM output: duplicates, dangling edges, cycles, reject-ratio early abort
+from app.core.config import settings
+from app.core.metrics import registry
+from app.services.sse import StreamEvent
+
+graph_rejects = registry.counter(
+    "stream_graph_rejects_total",
+    "LLM output lines dropped by the graph validator, by reason (invalid, duplicate, dangling, cycle)",
+)
+
+# Weight of the newest line in the moving reject ratio (it reflects roughly the last 10 lines)
+_RATIO_ALPHA = 0.1
+
+# An edge waiting for an endpoint: (event, source id, target id)
+_Waiting = tuple[StreamEvent, str, str]
+
+
+class GraphValidator:
+    """Checks one generation's nodes and edges as they stream, in O(1) per line in the usual case.
+
+    - nodes/edges whose id was already seen, and repeated source -> target pairs, are dropped
+    - an edge is held until both endpoints have streamed; edges still held at the end, or
+      beyond `max_pending` at once, are dropped
+    - an edge that would close a cycle (self-loops included) is dropped. Nodes keep a
+      topological order (Pearce-Kelly): an edge that agrees with it costs O(1), otherwise only
+      the nodes ordered between its endpoints are searched and reordered
+    - `degraded` turns true once the moving average of rejected lines reaches `reject_ratio`
+      (after `min_lines`), so the caller can stop the upstream instead of paying for junk
+    """
+
+    def __init__(
+        self,
+        reject_ratio: float | None = None,
+        min_lines: int | None = None,
+        max_pending: int | None = None,
+    ) -> None:
+        self.reject_ratio = settings.stream_abort_reject_ratio if reject_ratio is None else reject_ratio
+        self.min_lines = settings.stream_abort_min_lines if min_lines is None else min_lines
+        self.max_pending = settings.stream_max_pending_edges if max_pending is None else max_pending
+        self.lines = 0
+        self.rejected = 0
+        self.recent_reject_ratio = 0.0
+        self._order: dict[str, int] = {}  # node id -> position in a topological order
+        self._children: dict[str, list[str]] = {}
+        self._parents: dict[str, list[str]] = {}
+        self._edge_ids: set[str] = set()
+        self._pairs: set[tuple[str, str]] = set()
+        self._waiting: dict[str, list[_Waiting]] = {}  # missing endpoint -> edges held for it
+        self._pending = 0
+
+    @property
+    def degraded(self) -> bool:
+        return (
+            self.reject_ratio > 0
+            and self.lines >= self.min_lines
+            and self.recent_reject_ratio >= self.reject_ratio
+        )
+
+    def add(self, event: StreamEvent | None) -> list[StreamEvent]:
+        """Events to emit for one parsed line (None: it failed to parse).
+
+        That is the event itself plus any edges it released, or nothing if it was held or
+        rejected.
+        """
+        if event is None:
+            return self._reject("invalid")
+        if event.type == "concept":
+            return self._add_node(event, event.id)
+        return self._add_edge(event, event.id, event.source, event.target)
+
+    def finish(self) -> int:
+        """Drop the edges still waiting for an endpoint when the stream ends; returns how many."""
+        dangling = self._pending
+        if dangling:
+            graph_rejects.inc(dangling, reason="dangling")
+            self.rejected += dangling
+        self._waiting.clear()
+        self._pending = 0
+        return dangling
+
+    def _observe(self, rejected: bool) -> None:
+        self.lines += 1
+        self.recent_reject_ratio += _RATIO_ALPHA * (rejected - self.recent_reject_ratio)
+
+    def _reject(self, reason: str) -> list[StreamEvent]:
+        graph_rejects.inc(reason=reason)
+        self.rejected += 1
+        self._observe(True)
+        return []
+
+    def _add_node(self, event: StreamEvent, node_id: str) -> list[StreamEvent]:
+        if node_id in self._order:
+            return self._reject("duplicate")
+        self._order[node_id] = len(self._order)  # new nodes go last, so edges from them are cheap
+        self._children[node_id] = []
+        self._parents[node_id] = []
+        self._observe(False)
+        released = [event]
+        for edge, source, target in self._waiting.pop(node_id, ()):
+            self._pending -= 1
+            linked = self._link(edge, source, target)
+            if linked:
+                released.append(edge)
+            elif linked is False:
+                # Its line was already counted as fine when it arrived; only record the drop
+                graph_rejects.inc(reason="cycle")
+                self.rejected += 1
+        return released
+
+    def _add_edge(self, event: StreamEvent, edge_id: str, source: str, target: str) -> list[StreamEvent]:
+        if edge_id in self._edge_ids or (source, target) in self._pairs:
+            return self._reject("duplicate")
+        if source == target:
+            return self._reject("cycle")
+        if self._pending >= self.max_pending and (source not in self._order or target not in self._order):
+            return self._reject("dangling")
+        self._edge_ids.add(edge_id)
+        self._pairs.add((source, target))
+        linked = self._link(event, source, target)
+        if linked is False:
+            return self._reject("cycle")
+        self._observe(False)
+        return [event] if linked else []
+
+    def _link(self, event: StreamEvent, source: str, target: str) -> bool | None:
+        """Add the edge if both endpoints exist: True, False if it would close a cycle, None if held."""
+        missing = source if source not in self._order else target if target not in self._order else None
+        if missing is not None:
+            self._waiting.setdefault(missing, []).append((event, source, target))
+            self._pending += 1
+            return None
+        if not self._reorder(source, target):
+            return False
+        self._children[source].append(target)
+        self._parents[target].append(source)
+        return True
+
+    def _reorder(self, source: str, target: str) -> bool:
+        """Keep the topological order valid for source -> target; False if the edge closes a cycle."""
+        order = self._order
+        lower, upper = order[target], order[source]
+        if upper < lower:
+            return True
+        # Nodes reachable from target that sit before source in the order (Pearce-Kelly δF)...
+        forward, seen, stack = [], {target}, [target]
+        while stack:
+            node = stack.pop()
+            forward.append(node)
+            for child in self._children[node]:
+                if child == source:
+                    return False
+                if child not in seen and order[child] < upper:
+                    seen.add(child)
+                    stack.append(child)
+        # ...and nodes reaching source that sit after target (δB); δB moves ahead of δF
+        backward, seen, stack = [], {source}, [source]
+        while stack:
+            node = stack.pop()
+            backward.append(node)
+            for parent in self._parents[node]:
+                if parent not in seen and order[parent] > lower:
+                    seen.add(parent)
+                    stack.append(parent)
+        nodes = sorted(backward, key=order.__getitem__) + sorted(forward, key=order.__getitem__)
+        for node, position in zip(nodes, sorted(order[n] for n in nodes)):
+            order[node] = position
+        return True
@@ -0,0 +1,273 @@
+# Bulk resource ingestion: stream JSONL/CSV → batch embed → asyncpg COPY, resumable and deduped by URL
+import asyncio
+import csv
+import json
+import logging
+import time
+import uuid
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Any, TextIO
+
+import asyncpg
+from pgvector.asyncpg import register_vector
+
+from app.core.config import settings
+from app.services.embeddings import BaseEmbeddingService, create_embedding_provider
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("jsonl", "csv")
+RESOURCE_COLUMNS = ("id", "title", "url", "content_summary", "embedding")
+
+# Column limits mirror app.models.resource.Resource
+_TITLE_MAX = 512
+_URL_MAX = 2048
+
+_STAGING_DDL = (
+    "CREATE TEMP TABLE IF NOT EXISTS resources_staging "
+    "(LIKE resources INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+)
+_MERGE_SQL = (
+    "INSERT INTO resources (id, title, url, content_summary, embedding) "
+    "SELECT DISTINCT ON (url) id, title, url, content_summary, embedding "
+    "FROM resources_staging ORDER BY url "
+    "ON CONFLICT (url) DO NOTHING"
+)
+
+
+@dataclass
+class IngestStats:
+    read: int = 0
+    invalid: int = 0
+    duplicates: int = 0
+    inserted: int = 0
+    batches: int = 0
+    resumed_from: int = 0
+    started_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    error: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        d = asdict(self)
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        d["elapsed_seconds"] = round(elapsed, 2)
+        d["rows_per_second"] = round(self.read / elapsed, 1) if elapsed > 0 else 0.0
+        return d
+
+
+class Checkpoint:
+    """Records how many input records are fully committed, so a rerun skips them."""
+
+    def __init__(self, path: str | Path | None, source: str) -> None:
+        self.path = Path(path) if path else None
+        self.source = source
+        self.offset = 0
+        if self.path and self.path.exists():
+            data = json.loads(self.path.read_text())
+            if data.get("source") == source:
+                self.offset = int(data.get("offset", 0))
+
+    def save(self, offset: int) -> None:
+        self.offset = offset
+        if not self.path:
+            return
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps({"source": self.source, "offset": offset}))
+        tmp.replace(self.path)  # atomic, so a crash never leaves a torn checkpoint
+
+
+def iter_records(stream: TextIO, fmt: str, skip: int = 0) -> Iterator[dict[str, Any]]:
+    """Lazily yield raw records; `skip` leading records are passed over without parsing (JSONL)."""
+    if fmt == "jsonl":
+        lines = (line for line in stream if line.strip())
+        for line in islice(lines, skip, None):
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError:
+                yield {}
+                continue
+            yield obj if isinstance(obj, dict) else {}
+    elif fmt == "csv":
+        yield from islice(csv.DictReader(stream), skip, None)
+    else:
+        raise ValueError(f"Unknown ingest format: {fmt}. Use one of {', '.join(FORMATS)}.")
+
+
+def _clean(record: dict[str, Any]) -> tuple[str, str, str] | None:
+    title = str(record.get("title") or "").strip()[:_TITLE_MAX]
+    url = str(record.get("url") or "").strip()
+    summary = str(record.get("content_summary") or record.get("summary") or "").strip()
+    if not title or not url or len(url) > _URL_MAX:
+        return None
+    return title, url, summary or title
+
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    # Binary vector codec; only on these dedicated connections, never on the SQLAlchemy pool
+    await register_vector(conn)
+
+
+async def _load_batch(
+    pool: asyncpg.Pool,
+    embedder: BaseEmbeddingService,
+    rows: list[tuple[str, str, str]],
+    stats: IngestStats,
+) -> None:
+    # Drop in-batch duplicates, then URLs already stored, before paying for embeddings
+    by_url = {url: (title, url, summary) for title, url, summary in rows}
+    async with pool.acquire() as conn:
+        existing = await conn.fetch(
+            "SELECT url FROM resources WHERE url = ANY($1::text[])", list(by_url)
+        )
+    for r in existing:
+        by_url.pop(r["url"], None)
+    stats.duplicates += len(rows) - len(by_url)
+    if not by_url:
+        return
+
+    fresh = list(by_url.values())
+    vectors = await embedder.embed_batch(
+        [f"{title}\n{summary}" for title, _, summary in fresh], kind="document"
+    )
+    records = [
+        (uuid.uuid4(), title, url, summary, vector)
+        for (title, url, summary), vector in zip(fresh, vectors)
+    ]
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            await conn.execute(_STAGING_DDL)
+            await conn.copy_records_to_table(
+                "resources_staging", records=records, columns=RESOURCE_COLUMNS
+            )
+            status = await conn.execute(_MERGE_SQL)
+    inserted = int(status.split()[-1])  # "INSERT 0 <n>"
+    stats.inserted += inserted
+    # Rows that lost an ON CONFLICT race with a concurrent batch/writer
+    stats.duplicates += len(records) - inserted
+
+
+async def ingest_file(
+    path: str | Path,
+    fmt: str,
+    *,
+    batch_size: int | None = None,
+    concurrency: int | None = None,
+    checkpoint_path: str | Path | None = None,
+    embedder: BaseEmbeddingService | None = None,
+    stats: IngestStats | None = None,
+) -> IngestStats:
+    """Ingest a JSONL/CSV file of resources (title, url, content_summary).
+
+    Memory is bounded by concurrency x batch_size records regardless of file size. The
+    checkpoint only advances past batches that are committed and contiguous, so a crash
+    or Ctrl-C resumes without gaps (rows re-read after a crash are deduped by URL).
+    """
+    batch_size = batch_size or settings.ingest_batch_size
+    concurrency = max(1, concurrency or settings.ingest_concurrency)
+    embedder = embedder or create_embedding_provider()
+    stats = stats or IngestStats()
+    checkpoint = Checkpoint(checkpoint_path, source=str(Path(path).resolve()))
+    stats.resumed_from = checkpoint.offset
+
+    pool = await asyncpg.create_pool(
+        settings.asyncpg_dsn,
+        min_size=1,
+        max_size=concurrency,
+        init=_init_connection,
+    )
+    # batch number -> input offset just past that batch; used to advance the checkpoint in order
+    batch_end: dict[int, int] = {}
+    done: set[int] = set()
+    next_commit = 0
+    in_flight: dict[asyncio.Task, int] = {}
+
+    def advance_checkpoint() -> None:
+        nonlocal next_commit
+        advanced = False
+        committed = checkpoint.offset
+        while next_commit in done:
+            done.discard(next_commit)
+            committed = batch_end.pop(next_commit)
+            next_commit += 1
+            advanced = True
+        if advanced:
+            checkpoint.save(committed)
+
+    async def drain(wait_all: bool) -> None:
+        finished, _ = await asyncio.wait(
+            in_flight,
+            return_when=asyncio.ALL_COMPLETED if wait_all else asyncio.FIRST_COMPLETED,
+        )
+        for t in finished:
+            batch_no = in_flight.pop(t)
+            t.result()  # re-raise batch failures
+            done.add(batch_no)
+            stats.batches += 1
+        advance_checkpoint()
+
+    try:
+        with open(path, newline="", encoding="utf-8") as stream:
+            records = iter_records(stream, fmt, skip=checkpoint.offset)
+            offset = checkpoint.offset
+            batch_no = 0
+            while True:
+                # File reads/parsing off the event loop, one batch at a time
+                raw = await asyncio.to_thread(lambda: list(islice(records, batch_size)))
+                if not raw:
+                    break
+                offset += len(raw)
+                stats.read += len(raw)
+                rows = [r for r in map(_clean, raw) if r is not None]
+                stats.invalid += len(raw) - len(rows)
+
+                batch_end[batch_no] = offset
+                in_flight[asyncio.create_task(_load_batch(pool, embedder, rows, stats))] = batch_no
+                batch_no += 1
+                if len(in_flight) >= concurrency:
+                    await drain(wait_all=False)
+            if in_flight:
+                await drain(wait_all=True)
+    except BaseException as e:
+        stats.error = repr(e)
+        for t in in_flight:
+            t.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
+        raise
+    finally:
+        stats.finished_at = time.time()
+        await pool.close()
+        logger.info("Ingest %s finished: %s", path, stats.as_dict())
+    return stats
+
+
+# --- Background jobs for the admin endpoint ---
+_jobs: dict[str, IngestStats] = {}
+_job_tasks: set[asyncio.Task] = set()
+
+
+def start_ingest_job(path: str | Path, fmt: str, delete_after: bool = True) -> str:
+    """Run ingest_file in the background; returns a job id for get_ingest_job."""
+    job_id = uuid.uuid4().hex
+    stats = IngestStats()
+    _jobs[job_id] = stats
+
+    async def run() -> None:
+        try:
+            await ingest_file(path, fmt, stats=stats)
+        except Exception as e:
+            logger.warning("Ingest job %s failed: %s", job_id, e)
+        finally:
+            if delete_after:
+                Path(path).unlink(missing_ok=True)
+
+    task = asyncio.create_task(run())
+    _job_tasks.add(task)  # keep a strong reference until done
+    task.add_done_callback(_job_tasks.discard)
+    return job_id
+
+
+def get_ingest_job(job_id: str) -> IngestStats | None:
+    return _jobs.get(job_id)
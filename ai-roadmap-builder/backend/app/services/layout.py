@@ -0,0 +1,269 @@
+# Layered (Sugiyama-style) roadmap layout: incremental while a generation streams, full pass at the end
+from collections import deque
+from collections.abc import Iterable, Sequence
+
+import orjson
+
+from app.services.sse import StreamEvent, sse_event
+
+try:
+    import numpy as np
+except ImportError:  # optional: the pure-Python pass handles every size
+    np = None
+
+# Spacing between node top-left corners, matching the canvas (180x44 nodes, 80px / 100px gaps)
+NODE_SPACING = 260.0
+LAYER_SPACING = 144.0
+# Barycenter sweeps (alternating down/up) used to reduce edge crossings in the final pass
+_SWEEPS = 4
+# Graphs at least this large use the numpy pass (all layers per sweep instead of one at a time)
+_VECTORIZE_MIN_NODES = 1000
+
+Position = tuple[float, float]
+
+
+def _layers(n: int, edges: Sequence[tuple[int, int]]) -> tuple[list[int], list[tuple[int, int]]]:
+    """Longest-path layer of every node, and the edges kept (cycles are broken by dropping back edges).
+
+    Kahn's algorithm; when only cycles remain, the earliest unplaced node is released and the
+    edges into it from still-unplaced nodes are ignored.
+    """
+    children: list[list[int]] = [[] for _ in range(n)]
+    indegree = [0] * n
+    for s, t in edges:
+        children[s].append(t)
+        indegree[t] += 1
+    layer = [0] * n
+    placed = [False] * n
+    kept: list[tuple[int, int]] = []
+    ready = deque(i for i in range(n) if not indegree[i])
+    remaining, forced = n, 0
+    while remaining:
+        if not ready:
+            while placed[forced]:
+                forced += 1
+            ready.append(forced)
+        i = ready.popleft()
+        if placed[i]:
+            continue
+        placed[i] = True
+        remaining -= 1
+        for t in children[i]:
+            if placed[t]:
+                continue
+            kept.append((i, t))
+            layer[t] = max(layer[t], layer[i] + 1)
+            indegree[t] -= 1
+            if indegree[t] == 0:
+                ready.append(t)
+    return layer, kept
+
+
+def _centered(width: int) -> list[float]:
+    return [k - (width - 1) / 2 for k in range(width)]
+
+
+def _order_python(rows: list[list[int]], edges: list[tuple[int, int]], n: int) -> list[float]:
+    """Slot of every node within its layer (centered on 0) after barycenter sweeps."""
+    parents: list[list[int]] = [[] for _ in range(n)]
+    children: list[list[int]] = [[] for _ in range(n)]
+    for s, t in edges:
+        parents[t].append(s)
+        children[s].append(t)
+    slot = [0.0] * n
+    for row in rows:
+        for i, x in zip(row, _centered(len(row))):
+            slot[i] = x
+    for sweep in range(_SWEEPS):
+        down = sweep % 2 == 0
+        neighbors = parents if down else children
+        for r in range(1, len(rows)) if down else range(len(rows) - 2, -1, -1):
+            row = rows[r]
+            key = {
+                i: sum(slot[j] for j in neighbors[i]) / len(neighbors[i]) if neighbors[i] else slot[i]
+                for i in row
+            }
+            row.sort(key=lambda i: (key[i], slot[i]))
+            for i, x in zip(row, _centered(len(row))):
+                slot[i] = x
+    return slot
+
+
+def _order_numpy(layer: list[int], edges: list[tuple[int, int]], n: int) -> list[float]:
+    """Barycenter sweeps over all layers at once (each layer sees the previous sweep's slots).
+
+    Per sweep: one bincount for every node's barycenter and one lexsort by (layer, key), so
+    the cost doesn't grow with the number of layers the way the layer-by-layer loop does.
+    """
+    layer_of = np.asarray(layer, dtype=np.int64)
+    pairs = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    width = np.bincount(layer_of)
+    first = np.concatenate(([0], np.cumsum(width)[:-1]))  # sorted index of each layer's first node
+    slot = np.zeros(n)
+
+    def assign(order: "np.ndarray") -> None:
+        layers = layer_of[order]
+        slot[order] = np.arange(n) - first[layers] - (width[layers] - 1) / 2
+
+    assign(np.lexsort((np.arange(n), layer_of)))
+    for sweep in range(_SWEEPS):
+        source, target = (pairs[:, 0], pairs[:, 1]) if sweep % 2 == 0 else (pairs[:, 1], pairs[:, 0])
+        sums = np.bincount(target, weights=slot[source], minlength=n)
+        counts = np.bincount(target, minlength=n)
+        key = np.where(counts > 0, sums / np.maximum(counts, 1), slot)
+        assign(np.lexsort((slot, key, layer_of)))
+    return slot.tolist()
+
+
+def layered_layout(node_ids: Iterable[str], edges: Iterable[tuple[str, str]]) -> dict[str, Position]:
+    """Top-to-bottom layered layout: longest-path layers, barycenter ordering, centered rows.
+
+    Edges with unknown endpoints, self-loops and duplicates are ignored; cycles are broken.
+    """
+    index: dict[str, int] = {}
+    for node_id in node_ids:
+        index.setdefault(node_id, len(index))
+    n = len(index)
+    if not n:
+        return {}
+    pairs = list(dict.fromkeys(
+        (index[s], index[t]) for s, t in edges if s in index and t in index and s != t
+    ))
+    layer, kept = _layers(n, pairs)
+    rows: list[list[int]] = [[] for _ in range(max(layer) + 1)]
+    for i in range(n):
+        rows[layer[i]].append(i)
+    if np is not None and n >= _VECTORIZE_MIN_NODES:
+        slot = _order_numpy(layer, kept, n)
+    else:
+        slot = _order_python(rows, kept, n)
+    return {
+        node_id: (slot[i] * NODE_SPACING, layer[i] * LAYER_SPACING)
+        for node_id, i in index.items()
+    }
+
+
+def _position_frame(positions: Iterable[tuple[str, Position]]) -> bytes:
+    return sse_event({
+        "type": "position",
+        "nodes": [{"id": node_id, "position": {"x": x, "y": y}} for node_id, (x, y) in positions],
+    })
+
+
+class StreamingLayout:
+    """Places nodes while a generation streams and reports which ones moved.
+
+    Nodes start in the top layer; an edge pushes its target (and its descendants) below the
+    source (longest-path layering, edges that would close a cycle are ignored). A node leaving
+    a row is replaced by that row's last node, so each move repositions at most two nodes;
+    finish() replaces this rough placement with the full layered_layout.
+    """
+
+    def __init__(self) -> None:
+        self.positions: dict[str, Position] = {}
+        self._layer: dict[str, int] = {}
+        self._children: dict[str, list[str]] = {}
+        self._rows: list[list[str]] = []
+        self._slot: dict[str, int] = {}
+        self._edges: list[tuple[str, str]] = []
+
+    def feed(self, event: StreamEvent) -> bytes | None:
+        """SSE "position" frame for the nodes a streamed node/edge moved (None if none did)."""
+        if event.type == "concept":
+            moved = self.add_node(event.id)
+        elif event.type == "edge":
+            moved = self.add_edge(event.source, event.target)
+        else:
+            return None
+        return _position_frame(moved) if moved else None
+
+    def add_node(self, node_id: str) -> list[tuple[str, Position]]:
+        if node_id in self._layer:
+            return []
+        self._layer[node_id] = 0
+        self._children[node_id] = []
+        if not self._rows:
+            self._rows.append([])
+        self._slot[node_id] = len(self._rows[0])
+        self._rows[0].append(node_id)
+        return self._place([node_id])
+
+    def add_edge(self, source: str, target: str) -> list[tuple[str, Position]]:
+        self._edges.append((source, target))
+        if source == target or source not in self._layer or target not in self._layer:
+            return []
+        need = self._layer[source] + 1
+        # Layers strictly increase along edges, so only an edge that moves its target can close a cycle
+        if self._layer[target] >= need:
+            self._children[source].append(target)
+            return []
+        if self._reaches(target, source):
+            return []
+        self._children[source].append(target)
+        moved: list[str] = []
+        stack = [(target, need)]
+        while stack:
+            node_id, layer = stack.pop()
+            if self._layer[node_id] >= layer:
+                continue
+            moved += self._move(node_id, layer)
+            stack.extend((child, layer + 1) for child in self._children[node_id])
+        return self._place(moved)
+
+    def finish(self) -> bytes | None:
+        """Run the full layout over everything streamed; frame for the nodes it moved."""
+        final = layered_layout(self._layer, self._edges)
+        moved = [(node_id, p) for node_id, p in final.items() if self.positions.get(node_id) != p]
+        self.positions = final
+        return _position_frame(moved) if moved else None
+
+    def _reaches(self, start: str, goal: str) -> bool:
+        seen = {start}
+        stack = [start]
+        while stack:
+            for child in self._children[stack.pop()]:
+                if child == goal:
+                    return True
+                if child not in seen:
+                    seen.add(child)
+                    stack.append(child)
+        return False
+
+    def _move(self, node_id: str, layer: int) -> list[str]:
+        """Move a node to the end of `layer`; returns it and the node that took its old slot."""
+        moved = [node_id]
+        row = self._rows[self._layer[node_id]]
+        last = row.pop()
+        if last != node_id:
+            row[self._slot[node_id]] = last
+            self._slot[last] = self._slot[node_id]
+            moved.append(last)
+        while len(self._rows) <= layer:
+            self._rows.append([])
+        self._slot[node_id] = len(self._rows[layer])
+        self._rows[layer].append(node_id)
+        self._layer[node_id] = layer
+        return moved
+
+    def _place(self, node_ids: list[str]) -> list[tuple[str, Position]]:
+        changed = []
+        for node_id in dict.fromkeys(node_ids):
+            layer = self._layer[node_id]
+            p = (self._slot[node_id] * NODE_SPACING, layer * LAYER_SPACING)
+            if self.positions.get(node_id) != p:
+                self.positions[node_id] = p
+                changed.append((node_id, p))
+        return changed
+
+
+def place_nodes(records: list[bytes], positions: dict[str, Position]) -> list[bytes]:
+    """Encoded node records with their "position" replaced by the layout's (for saving)."""
+    placed = []
+    for record in records:
+        node = orjson.loads(record)
+        p = positions.get(str(node.get("id")))
+        if p is not None:
+            node["position"] = {"x": p[0], "y": p[1]}
+            record = orjson.dumps(node)
+        placed.append(record)
+    return placed
@@ -1,5 +1,17 @@
-from app.services.llm.base import BaseLLMService
+from app.services.llm.base import BaseLLMService, GenerationAborted, LLMError
 from app.services.llm.factory import get_llm_service
 from app.services.llm.gemini import GeminiService
+from app.services.llm.replay import RecordingLLMService, ReplayLLMService
+from app.services.llm.router import Route, RoutingLLMService
 
-__all__ = ["BaseLLMService", "GeminiService", "get_llm_service"]
+__all__ = [
+    "BaseLLMService",
+    "GeminiService",
+    "GenerationAborted",
+    "LLMError",
+    "RecordingLLMService",
+    "ReplayLLMService",
+    "Route",
+    "RoutingLLMService",
+    "get_llm_service",
+]
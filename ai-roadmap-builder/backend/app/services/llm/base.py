@@ -3,9 +3,20 @@ from abc import ABC, abstractmethod
 from collections.abc import AsyncIterator
 
 
+class LLMError(Exception):
+    """Provider failure while streaming (network, quota, blocked prompt)."""
+
+
+class GenerationAborted(LLMError):
+    """The model's output degraded (mostly rejected lines), so the upstream was stopped early."""
+
+
 class BaseLLMService(ABC):
     """Interface for LLM providers. Implementations must support streaming structured output."""
 
+    model_name: str = ""
+    """Identifier of the underlying model (part of the generation cache key)."""
+
     @abstractmethod
     async def generate_stream(
         self,
@@ -15,5 +26,6 @@ class BaseLLMService(ABC):
         """
         Stream raw text chunks from the model (e.g. JSON lines or SSE-friendly chunks).
         Caller is responsible for parsing and validating against Node/Edge schemas.
+        Failures are raised as LLMError; cancelling the iteration stops the provider stream.
         """
         ...
@@ -4,12 +4,67 @@ from functools import lru_cache
 from app.core.config import settings
 from app.services.llm.base import BaseLLMService
 from app.services.llm.gemini import GeminiService
+from app.services.llm.replay import RecordingLLMService, ReplayLLMService
+from app.services.llm.router import Route, RoutingLLMService
+
+
+def create_provider(provider: str, model: str | None = None) -> BaseLLMService:
+    """Bare provider for one model (None = provider default)."""
+    provider = (provider or "gemini").strip().lower()
+    if provider == "gemini":
+        service: BaseLLMService = GeminiService(model_name=model)
+    elif provider == "replay":
+        return ReplayLLMService(
+            recordings_dir=settings.replay_dir or None,
+            chunk_chars=settings.replay_chunk_chars,
+            tokens_per_second=settings.replay_tokens_per_second,
+            jitter=settings.replay_jitter,
+            nodes=settings.replay_nodes,
+            model_name=model,
+        )
+    else:
+        raise ValueError(
+            f"Unknown LLM provider: {provider}. Set LLM_PROVIDER=gemini or replay, or add implementation."
+        )
+    if settings.llm_record_dir:
+        service = RecordingLLMService(service, settings.llm_record_dir)
+    return service
+
+
+def parse_routes(spec: str) -> list[tuple[str, str | None]]:
+    """Parse LLM_ROUTES: "gemini:gemini-2.5-flash, gemini" -> [("gemini", "gemini-2.5-flash"), ("gemini", None)]."""
+    routes = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        provider, _, model = item.partition(":")
+        routes.append((provider.strip().lower(), model.strip() or None))
+    return routes
 
 
 @lru_cache(maxsize=1)
 def get_llm_service() -> BaseLLMService:
-    """Return the configured LLM implementation (e.g. Gemini). Cached per process."""
-    provider = (settings.llm_provider or "gemini").strip().lower()
-    if provider == "gemini":
-        return GeminiService()
-    raise ValueError(f"Unknown LLM provider: {provider}. Set LLM_PROVIDER=gemini or add implementation.")
+    """Return the configured LLM implementation (e.g. Gemini). Cached per process.
+
+    With more than one entry in LLM_ROUTES, returns a RoutingLLMService over them.
+    """
+    routes = parse_routes(settings.llm_routes)
+    if len(routes) <= 1:
+        provider, model = routes[0] if routes else (settings.llm_provider, None)
+        return create_provider(provider, model)
+    services = []
+    for provider, model in routes:
+        service = create_provider(provider, model)
+        services.append(
+            Route(
+                name=f"{provider}:{service.model_name}",
+                service=service,
+                max_in_flight=settings.llm_route_max_in_flight,
+            )
+        )
+    return RoutingLLMService(
+        services,
+        ttft_timeout=settings.llm_ttft_timeout_seconds,
+        hedge_after=settings.llm_hedge_after_seconds,
+    )
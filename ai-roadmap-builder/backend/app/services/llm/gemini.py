@@ -1,55 +1,81 @@
 # Google Gemini implementation of BaseLLMService
-import asyncio
+import hashlib
 from collections.abc import AsyncIterator
+from typing import Any
 
 import google.generativeai as genai
 
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.services.llm.base import BaseLLMService
+from app.services.llm.base import BaseLLMService, LLMError
+
+# GenerativeModel objects kept per distinct system prompt
+_MODEL_CACHE_SIZE = 64
+
+
+def _chunk_text(chunk: Any) -> str:
+    """Text of one streamed chunk; raises LLMError if the prompt was blocked."""
+    feedback = getattr(chunk, "prompt_feedback", None)
+    if feedback is not None and getattr(feedback, "block_reason", 0):
+        raise LLMError(f"Gemini blocked the prompt: {feedback.block_reason}")
+    try:
+        return chunk.text
+    except ValueError:
+        # Chunks without text parts (e.g. a final chunk carrying only finish_reason)
+        return ""
 
 
 class GeminiService(BaseLLMService):
-    """Gemini API streaming; runs sync SDK in executor to avoid blocking the event loop."""
+    """Gemini API streaming via the SDK's async client; no executor threads involved.
+
+    Chunks are pulled from the HTTP stream only as fast as the caller consumes them, so a
+    slow consumer applies backpressure instead of growing an unbounded buffer.
+    """
 
-    def __init__(self, api_key: str | None = None) -> None:
+    model_name = "gemini-2.5-flash"
+
+    def __init__(self, api_key: str | None = None, model_name: str | None = None) -> None:
         key = api_key or settings.gemini_api_key
         if not key:
             raise ValueError("GEMINI_API_KEY is required for GeminiService")
+        if model_name:
+            self.model_name = model_name
         genai.configure(api_key=key)
         self._api_key = key
+        self._generation_config = genai.types.GenerationConfig(
+            temperature=0.3,
+            max_output_tokens=8192,
+        )
+        self._models: TTLCache[str, genai.GenerativeModel] = TTLCache(maxsize=_MODEL_CACHE_SIZE)
+
+    def _model_for(self, system_prompt: str) -> genai.GenerativeModel:
+        key = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+        model = self._models.get(key)
+        if model is None:
+            model = genai.GenerativeModel(
+                self.model_name,
+                system_instruction=system_prompt,
+            )
+            self._models.set(key, model)
+        return model
 
     async def generate_stream(
         self,
         system_prompt: str,
         user_content: str,
     ) -> AsyncIterator[str]:
-        model = genai.GenerativeModel(
-            "gemini-2.5-flash",
-            system_instruction=system_prompt,
-        )
-        loop = asyncio.get_event_loop()
-        queue: asyncio.Queue[str | None] = asyncio.Queue()
-
-        def run_sync_stream() -> None:
-            try:
-                response = model.generate_content(
-                    user_content,
-                    stream=True,
-                    generation_config=genai.types.GenerationConfig(
-                        temperature=0.3,
-                        max_output_tokens=8192,
-                    ),
-                )
-                for chunk in response:
-                    if chunk.text:
-                        queue.put_nowait(chunk.text)
-            finally:
-                queue.put_nowait(None)  # sentinel
-
-        loop.run_in_executor(None, run_sync_stream)
-
-        while True:
-            chunk = await queue.get()
-            if chunk is None:
-                break
-            yield chunk
+        model = self._model_for(system_prompt)
+        try:
+            response = await model.generate_content_async(
+                user_content,
+                stream=True,
+                generation_config=self._generation_config,
+            )
+            async for chunk in response:
+                text = _chunk_text(chunk)
+                if text:
+                    yield text
+        except LLMError:
+            raise
+        except Exception as e:
+            raise LLMError(f"Gemini stream failed: {e}") from e
@@ -0,0 +1,117 @@
+# Offline LLM providers: replay recorded/synthetic JSON-lines streams, and record real ones to disk
+import asyncio
+import hashlib
+import json
+import random
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+from app.services.llm.base import BaseLLMService
+
+# Same rough ratio the orchestrator uses for token accounting
+_CHARS_PER_TOKEN = 4
+RECORDING_SUFFIX = ".jsonl"
+
+
+def recording_key(system_prompt: str, user_content: str) -> str:
+    return hashlib.sha256(f"{system_prompt}\x1f{user_content}".encode("utf-8")).hexdigest()[:32]
+
+
+def synthetic_roadmap(topic: str, nodes: int, seed: int = 0) -> str:
+    """JSON-lines output shaped like the real model's: all nodes, then edges forming a DAG."""
+    rnd = random.Random(f"{seed}:{topic}")
+    topic = topic.strip().splitlines()[-1][:80] if topic.strip() else "Topic"
+    lines = []
+    for i in range(nodes):
+        lines.append(json.dumps({
+            "id": f"node-{i}",
+            "type": "concept",
+            "data": {
+                "label": f"{topic}: part {i + 1}",
+                "description": f"Step {i + 1} of learning {topic}.",
+                "resources": [],
+            },
+        }))
+    for i in range(1, nodes):
+        parent = rnd.randrange(max(0, i - 3), i)
+        lines.append(json.dumps({"id": f"edge-{parent}-{i}", "source": f"node-{parent}", "target": f"node-{i}"}))
+    return "\n".join(lines) + "\n"
+
+
+class ReplayLLMService(BaseLLMService):
+    """Streams canned output at a configurable pace instead of calling a provider.
+
+    Output is the recording for this exact prompt if one exists in `recordings_dir`, else a
+    recording picked deterministically by prompt hash, else a synthetic roadmap. Chunks of
+    `chunk_chars` are paced to `tokens_per_second` (0 = as fast as possible) with +/- `jitter`.
+    """
+
+    def __init__(
+        self,
+        recordings_dir: str | Path | None = None,
+        chunk_chars: int = 64,
+        tokens_per_second: float = 200.0,
+        jitter: float = 0.2,
+        nodes: int = 12,
+        model_name: str | None = None,
+    ) -> None:
+        self.recordings_dir = Path(recordings_dir) if recordings_dir else None
+        self.chunk_chars = max(1, chunk_chars)
+        self.tokens_per_second = tokens_per_second
+        self.jitter = max(0.0, jitter)
+        self.nodes = max(1, nodes)
+        self.model_name = f"replay/{model_name}" if model_name else "replay"
+        # Recordings are read once at startup so replay adds no disk I/O under load
+        self._recordings: dict[str, str] = {}
+        if self.recordings_dir is not None:
+            for path in sorted(self.recordings_dir.glob(f"*{RECORDING_SUFFIX}")):
+                self._recordings[path.stem] = path.read_text(encoding="utf-8")
+        self._ordered = list(self._recordings.values())
+
+    def _output_for(self, system_prompt: str, user_content: str) -> str:
+        key = recording_key(system_prompt, user_content)
+        if key in self._recordings:
+            return self._recordings[key]
+        if self._ordered:
+            return self._ordered[int(key, 16) % len(self._ordered)]
+        return synthetic_roadmap(user_content, self.nodes)
+
+    async def generate_stream(
+        self,
+        system_prompt: str,
+        user_content: str,
+    ) -> AsyncIterator[str]:
+        text = self._output_for(system_prompt, user_content)
+        rnd = random.Random()
+        delay = 0.0
+        if self.tokens_per_second > 0:
+            delay = self.chunk_chars / _CHARS_PER_TOKEN / self.tokens_per_second
+        for i in range(0, len(text), self.chunk_chars):
+            if delay:
+                await asyncio.sleep(delay * (1 + rnd.uniform(-self.jitter, self.jitter)))
+            yield text[i:i + self.chunk_chars]
+
+
+class RecordingLLMService(BaseLLMService):
+    """Passes a provider's stream through and saves each completed output for later replay."""
+
+    def __init__(self, inner: BaseLLMService, recordings_dir: str | Path) -> None:
+        self.inner = inner
+        self.model_name = inner.model_name
+        self.recordings_dir = Path(recordings_dir)
+        self.recordings_dir.mkdir(parents=True, exist_ok=True)
+
+    async def generate_stream(
+        self,
+        system_prompt: str,
+        user_content: str,
+    ) -> AsyncIterator[str]:
+        parts: list[str] = []
+        async for chunk in self.inner.generate_stream(system_prompt, user_content):
+            parts.append(chunk)
+            yield chunk
+        # Only reached when the stream completed (errors and cancellation skip the write)
+        path = self.recordings_dir / f"{recording_key(system_prompt, user_content)}{RECORDING_SUFFIX}"
+        tmp = path.with_suffix(".tmp")
+        await asyncio.to_thread(tmp.write_text, "".join(parts), encoding="utf-8")
+        tmp.replace(path)
@@ -0,0 +1,220 @@
+# Routing LLM service: per-provider concurrency limits, TTFT failover and optional hedging
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+
+from app.core.metrics import registry
+from app.services.llm.base import BaseLLMService, LLMError
+from app.services.stream_parser import LineScanner, parse_line
+
+logger = logging.getLogger(__name__)
+
+route_attempts = registry.counter(
+    "llm_route_attempts_total",
+    "Routed LLM attempts by route and result (won, error, timeout, hedge_lost, cancelled, saturated)",
+)
+route_ttft = registry.histogram(
+    "llm_route_ttft_seconds", "Time from attempt start to first streamed chunk, by route"
+)
+route_first_node = registry.histogram(
+    "llm_route_first_node_seconds", "Time from attempt start to first valid roadmap node, by route"
+)
+
+
+@dataclass
+class Route:
+    """One provider/model the router can send a generation to."""
+
+    name: str
+    service: BaseLLMService
+    max_in_flight: int
+    in_flight: int = 0
+    slots: asyncio.Semaphore = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.slots = asyncio.Semaphore(self.max_in_flight)
+
+    @property
+    def saturated(self) -> bool:
+        return self.in_flight >= self.max_in_flight
+
+
+class _Attempt:
+    """A generation on one route, read ahead until it yields a valid first node.
+
+    The prefetch task buffers chunks; once the router picks this attempt it keeps reading
+    the same generator directly, so the winner streams with normal backpressure.
+    """
+
+    def __init__(self, route: Route, system_prompt: str, user_content: str) -> None:
+        self.route = route
+        self.chunks: list[str] = []
+        self.exhausted = False
+        # The deadline clock includes any wait for a slot on a saturated route
+        self.started = time.monotonic()
+        self.first_chunk: float | None = None
+        self._gen = route.service.generate_stream(system_prompt, user_content)
+        self._holding = False
+        self._closed = False
+        route.in_flight += 1  # counted from launch so concurrent picks see the reservation
+        self.task = asyncio.create_task(self._prefetch())
+
+    async def _prefetch(self) -> None:
+        await self.route.slots.acquire()
+        self._holding = True
+        scanner = LineScanner()
+        async for chunk in self._gen:
+            if self.first_chunk is None:
+                self.first_chunk = time.monotonic()
+                route_ttft.observe(self.first_chunk - self.started, route=self.route.name)
+            self.chunks.append(chunk)
+            for line in scanner.feed(chunk):
+                if self._is_node(line):
+                    return
+        self.exhausted = True
+        if not self._is_node(scanner.flush()):
+            raise LLMError(f"{self.route.name} finished without a valid roadmap node")
+
+    def _is_node(self, line: str) -> bool:
+        event = parse_line(line)
+        if event is None or event.type != "concept":
+            return False
+        route_first_node.observe(time.monotonic() - self.started, route=self.route.name)
+        return True
+
+    async def stream(self) -> AsyncIterator[str]:
+        for chunk in self.chunks:
+            yield chunk
+        if not self.exhausted:
+            async for chunk in self._gen:
+                yield chunk
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if not self.task.done():
+            self.task.cancel()
+            await asyncio.wait((self.task,))
+        await self._gen.aclose()
+        self.route.in_flight -= 1
+        if self._holding:
+            self._holding = False
+            self.route.slots.release()
+
+
+class RoutingLLMService(BaseLLMService):
+    """Sends each generation to the first route with free capacity and fails over on trouble.
+
+    An attempt fails over when it raises, ends without a node, or sends nothing within
+    ttft_timeout seconds. With hedge_after > 0, a second route is started if no valid node
+    has arrived by then; whichever attempt produces a valid first node first is streamed
+    and the other is cancelled. Once an attempt is streamed, its errors reach the caller.
+    """
+
+    def __init__(
+        self,
+        routes: list[Route],
+        ttft_timeout: float,
+        hedge_after: float = 0.0,
+    ) -> None:
+        if not routes:
+            raise ValueError("RoutingLLMService needs at least one route")
+        self.routes = routes
+        self.ttft_timeout = ttft_timeout
+        self.hedge_after = hedge_after
+        # Generations from any route share cache entries keyed on the route set
+        self.model_name = "+".join(r.service.model_name for r in routes)
+
+    def _next_route(self, tried: set[str]) -> Route | None:
+        """First untried route with a free slot; if all are busy, the first untried one (waits)."""
+        untried = [r for r in self.routes if r.name not in tried]
+        for route in untried:
+            if not route.saturated:
+                return route
+            route_attempts.inc(route=route.name, result="saturated")
+        return untried[0] if untried else None
+
+    async def _pick_winner(self, system_prompt: str, user_content: str) -> tuple[_Attempt, list[_Attempt]]:
+        tried: set[str] = set()
+        live: list[_Attempt] = []
+        losers: list[_Attempt] = []
+        last_error: BaseException | None = None
+        hedged = False
+
+        def launch() -> bool:
+            route = self._next_route(tried)
+            if route is None:
+                return False
+            tried.add(route.name)
+            live.append(_Attempt(route, system_prompt, user_content))
+            return True
+
+        def retire(attempt: _Attempt, result: str) -> None:
+            live.remove(attempt)
+            losers.append(attempt)
+            route_attempts.inc(route=attempt.route.name, result=result)
+
+        launch()
+        try:
+            while True:
+                if not live and not launch():
+                    raise LLMError(f"All LLM routes failed: {last_error}") from last_error
+                now = time.monotonic()
+                deadlines: list[float] = []
+                for attempt in list(live):
+                    if attempt.first_chunk is not None:
+                        continue
+                    if now - attempt.started >= self.ttft_timeout:
+                        logger.warning("LLM route %s missed the first-token deadline", attempt.route.name)
+                        retire(attempt, "timeout")
+                        await attempt.close()
+                        last_error = LLMError(f"{attempt.route.name} timed out before first token")
+                    else:
+                        deadlines.append(attempt.started + self.ttft_timeout)
+                if not live:
+                    continue
+                if self.hedge_after > 0 and not hedged:
+                    hedge_at = live[0].started + self.hedge_after
+                    if now >= hedge_at:
+                        hedged = True
+                        launch()
+                    else:
+                        deadlines.append(hedge_at)
+                timeout = max(0.0, min(deadlines) - now) if deadlines else None
+                done, _ = await asyncio.wait(
+                    [a.task for a in live], timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for attempt in [a for a in live if a.task in done]:
+                    error = attempt.task.exception()
+                    if error is None:
+                        live.remove(attempt)
+                        route_attempts.inc(route=attempt.route.name, result="won")
+                        for other in live:
+                            route_attempts.inc(route=other.route.name, result="hedge_lost")
+                        losers.extend(live)
+                        return attempt, losers
+                    logger.warning("LLM route %s failed: %s", attempt.route.name, error)
+                    retire(attempt, "error")
+                    last_error = error
+        except BaseException:
+            for attempt in live:
+                route_attempts.inc(route=attempt.route.name, result="cancelled")
+            losers.extend(live)
+            await asyncio.gather(*(a.close() for a in losers), return_exceptions=True)
+            raise
+
+    async def generate_stream(
+        self,
+        system_prompt: str,
+        user_content: str,
+    ) -> AsyncIterator[str]:
+        winner, losers = await self._pick_winner(system_prompt, user_content)
+        try:
+            await asyncio.gather(*(a.close() for a in losers), return_exceptions=True)
+            async for chunk in winner.stream():
+                yield chunk
+        finally:
+            await winner.close()
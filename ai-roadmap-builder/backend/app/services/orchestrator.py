@@ -1,13 +1,54 @@
 # AI generation pipeline: intent → resource gathering → prompt → LLM stream → validated SSE
-import json
 import re
+import time
 from collections.abc import AsyncIterator
+from contextlib import aclosing
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.schemas.roadmap import EdgeSchema, NodeSchema
-from app.services.llm import get_llm_service
+from app.core.database import async_session_factory
+from app.core.metrics import registry
+from app.services.embeddings import get_embedding_service
+from app.services.generation_cache import cache_key, get_cached_events, store_events
+from app.services.graph_validator import GraphValidator
+from app.services.llm import GenerationAborted, LLMError, get_llm_service
 from app.services.rag import search_resources
+from app.services.semantic_cache import find_similar, store_similar
+from app.services.singleflight import SingleFlight
+from app.services.sse import StreamEvent
+from app.services.stream_parser import LineScanner, is_payload_line, parse_line
+
+# Bump whenever ROADMAP_SYSTEM_PROMPT_TEMPLATE changes so cached generations are not reused
+PROMPT_TEMPLATE_VERSION = "2"
+
+# Rough chars-per-token ratio for JSON-lines output; only used for token accounting
+_CHARS_PER_TOKEN = 4
+
+llm_generations = registry.counter(
+    "llm_generations_total", "Upstream LLM generations by outcome (completed, aborted, error)"
+)
+llm_output_tokens = registry.counter(
+    "llm_output_tokens_total", "Approximate output tokens consumed from the LLM"
+)
+llm_tokens_saved = registry.counter(
+    "llm_output_tokens_saved_total",
+    "Estimated output tokens not generated because aborted streams were stopped early",
+)
+# Where /generate spends its time: intent, cache_lookup, embed, semantic_lookup, resources,
+# prompt, first_chunk, first_node (from LLM call start) and save (recorded by the route)
+generate_stage_seconds = registry.histogram(
+    "generate_stage_seconds", "Latency of each /generate pipeline stage"
+)
+llm_tokens_per_second = registry.histogram(
+    "llm_output_tokens_per_second",
+    "Approximate output token rate of completed generations (after the first chunk)",
+    buckets=(5, 10, 25, 50, 100, 200, 400, 800, 1600),
+)
+stream_lines = registry.counter(
+    "stream_parse_lines_total", "Non-blank LLM output lines by result (accepted, rejected)"
+)
+# Moving average of completed generation sizes; the baseline for the savings estimate
+_avg_output_tokens = 0.0
 
 # Prompt that forces JSON-lines output: one object per line, each either a node or an edge
 # Braces in JSON examples are escaped ({{ }}) so .format() only substitutes {resource_context}.
@@ -18,9 +59,9 @@ Output rules (strict):
 - Each line must be either a NODE or an EDGE.
 
 NODE format (one JSON object per line):
-{{"id": "unique-id", "type": "concept", "position": {{"x": number, "y": number}}, "data": {{"label": "Concept name", "description": "optional short description", "resources": ["url1", "url2"]}}}}
+{{"id": "unique-id", "type": "concept", "data": {{"label": "Concept name", "description": "optional short description", "resources": ["url1", "url2"]}}}}
 - Use unique ids (e.g. "concept-1", "concept-2").
-- Position x,y can be incremental (e.g. 0,0 then 250,0 then 500,0 for rows).
+- Do not include positions; the server lays out the graph.
 - data.label is required; description and resources are optional.
 
 EDGE format (one JSON object per line):
@@ -41,6 +82,17 @@ def _extract_intent(query: str) -> str:
     return s or "general learning path"
 
 
+def _record_generation(output_chars: int, outcome: str) -> None:
+    global _avg_output_tokens
+    tokens = output_chars / _CHARS_PER_TOKEN
+    llm_generations.inc(outcome=outcome)
+    llm_output_tokens.inc(tokens)
+    if outcome == "completed":
+        _avg_output_tokens = tokens if not _avg_output_tokens else 0.9 * _avg_output_tokens + 0.1 * tokens
+    elif outcome == "aborted":
+        llm_tokens_saved.inc(max(0.0, _avg_output_tokens - tokens))
+
+
 def _format_resource_context(resources: list) -> str:
     if not resources:
         return "(No additional resources provided.)"
@@ -50,70 +102,157 @@ def _format_resource_context(resources: list) -> str:
     return "\n".join(parts)
 
 
-async def _gather_resources(db: AsyncSession, query: str) -> list:
-    """Internal RAG + optional external. For MVP we skip vector search if no embedding."""
-    query_embedding: list[float] = []  # TODO: call embedding API (e.g. Gemini embed) when available
+async def _embed_intent(intent: str) -> tuple[list[float], str]:
+    """Embed the normalized intent. Returns ([], "") when no embedder is available."""
+    try:
+        embedder = get_embedding_service()
+        return await embedder.embed(intent), embedder.model_name
+    except Exception:
+        return [], ""
+
+
+async def _gather_resources(db: AsyncSession, query_embedding: list[float]) -> list:
+    """Internal RAG + optional external. Vector search is skipped if there is no embedding."""
     return await search_resources(db, query_embedding)
 
 
 async def generate_roadmap_stream(
     query: str,
     db: AsyncSession,
-) -> AsyncIterator[dict]:
+) -> AsyncIterator[StreamEvent]:
     """
-    Run the full pipeline and yield validated SSE payloads.
-    Each yielded dict is the JSON-serializable event body (e.g. {"type": "concept", ...}).
+    Run the full pipeline and yield validated events.
+    Each StreamEvent carries its JSON body (e.g. {"type": "concept", ...}) encoded once.
+    Repeated intents are replayed from the generation cache without calling the LLM.
+    `db` is only used for the lookups and is closed before anything slow (embedding, the LLM
+    stream, yielding), so no pooled connection stays checked out while a generation streams.
     """
-    intent = _extract_intent(query)
+    with generate_stage_seconds.time(stage="intent"):
+        intent = _extract_intent(query)
+    llm = get_llm_service()
+    key = cache_key(intent, PROMPT_TEMPLATE_VERSION, llm.model_name)
+    try:
+        with generate_stage_seconds.time(stage="cache_lookup"):
+            cached = await get_cached_events(db, key)
+    except Exception:
+        cached = None
+    await db.close()
+    if cached:
+        for event in cached:
+            yield event
+        return
+
+    # Paraphrases miss the exact key; look for a near-duplicate query by embedding
+    with generate_stage_seconds.time(stage="embed"):
+        query_embedding, embedding_model = await _embed_intent(intent)
+    try:
+        with generate_stage_seconds.time(stage="semantic_lookup"):
+            similar = await find_similar(
+                db, query_embedding, PROMPT_TEMPLATE_VERSION, llm.model_name, embedding_model
+            )
+    except Exception:
+        similar = None
+    if similar:
+        await db.close()
+        for event in similar:
+            yield event
+        await store_events(key, intent, PROMPT_TEMPLATE_VERSION, llm.model_name, similar)
+        return
+
     try:
-        resources = await _gather_resources(db, query)
+        with generate_stage_seconds.time(stage="resources"):
+            resources = await _gather_resources(db, query_embedding)
     except Exception:
         resources = []
-    resource_context = _format_resource_context(resources)
+    # The lookups are done: release the connection before the LLM stream (tens of seconds)
+    await db.close()
+    with generate_stage_seconds.time(stage="prompt"):
+        resource_context = _format_resource_context(resources)
+        system_prompt = ROADMAP_SYSTEM_PROMPT_TEMPLATE.format(
+            resource_context=resource_context
+        )
+        user_content = f"Create a learning roadmap for this topic or goal:\n\n{query}"
 
-    system_prompt = ROADMAP_SYSTEM_PROMPT_TEMPLATE.format(
-        resource_context=resource_context
-    )
-    user_content = f"Create a learning roadmap for this topic or goal:\n\n{query}"
+    scanner = LineScanner()
+    validator = GraphValidator()
+    emitted: list[StreamEvent] = []
+    output_chars = 0
+    # Cancellation (client gone, single-flight has no subscribers) lands here as "aborted"
+    outcome = "aborted"
 
-    llm = get_llm_service()
-    buffer = ""
-
-    async for chunk in llm.generate_stream(system_prompt, user_content):
-        buffer += chunk
-        # Try to complete lines and parse each line as JSON
-        while "\n" in buffer:
-            line, buffer = buffer.split("\n", 1)
-            line = line.strip()
-            if not line:
-                continue
-            # Strip possible markdown code fence
-            if line.startswith("```"):
-                continue
-            try:
-                obj = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-            if not isinstance(obj, dict):
-                continue
-            # Validate and yield as node or edge
-            try:
-                if obj.get("type") == "concept" and "id" in obj and "data" in obj:
-                    node = NodeSchema(
-                        id=obj["id"],
-                        type=obj.get("type", "concept"),
-                        position=obj.get("position", {"x": 0, "y": 0}),
-                        data=obj.get("data", {"label": ""}),
-                    )
-                    yield node.to_sse_payload()
-                elif "source" in obj and "target" in obj and "id" in obj:
-                    edge = EdgeSchema(
-                        id=obj["id"],
-                        source=obj["source"],
-                        target=obj["target"],
-                        source_handle=obj.get("source_handle"),
-                        target_handle=obj.get("target_handle"),
+    started = time.perf_counter()
+    first_chunk_at: float | None = None
+    seen_node = False
+
+    def accept(line: str) -> list[StreamEvent]:
+        """Events to emit for one line: parsed, then checked against the graph so far."""
+        nonlocal seen_node
+        if not is_payload_line(line):
+            return []
+        event = parse_line(line)
+        stream_lines.inc(result="rejected" if event is None else "accepted")
+        events = validator.add(event)
+        if events and not seen_node and events[0].type == "concept":
+            seen_node = True
+            generate_stage_seconds.observe(time.perf_counter() - started, stage="first_node")
+        emitted.extend(events)
+        return events
+
+    try:
+        # aclosing: leaving the loop early (abort, cancellation) stops the provider stream right away
+        async with aclosing(llm.generate_stream(system_prompt, user_content)) as chunks:
+            async for chunk in chunks:
+                if first_chunk_at is None:
+                    first_chunk_at = time.perf_counter()
+                    generate_stage_seconds.observe(first_chunk_at - started, stage="first_chunk")
+                output_chars += len(chunk)
+                for line in scanner.feed(chunk):
+                    for event in accept(line):
+                        yield event
+                if validator.degraded:
+                    raise GenerationAborted(
+                        f"Generation stopped: {validator.rejected} of {validator.lines} output lines were invalid"
                     )
-                    yield {"type": "edge", **edge.model_dump(mode="json")}
-            except Exception:
-                continue
+        for event in accept(scanner.flush()):
+            yield event
+        validator.finish()
+        outcome = "completed"
+        if first_chunk_at is not None:
+            streamed = time.perf_counter() - first_chunk_at
+            if streamed > 0:
+                llm_tokens_per_second.observe(output_chars / _CHARS_PER_TOKEN / streamed)
+    except GenerationAborted:
+        raise  # outcome stays "aborted"; the tokens not generated count as saved
+    except LLMError:
+        outcome = "error"
+        raise
+    finally:
+        _record_generation(output_chars, outcome)
+
+    # Only complete generations with at least one node are worth replaying
+    if any(e.type == "concept" for e in emitted):
+        await store_events(key, intent, PROMPT_TEMPLATE_VERSION, llm.model_name, emitted)
+        await store_similar(
+            intent, query_embedding, PROMPT_TEMPLATE_VERSION, llm.model_name, embedding_model, emitted
+        )
+
+
+_generation_flights: SingleFlight[StreamEvent] = SingleFlight("generate")
+
+
+async def _generate_with_own_session(query: str) -> AsyncIterator[StreamEvent]:
+    # The shared upstream outlives any single request, so it cannot borrow a request's session
+    async with async_session_factory() as db:
+        async for event in generate_roadmap_stream(query, db):
+            yield event
+
+
+def stream_roadmap(query: str) -> AsyncIterator[StreamEvent]:
+    """
+    Entry point for /generate. Concurrent requests with the same normalized intent share one
+    upstream LLM stream; late joiners get the events emitted so far, then the live tail.
+    """
+    return _generation_flights.subscribe(
+        _extract_intent(query),
+        lambda: _generate_with_own_session(query),
+    )
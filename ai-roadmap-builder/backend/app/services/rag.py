@@ -2,20 +2,48 @@
 from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.models.resource import Resource
 
 # Limit and dimension must match Resource.embedding
 TOP_K = 5
 
 
+async def set_search_params(
+    db: AsyncSession,
+    ef_search: int | None = None,
+    probes: int | None = None,
+) -> None:
+    """Set ANN recall/latency knobs for the current transaction only (SET LOCAL semantics).
+
+    Both are set so the query works whichever index type is active; the unused one is ignored.
+    """
+    ef = ef_search or settings.resource_hnsw_ef_search
+    pr = probes or settings.resource_ivfflat_probes
+    await db.execute(
+        text(
+            "SELECT set_config('hnsw.ef_search', :ef, true), "
+            "set_config('ivfflat.probes', :probes, true)"
+        ),
+        {"ef": str(int(ef)), "probes": str(int(pr))},
+    )
+
+
 async def search_resources(
     db: AsyncSession,
     query_embedding: list[float],
     top_k: int = TOP_K,
+    ef_search: int | None = None,
+    probes: int | None = None,
 ) -> list[Resource]:
-    """Return resources whose embedding is closest to query_embedding (cosine distance)."""
+    """Return resources whose embedding is closest to query_embedding (cosine distance).
+
+    Uses the ANN index on resources.embedding; ef_search (HNSW) or probes (IVFFlat)
+    trade latency for recall and default to the configured values.
+    """
     if not query_embedding:
         return []
+    await set_search_params(db, ef_search, probes)
     # pgvector cosine distance operator <=>
     stmt = (
         select(Resource)
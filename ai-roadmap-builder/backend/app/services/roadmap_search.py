@@ -0,0 +1,220 @@
+# Hybrid search over a user's roadmaps: full-text + embedding ranks fused with reciprocal rank fusion
+import asyncio
+import hashlib
+import logging
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime
+
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Float, Integer, String, Text, bindparam, cast, literal, select, text, update
+from sqlalchemy.dialects.postgresql import BIT, UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.core.metrics import registry
+from app.models import Roadmap
+from app.models.resource import EMBEDDING_DIM
+from app.services.embeddings import get_embedding_service
+
+logger = logging.getLogger(__name__)
+
+search_signal_seconds = registry.histogram(
+    "roadmap_search_seconds", "/roadmaps/search time by stage (embed, query)"
+)
+embedding_refreshes = registry.counter(
+    "roadmap_embedding_refreshes_total", "Roadmap embedding refreshes by result (embedded, unchanged, error)"
+)
+search_embed_errors = registry.counter(
+    "roadmap_search_embed_errors_total", "Searches that fell back to full-text only because embedding the query failed"
+)
+
+# Characters of title/query/labels embedded per roadmap
+_MAX_EMBED_CHARS = 4000
+
+# Each signal ranks at most `candidates` of the user's roadmaps; fused score is
+# sum(1 / (rrf_k + rank)) over the signals that ranked it. A global ANN index would have to
+# post-filter other users' roadmaps and lose recall, so the vector signal stays per user but
+# never reads every embedding: the Hamming distance of 96-byte sign codes (index-only scan of
+# ix_roadmaps_user_embedding_bits) shortlists `shortlist` rows, and only those are re-ranked by
+# exact cosine distance over the TOASTed 768-d vectors.
+_FTS_CTE = """
+fts AS (
+    SELECT r.id, row_number() OVER (ORDER BY ts_rank_cd(r.search_vector, q.query) DESC, r.id) AS rank
+    FROM roadmaps AS r, websearch_to_tsquery('english', :q) AS q(query)
+    WHERE r.user_id = :user_id AND r.search_vector @@ q.query
+    ORDER BY rank
+    LIMIT :candidates
+)"""
+_VECTOR_CTE = f"""
+vec AS (
+    SELECT r.id, row_number() OVER (ORDER BY r.embedding <=> :embedding, r.id) AS rank
+    FROM (
+        SELECT id FROM roadmaps
+        WHERE user_id = :user_id AND embedding_model = :embedding_model AND embedding_bits IS NOT NULL
+        ORDER BY bit_count(embedding_bits # CAST(:embedding_bits AS bit({EMBEDDING_DIM}))), id
+        LIMIT :shortlist
+    ) AS s
+    JOIN roadmaps AS r ON r.id = s.id
+    ORDER BY rank
+    LIMIT :candidates
+)"""
+
+# embedding_bits() in SQL, for embeddings stored before the column existed (backfill)
+EMBEDDING_BITS_SQL = (
+    "(SELECT string_agg(CASE WHEN x > 0 THEN '1' ELSE '0' END, '' ORDER BY i)"
+    " FROM unnest(CAST(embedding AS real[])) WITH ORDINALITY AS u(x, i))"
+)
+_FUSED_SQL = """
+WITH {ctes},
+fused AS (
+    SELECT id, CAST(sum(1.0 / (:rrf_k + rank)) AS float8) AS score
+    FROM ({ranked}) AS ranked
+    GROUP BY id
+)
+SELECT r.id, r.title, r.created_at, f.score
+FROM fused AS f JOIN roadmaps AS r ON r.id = f.id
+{after}
+ORDER BY f.score DESC, r.id DESC
+LIMIT :limit
+"""
+
+
+def embedding_bits(vector: Sequence[float]) -> str:
+    """Sign code of an embedding ('1' per positive dimension); Hamming distance tracks cosine."""
+    return "".join("1" if x > 0 else "0" for x in vector)
+
+
+@dataclass
+class SearchHit:
+    id: uuid.UUID
+    title: str
+    created_at: datetime | None
+    score: float
+
+
+async def _query_embedding(q: str) -> tuple[list[float], str]:
+    """Embed the search text; ([], "") if no embedder is available (full-text only)."""
+    try:
+        embedder = get_embedding_service()
+        with search_signal_seconds.time(stage="embed"):
+            return await embedder.embed(q, kind="query"), embedder.model_name
+    except Exception:
+        search_embed_errors.inc()
+        logger.warning("Search query embedding failed; using full-text only", exc_info=True)
+        return [], ""
+
+
+async def hybrid_search(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    q: str,
+    limit: int,
+    after: tuple[float, uuid.UUID] | None = None,
+    query_embedding: tuple[list[float], str] | None = None,
+) -> list[SearchHit]:
+    """Rank the user's roadmaps for `q`, best first; `after` is the (score, id) of the last hit seen.
+
+    `query_embedding` is (vector, model) when already known (benchmarks); otherwise `q` is embedded.
+    """
+    embedding, embedding_model = query_embedding or await _query_embedding(q)
+    ctes, ranked = [_FTS_CTE], ["SELECT id, rank FROM fts"]
+    params: dict = {
+        "q": q,
+        "user_id": user_id,
+        "candidates": settings.roadmap_search_candidates,
+        "rrf_k": settings.roadmap_search_rrf_k,
+        "limit": limit,
+    }
+    binds = [
+        bindparam("q", type_=Text),
+        bindparam("user_id", type_=UUID(as_uuid=True)),
+        bindparam("candidates", type_=Integer),
+        bindparam("rrf_k", type_=Integer),
+        bindparam("limit", type_=Integer),
+    ]
+    if embedding:
+        ctes.append(_VECTOR_CTE)
+        ranked.append("SELECT id, rank FROM vec")
+        params.update(
+            embedding=embedding,
+            embedding_bits=embedding_bits(embedding),
+            embedding_model=embedding_model,
+            shortlist=settings.roadmap_search_candidates * max(1, settings.roadmap_search_rerank),
+        )
+        binds += [
+            bindparam("embedding", type_=Vector(EMBEDDING_DIM)),
+            bindparam("embedding_bits", type_=Text),
+            bindparam("embedding_model", type_=String),
+            bindparam("shortlist", type_=Integer),
+        ]
+    keyset = ""
+    if after is not None:
+        keyset = "WHERE (f.score, r.id) < (:after_score, :after_id)"
+        params.update(after_score=after[0], after_id=after[1])
+        binds += [bindparam("after_score", type_=Float), bindparam("after_id", type_=UUID(as_uuid=True))]
+    sql = _FUSED_SQL.format(ctes=",".join(ctes), ranked=" UNION ALL ".join(ranked), after=keyset)
+    with search_signal_seconds.time(stage="query"):
+        rows = (await db.execute(text(sql).bindparams(*binds), params)).all()
+    return [SearchHit(row.id, row.title, row.created_at, row.score) for row in rows]
+
+
+async def refresh_roadmap_embedding(roadmap_id: uuid.UUID) -> None:
+    """Re-embed a roadmap's title, query and node labels if they changed since the last embedding."""
+    async with async_session_factory() as db:
+        row = (
+            await db.execute(
+                select(
+                    Roadmap.version,
+                    Roadmap.title,
+                    Roadmap.topic_query,
+                    Roadmap.embedding_key,
+                    text("ARRAY(SELECT e->'data'->>'label' FROM jsonb_array_elements(roadmaps.nodes) AS e)"),
+                ).where(Roadmap.id == roadmap_id)
+            )
+        ).one_or_none()
+        if row is None:
+            return
+        labels = ", ".join(label for label in row[4] if label)
+        document = f"{row.title}\n{row.topic_query}\n{labels}"[:_MAX_EMBED_CHARS]
+        embedder = get_embedding_service()
+        key = hashlib.sha256(f"{embedder.model_name}\x1f{document}".encode("utf-8")).hexdigest()
+        if key == row.embedding_key:
+            embedding_refreshes.inc(result="unchanged")
+            return
+        vector = await embedder.embed(document, kind="document")
+        # Guarded by version so a slow refresh never overwrites a newer one; updated_at is
+        # kept so the list ETag and Last-Modified don't change
+        await db.execute(
+            update(Roadmap)
+            .where(Roadmap.id == roadmap_id, Roadmap.version == row.version)
+            .values(
+                embedding=vector,
+                embedding_bits=cast(literal(embedding_bits(vector), Text), BIT(EMBEDDING_DIM)),
+                embedding_model=embedder.model_name,
+                embedding_key=key,
+                updated_at=Roadmap.updated_at,
+            )
+        )
+        await db.commit()
+        embedding_refreshes.inc(result="embedded")
+
+
+_refresh_tasks: set[asyncio.Task] = set()
+
+
+def schedule_embedding_refresh(roadmap_id: uuid.UUID) -> None:
+    """Refresh the roadmap's search embedding after the response (embedding calls are slow)."""
+
+    async def run() -> None:
+        try:
+            await refresh_roadmap_embedding(roadmap_id)
+        except Exception:
+            embedding_refreshes.inc(result="error")
+            logger.warning("Embedding refresh failed for roadmap %s", roadmap_id, exc_info=True)
+
+    task = asyncio.create_task(run())
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
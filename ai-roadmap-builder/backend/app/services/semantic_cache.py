@@ -0,0 +1,109 @@
+# Semantic cache: serve a previous roadmap when a new query embeds close to an old one (pgvector)
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Text, cast, delete, literal, select
+from sqlalchemy.dialects.postgresql import JSONB, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_factory
+from app.core.metrics import registry
+from app.models.cache import SemanticCacheEntry
+from app.services.sse import StreamEvent, events_from_json, json_array
+
+logger = logging.getLogger(__name__)
+
+_PRUNE_EVERY = 50
+
+semantic_requests = registry.counter(
+    "semantic_cache_requests_total", "Semantic cache lookups by result (hit, miss)"
+)
+# Distance to the nearest cached query on every lookup; use it to tune semantic_cache_max_distance
+semantic_distance = registry.histogram(
+    "semantic_cache_nearest_distance",
+    "Cosine distance to the nearest cached query embedding",
+    buckets=(0.01, 0.02, 0.04, 0.06, 0.08, 0.1, 0.15, 0.2, 0.3, 0.5, 1.0),
+)
+
+
+async def find_similar(
+    db: AsyncSession,
+    query_embedding: list[float],
+    prompt_version: str,
+    model: str,
+    embedding_model: str,
+) -> list[StreamEvent] | None:
+    """Return events of the nearest cached roadmap if within semantic_cache_max_distance."""
+    if not settings.semantic_cache_enabled or not query_embedding:
+        return None
+    distance = SemanticCacheEntry.embedding.cosine_distance(query_embedding)
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.semantic_cache_ttl_seconds)
+    stmt = (
+        select(SemanticCacheEntry.events, distance.label("distance"))
+        .where(
+            SemanticCacheEntry.prompt_version == prompt_version,
+            SemanticCacheEntry.model == model,
+            SemanticCacheEntry.embedding_model == embedding_model,
+            SemanticCacheEntry.created_at > cutoff,
+        )
+        .order_by(distance)
+        .limit(1)
+    )
+    row = (await db.execute(stmt)).first()
+    if row is None:
+        semantic_requests.inc(result="miss")
+        return None
+    semantic_distance.observe(row.distance)
+    if row.distance > settings.semantic_cache_max_distance:
+        semantic_requests.inc(result="miss")
+        return None
+    semantic_requests.inc(result="hit")
+    return events_from_json(row.events)
+
+
+async def store_similar(
+    intent: str,
+    query_embedding: list[float],
+    prompt_version: str,
+    model: str,
+    embedding_model: str,
+    events: list[StreamEvent],
+) -> None:
+    """Record a finished generation under its query embedding. Best-effort, own session."""
+    if not settings.semantic_cache_enabled or not query_embedding or not events:
+        return
+    now = datetime.now(timezone.utc)
+    stmt = insert(SemanticCacheEntry).values(
+        intent=intent,
+        prompt_version=prompt_version,
+        model=model,
+        embedding_model=embedding_model,
+        embedding=query_embedding,
+        events=cast(literal(json_array([e.data for e in events]), Text), JSONB),
+        created_at=now,
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_semantic_cache_intent",
+        set_={"embedding": stmt.excluded.embedding, "events": stmt.excluded.events, "created_at": now},
+    )
+    try:
+        async with async_session_factory() as session:
+            await session.execute(stmt)
+            if random.randrange(_PRUNE_EVERY) == 0:
+                await _prune(session, now)
+            await session.commit()
+    except Exception as e:
+        logger.warning("Semantic cache write failed: %s", e)
+
+
+async def _prune(session: AsyncSession, now: datetime) -> None:
+    cutoff = now - timedelta(seconds=settings.semantic_cache_ttl_seconds)
+    await session.execute(delete(SemanticCacheEntry).where(SemanticCacheEntry.created_at <= cutoff))
+    overflow = (
+        select(SemanticCacheEntry.id)
+        .order_by(SemanticCacheEntry.created_at.desc())
+        .offset(settings.semantic_cache_max_rows)
+    )
+    await session.execute(delete(SemanticCacheEntry).where(SemanticCacheEntry.id.in_(overflow)))
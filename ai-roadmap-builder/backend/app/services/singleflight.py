@@ -0,0 +1,108 @@
+# Single-flight: identical concurrent requests share one upstream event stream
+import asyncio
+import copy
+from collections.abc import AsyncIterator, Callable
+from typing import Generic, TypeVar
+
+from app.core.metrics import registry
+
+T = TypeVar("T")
+
+flight_subscriptions = registry.counter(
+    "singleflight_subscriptions_total", "Stream subscriptions by role (leader starts upstream, follower joins)"
+)
+
+
+def _own_error(error: BaseException) -> BaseException:
+    """A copy of the upstream's error for one subscriber, so tracebacks don't pile up on one shared instance."""
+    try:
+        return copy.copy(error)
+    except Exception:  # constructor signature it can't be rebuilt from
+        return error
+
+
+class Flight(Generic[T]):
+    """One upstream stream: every event emitted so far, plus completion state."""
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.events: list[T] = []
+        self.done = False
+        self.error: BaseException | None = None
+        self.subscribers = 0
+        self.task: asyncio.Task | None = None
+        self.cond = asyncio.Condition()
+
+
+class SingleFlight(Generic[T]):
+    """Run at most one upstream per key; subscribers replay the backlog, then follow the live tail.
+
+    The upstream is cancelled only when its last subscriber leaves before it finishes.
+    """
+
+    def __init__(self, name: str = "default") -> None:
+        self.name = name
+        self._flights: dict[str, Flight[T]] = {}
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._flights
+
+    async def subscribe(
+        self,
+        key: str,
+        upstream: Callable[[], AsyncIterator[T]],
+    ) -> AsyncIterator[T]:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = Flight(key)
+            self._flights[key] = flight
+            flight.task = asyncio.create_task(self._run(flight, upstream))
+            flight_subscriptions.inc(flight=self.name, role="leader")
+        else:
+            flight_subscriptions.inc(flight=self.name, role="follower")
+        flight.subscribers += 1
+        try:
+            i = 0
+            while True:
+                async with flight.cond:
+                    while i >= len(flight.events) and not flight.done:
+                        await flight.cond.wait()
+                    batch = flight.events[i:]
+                    done = flight.done
+                i += len(batch)
+                for event in batch:
+                    yield event
+                if done and i >= len(flight.events):
+                    if flight.error is not None:
+                        error = _own_error(flight.error)
+                        if error is flight.error:
+                            raise error
+                        raise error from flight.error
+                    return
+        finally:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.done:
+                # Nobody is listening any more: stop paying for the upstream
+                self._flights.pop(key, None)
+                if flight.task is not None:
+                    flight.task.cancel()
+
+    async def _run(self, flight: Flight[T], upstream: Callable[[], AsyncIterator[T]]) -> None:
+        try:
+            async for event in upstream():
+                async with flight.cond:
+                    flight.events.append(event)
+                    flight.cond.notify_all()
+        except asyncio.CancelledError:
+            # Fail the flight for anyone still following it, but let the task end cancelled
+            flight.error = asyncio.CancelledError()
+            raise
+        except Exception as e:
+            flight.error = e
+        finally:
+            # Finished flights stop accepting joiners; later requests start fresh (or hit the cache)
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+            async with flight.cond:
+                flight.done = True
+                flight.cond.notify_all()
@@ -1,7 +1,87 @@
 # SSE response helpers for streaming roadmap to frontend
-import json
+from typing import Any
 
+import orjson
 
-def sse_event(data: dict) -> str:
+
+def sse_event(data: dict) -> bytes:
     """Format a dict as one SSE event (data line + double newline)."""
-    return f"data: {json.dumps(data)}\n\n"
+    return b"data: " + orjson.dumps(data) + b"\n\n"
+
+
+class StreamEvent:
+    """One streamed node/edge event, JSON-encoded exactly once.
+
+    `data` is the SSE payload; `record` is the form persisted in Roadmap.nodes/edges (edges
+    drop the "type" key). The same bytes are shared by every subscriber, the caches and the
+    final save, so nothing is re-encoded per consumer. `payload` is decoded lazily; the graph
+    fields the stream checks per event (`id`, plus `source`/`target` for edges) are kept as
+    attributes so reading them never decodes.
+    """
+
+    __slots__ = ("type", "data", "record", "id", "source", "target", "_payload", "_frame")
+
+    def __init__(
+        self,
+        type: str,
+        data: bytes,
+        record: bytes | None = None,
+        payload: dict[str, Any] | None = None,
+        id: str = "",
+        source: str = "",
+        target: str = "",
+    ) -> None:
+        self.type = type
+        self.data = data
+        self.record = data if record is None else record
+        self.id = id
+        self.source = source
+        self.target = target
+        self._payload = payload
+        self._frame: bytes | None = None
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> "StreamEvent":
+        """Build from a decoded event dict (e.g. rows loaded from a cache table)."""
+        event_type = payload.get("type", "")
+        record = None
+        if event_type == "edge":
+            record = orjson.dumps({k: v for k, v in payload.items() if k != "type"})
+        return cls(
+            event_type,
+            orjson.dumps(payload),
+            record,
+            payload,
+            str(payload.get("id", "")),
+            str(payload.get("source", "")),
+            str(payload.get("target", "")),
+        )
+
+    @classmethod
+    def edge(cls, record: bytes, id: str, source: str, target: str) -> "StreamEvent":
+        """Edge event from its persisted JSON object; the SSE form only adds "type"."""
+        # record is a non-empty JSON object ("{\"id\": ...}"), so splice the key in front
+        return cls("edge", b'{"type":"edge",' + record[1:], record, id=id, source=source, target=target)
+
+    @property
+    def payload(self) -> dict[str, Any]:
+        if self._payload is None:
+            self._payload = orjson.loads(self.data)
+        return self._payload
+
+    @property
+    def frame(self) -> bytes:
+        """Complete SSE frame; built on first use and reused for every subscriber."""
+        if self._frame is None:
+            self._frame = b"data: " + self.data + b"\n\n"
+        return self._frame
+
+
+def json_array(items: list[bytes]) -> str:
+    """Join pre-encoded JSON values into one JSON array text (bind as text and CAST to JSONB)."""
+    return (b"[" + b",".join(items) + b"]").decode("utf-8")
+
+
+def events_from_json(events: list[dict[str, Any]] | None) -> list[StreamEvent]:
+    """Rebuild events from a decoded JSONB array (cache tables)."""
+    return [StreamEvent.from_payload(e) for e in events or []]
@@ -0,0 +1,77 @@
+# Incremental JSON-lines parsing of the LLM stream into validated, pre-encoded events
+import orjson
+from pydantic_core import to_json
+
+from app.schemas.roadmap import EdgeSchema, NodeSchema
+from app.services.sse import StreamEvent
+
+
+class LineScanner:
+    """Splits streamed text into complete lines in linear time.
+
+    Only the unterminated tail is carried between chunks (as a list of fragments joined once
+    its newline arrives), so no character is copied more than twice however long the output.
+    """
+
+    def __init__(self) -> None:
+        self._tail: list[str] = []
+
+    def feed(self, chunk: str) -> list[str]:
+        pieces = chunk.split("\n")
+        if len(pieces) == 1:
+            if chunk:
+                self._tail.append(chunk)
+            return []
+        if self._tail:
+            self._tail.append(pieces[0])
+            pieces[0] = "".join(self._tail)
+            self._tail.clear()
+        last = pieces.pop()
+        if last:
+            self._tail.append(last)
+        return pieces
+
+    def flush(self) -> str:
+        """Remaining text after the stream ends (a final line without trailing newline)."""
+        rest = "".join(self._tail)
+        self._tail.clear()
+        return rest
+
+
+def is_payload_line(line: str) -> bool:
+    """False for blank lines and markdown code fences, which are expected noise, not rejects."""
+    line = line.strip()
+    return bool(line) and not line.startswith("```")
+
+
+def parse_line(line: str) -> StreamEvent | None:
+    """Validate one JSON line as a node or edge; None for blanks, fences and invalid objects."""
+    if not is_payload_line(line):
+        return None
+    try:
+        obj = orjson.loads(line)
+    except orjson.JSONDecodeError:
+        return None
+    if not isinstance(obj, dict):
+        return None
+    try:
+        if obj.get("type") == "concept" and "id" in obj and "data" in obj:
+            node = NodeSchema(
+                id=obj["id"],
+                type=obj.get("type", "concept"),
+                position=obj.get("position", {"x": 0, "y": 0}),
+                data=obj.get("data", {"label": ""}),
+            )
+            return StreamEvent("concept", node.to_sse_json(), id=node.id)
+        if "source" in obj and "target" in obj and "id" in obj:
+            edge = EdgeSchema(
+                id=obj["id"],
+                source=obj["source"],
+                target=obj["target"],
+                source_handle=obj.get("source_handle"),
+                target_handle=obj.get("target_handle"),
+            )
+            return StreamEvent.edge(to_json(edge), edge.id, edge.source, edge.target)
+    except Exception:
+        return None
+    return None
@@ -0,0 +1,76 @@
+# User resolution for auth: token/email -> user id with an in-process TTL cache and race-free get-or-create
+import hashlib
+import time
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.security import decode_access_token
+from app.models import User
+
+user_cache_requests = registry.counter(
+    "auth_user_cache_requests_total", "Auth user-id cache lookups by tier (token, email) and result (hit, miss)"
+)
+
+# Verified token (by hash) -> user id; entries never outlive the token's exp
+_by_token: TTLCache[str, uuid.UUID] = TTLCache(
+    maxsize=settings.auth_cache_max_entries, ttl=settings.auth_cache_ttl_seconds
+)
+_by_email: TTLCache[str, uuid.UUID] = TTLCache(
+    maxsize=settings.auth_cache_max_entries, ttl=settings.auth_cache_ttl_seconds
+)
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+async def get_or_create_user_id(db: AsyncSession, email: str) -> uuid.UUID:
+    """Id of the user with `email`, inserting it first if needed (safe under concurrent first logins)."""
+    user_id = _by_email.get(email)
+    if user_id is not None:
+        user_cache_requests.inc(tier="email", result="hit")
+        return user_id
+    user_cache_requests.inc(tier="email", result="miss")
+
+    user_id = (await db.execute(select(User.id).where(User.email == email))).scalar_one_or_none()
+    if user_id is None:
+        stmt = (
+            insert(User)
+            .values(id=uuid.uuid4(), email=email)
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User.id)
+        )
+        user_id = (await db.execute(stmt)).scalar_one_or_none()
+        if user_id is None:
+            # Lost the race to a concurrent first request; its row is committed by now
+            user_id = (await db.execute(select(User.id).where(User.email == email))).scalar_one()
+        # Commit now: /generate closes its session before streaming, which would roll this back
+        await db.commit()
+    _by_email.set(email, user_id)
+    return user_id
+
+
+async def resolve_user_id(db: AsyncSession, token: str) -> uuid.UUID | None:
+    """User id for a bearer token, or None if the token is invalid. Cached until the token expires."""
+    key = _token_key(token)
+    user_id = _by_token.get(key)
+    if user_id is not None:
+        user_cache_requests.inc(tier="token", result="hit")
+        return user_id
+    user_cache_requests.inc(tier="token", result="miss")
+
+    payload = decode_access_token(token)
+    if not payload:
+        return None
+    # We trust the email from the token because it's signed by our shared secret (via NextAuth)
+    user_id = await get_or_create_user_id(db, payload.email)
+    remaining = payload.exp - time.time()
+    if remaining > 0:
+        _by_token.set(key, user_id, ttl=min(remaining, settings.auth_cache_ttl_seconds))
+    return user_id
@@ -1,12 +1,19 @@
 # FastAPI app entrypoint
 import logging
 from contextlib import asynccontextmanager
+from typing import Any
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 
 from app.api.routes import router
-from app.core.database import init_db
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
+from app.core.database import dispose_engine, init_db, pool_stats, warm_pool
+from app.core.metrics import registry
+from app.core.timing import ServerTimingMiddleware
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +28,11 @@ async def lifespan(app: FastAPI):
             "Auth and roadmap endpoints will fail until the DB is available.",
             e,
         )
+    else:
+        opened = await warm_pool()
+        logger.info("Database pool warmed with %d connection(s)", opened)
     yield
+    await dispose_engine()
 
 
 app = FastAPI(
@@ -45,14 +56,7 @@ env_origins = os.getenv("CORS_ORIGINS")
 if env_origins:
     origins.extend(env_origins.split(","))
 
-@app.middleware("http")
-async def debug_cors_middleware(request, call_next):
-    origin = request.headers.get("origin")
-    print(f"DEBUG CORS: Incoming Request Origin: {origin}")
-    print(f"DEBUG CORS: Allowed Origins: {origins}")
-    response = await call_next(request)
-    print(f"DEBUG CORS: Response Status: {response.status_code}")
-    return response
+logger.info("CORS allowed origins: %s", origins)
 
 app.add_middleware(
     CORSMiddleware,
@@ -61,7 +65,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Next-Cursor", "X-Total-Count", "ETag", "Last-Modified"],
 )
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
+# Added late so it is outer: timings cover CORS handling and compression too
+app.add_middleware(ServerTimingMiddleware)
+# Outermost: behind the reverse proxy, request.client is the proxy; take the caller's IP from
+# X-Forwarded-For when the hop is trusted, so anonymous callers don't share one admission key
+app.add_middleware(ProxyHeadersMiddleware, trusted_hosts=settings.forwarded_allow_ips)
 
 app.include_router(router, prefix="/api")
 
@@ -69,3 +86,15 @@ app.include_router(router, prefix="/api")
 @app.get("/health")
 async def health() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@app.get("/health/db")
+async def health_db() -> dict[str, Any]:
+    """Connection pool stats (checked-out, waiters, wait time) for monitoring."""
+    return pool_stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """All in-process metrics (stage latencies, DB queries, pool, caches) in Prometheus text format."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
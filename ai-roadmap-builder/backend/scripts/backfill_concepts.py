@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+"""Backfill the concept index (roadmap_nodes, roadmap_edges, concept_prerequisites) from roadmaps.
+
+Walks roadmaps in id order in batches, one transaction per batch, so it can run against a
+live database; new saves keep themselves in sync. Re-syncing a roadmap is idempotent, and
+the last id of each batch is printed, so an interrupted run resumes with --after <id>.
+
+Usage (from the backend dir):
+    python scripts/backfill_concepts.py
+    python scripts/backfill_concepts.py --batch-size 200 --after 5f0c...-...
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from pathlib import Path
+
+from sqlalchemy import select
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.database import async_session_factory, dispose_engine, init_db  # noqa: E402
+from app.models import Roadmap  # noqa: E402
+from app.services.concepts import sync_roadmap_concepts  # noqa: E402
+
+
+async def run(args: argparse.Namespace) -> None:
+    await init_db()  # creates the concept tables if they don't exist yet
+    last = uuid.UUID(args.after) if args.after else None
+    done = 0
+    started = time.perf_counter()
+    try:
+        while True:
+            async with async_session_factory() as session:
+                stmt = select(Roadmap.id).order_by(Roadmap.id).limit(args.batch_size)
+                if last is not None:
+                    stmt = stmt.where(Roadmap.id > last)
+                ids = list((await session.execute(stmt)).scalars())
+                if not ids:
+                    break
+                await sync_roadmap_concepts(session, ids)
+                await session.commit()
+            done += len(ids)
+            last = ids[-1]
+            rate = done / max(time.perf_counter() - started, 1e-9)
+            print(f"  synced={done} last_id={last} ({rate:.0f} roadmaps/s)", flush=True)
+            if args.pause:
+                await asyncio.sleep(args.pause)
+    finally:
+        await dispose_engine()
+    print(f"done: {done} roadmaps")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--after", help="resume after this roadmap id")
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between batches")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
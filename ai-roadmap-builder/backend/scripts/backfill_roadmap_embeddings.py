@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""Embed saved roadmaps that have no search embedding yet (for /roadmaps/search).
+
+New and edited roadmaps are embedded automatically after each save; this covers rows saved
+before search existed or while the embedder was unavailable, and fills the sign codes
+(embedding_bits) that the vector shortlist reads for embeddings stored before that column
+existed. The full-text half of search needs no backfill (search_vector is a generated
+column). Safe to rerun.
+
+Usage (from the backend dir):
+    python scripts/backfill_roadmap_embeddings.py
+    python scripts/backfill_roadmap_embeddings.py --batch-size 200 --concurrency 8
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import select, text
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.database import async_session_factory, dispose_engine, init_db  # noqa: E402
+from app.models import Roadmap  # noqa: E402
+from app.models.resource import EMBEDDING_DIM  # noqa: E402
+from app.services.roadmap_search import EMBEDDING_BITS_SQL, refresh_roadmap_embedding  # noqa: E402
+
+
+async def run(args: argparse.Namespace) -> None:
+    await init_db()  # adds the search columns if they don't exist yet
+    async with async_session_factory() as session:
+        coded = await session.execute(
+            text(
+                f"UPDATE roadmaps SET embedding_bits = CAST({EMBEDDING_BITS_SQL} AS bit({EMBEDDING_DIM}))"
+                " WHERE embedding IS NOT NULL AND embedding_bits IS NULL"
+            )
+        )
+        await session.commit()
+    print(f"sign codes filled: {coded.rowcount}")
+    gate = asyncio.Semaphore(args.concurrency)
+    done = 0
+    last = None
+    started = time.perf_counter()
+
+    async def refresh(roadmap_id) -> None:
+        async with gate:
+            await refresh_roadmap_embedding(roadmap_id)
+
+    try:
+        while True:
+            async with async_session_factory() as session:
+                stmt = (
+                    select(Roadmap.id)
+                    .where(Roadmap.embedding_key.is_(None))
+                    .order_by(Roadmap.id)
+                    .limit(args.batch_size)
+                )
+                if last is not None:
+                    stmt = stmt.where(Roadmap.id > last)
+                ids = list((await session.execute(stmt)).scalars())
+            if not ids:
+                break
+            await asyncio.gather(*(refresh(i) for i in ids))
+            done += len(ids)
+            last = ids[-1]
+            rate = done / max(time.perf_counter() - started, 1e-9)
+            print(f"  embedded={done} last_id={last} ({rate:.1f} roadmaps/s)", flush=True)
+    finally:
+        await dispose_engine()
+    print(f"done: {done} roadmaps")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4, help="roadmaps embedded at once")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""Benchmark response compression: CPU cost vs bytes saved per encoding and level.
+
+Two workloads built from a synthetic roadmap: the full roadmap JSON document (one-shot
+compression, as for GET /roadmaps/{id}) and the /generate SSE stream, compressed as a
+stream and flushed after every event exactly like CompressionMiddleware does. Brotli rows
+appear only when the brotli package is installed.
+
+Usage (from the backend dir; no database or API key needed):
+    python scripts/bench_compression.py --nodes 10 100 1000
+    python scripts/bench_compression.py --gzip-levels 1 6 9 --brotli-qualities 1 4 6
+"""
+import argparse
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.compression import _BrotliEncoder, _Encoder, _GzipEncoder, brotli  # noqa: E402
+from app.services.llm.replay import synthetic_roadmap  # noqa: E402
+from app.services.sse import json_array  # noqa: E402
+from app.services.stream_parser import parse_line  # noqa: E402
+
+
+def _workloads(n_nodes: int) -> tuple[bytes, list[bytes]]:
+    events = [e for e in map(parse_line, synthetic_roadmap("Distributed systems", n_nodes).splitlines()) if e]
+    nodes = [e.record for e in events if e.type == "concept"]
+    edges = [e.record for e in events if e.type == "edge"]
+    document = f'{{"nodes": {json_array(nodes)}, "edges": {json_array(edges)}}}'.encode("utf-8")
+    return document, [e.frame for e in events]
+
+
+def _document(make: Callable[[], _Encoder], body: bytes) -> int:
+    encoder = make()
+    return len(encoder.compress(body) + encoder.finish())
+
+
+def _stream(make: Callable[[], _Encoder], frames: list[bytes]) -> int:
+    encoder = make()
+    total = 0
+    for frame in frames:
+        total += len(encoder.compress(frame) + encoder.flush())
+    return total + len(encoder.finish())
+
+
+def _measure(fn: Callable[[], int], repeat: int) -> tuple[float, int]:
+    """Best-of CPU seconds and output bytes."""
+    best, size = float("inf"), 0
+    for _ in range(repeat):
+        start = time.process_time()
+        size = fn()
+        best = min(best, time.process_time() - start)
+    return best, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--gzip-levels", type=int, nargs="+", default=[1, 6, 9])
+    parser.add_argument("--brotli-qualities", type=int, nargs="+", default=[1, 4, 6, 11])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    encoders: list[tuple[str, Callable[[], _Encoder]]] = [
+        (f"gzip-{level}", lambda level=level: _GzipEncoder(level)) for level in args.gzip_levels
+    ]
+    if brotli is not None:
+        encoders += [(f"br-{q}", lambda q=q: _BrotliEncoder(q)) for q in args.brotli_qualities]
+    else:
+        print("brotli not installed: gzip only\n")
+
+    print(f"{'nodes':>6} {'workload':<9}{'encoding':<10}{'in B':>10}{'out B':>10}{'ratio':>7}{'cpu us':>10}{'MB/s':>8}")
+    for n in args.nodes:
+        document, frames = _workloads(n)
+        raw_stream = sum(len(f) for f in frames)
+        for name, make in encoders:
+            for workload, fn, size_in in (
+                ("document", lambda: _document(make, document), len(document)),
+                ("sse", lambda: _stream(make, frames), raw_stream),
+            ):
+                cpu, size_out = _measure(fn, args.repeat)
+                throughput = size_in / cpu / 1e6 if cpu > 0 else float("inf")
+                print(
+                    f"{n:>6} {workload:<9}{name:<10}{size_in:>10}{size_out:>10}"
+                    f"{size_in / size_out:>7.2f}{cpu * 1e6:>10.0f}{throughput:>8.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""Benchmark the roadmap layout engine: streamed placement, final pass (Python vs numpy).
+
+Graphs are random DAGs shaped like generated roadmaps (each node hangs off one of the few
+nodes before it) plus some cross edges. "stream" feeds every node, then every edge, to a
+StreamingLayout as /generate does; "final" times layered_layout with each ordering pass
+(numpy only if installed; /generate and /roadmaps/{id}/layout use it from 1,000 nodes).
+
+Usage (from the backend dir; no database needed):
+    python scripts/bench_layout.py --nodes 15 100 1000 5000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services import layout  # noqa: E402
+
+
+def _graph(n: int, seed: int) -> tuple[list[str], list[tuple[str, str]]]:
+    rnd = random.Random(seed)
+    ids = [f"node-{i}" for i in range(n)]
+    edges = [(ids[rnd.randrange(max(0, i - 4), i)], ids[i]) for i in range(1, n)]
+    edges += [(ids[rnd.randrange(n)], ids[rnd.randrange(n)]) for _ in range(n // 4)]
+    return ids, edges
+
+
+def _best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[15, 100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    def stream(ids: list[str], edges: list[tuple[str, str]]) -> int:
+        engine = layout.StreamingLayout()
+        updates = sum(len(engine.add_node(i)) for i in ids)
+        updates += sum(len(engine.add_edge(s, t)) for s, t in edges)
+        engine.finish()
+        return updates
+
+    passes = {"python": None}
+    if layout.np is not None:
+        passes["numpy"] = 0
+    print(f"{'nodes':>6} {'edges':>6} {'stream ms':>10} {'updates':>8} " + " ".join(f"{p + ' ms':>10}" for p in passes))
+    for n in args.nodes:
+        ids, edges = _graph(n, seed=n)
+        stream_ms = _best_ms(lambda: stream(ids, edges), args.repeat)
+        timings = []
+        for name, threshold in passes.items():
+            saved = layout._VECTORIZE_MIN_NODES
+            layout._VECTORIZE_MIN_NODES = threshold if threshold is not None else float("inf")
+            try:
+                timings.append(_best_ms(lambda: layout.layered_layout(ids, edges), args.repeat))
+            finally:
+                layout._VECTORIZE_MIN_NODES = saved
+        cols = " ".join(f"{t:>10.2f}" for t in timings)
+        print(f"{n:>6} {len(edges):>6} {stream_ms:>10.2f} {stream(ids, edges):>8} {cols}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""Benchmark GET /roadmaps/{id} serialization: decoded JSONB + RoadmapFullSchema vs JSON-text passthrough.
+
+Both paths run as FastAPI routes called in-process over ASGI, so routing, response_model
+handling and body rendering are included. The legacy route gets nodes/edges the way asyncpg
+hands JSONB to SQLAlchemy (JSON text, decoded with json.loads) and rebuilds the schema; the
+passthrough route returns the text Postgres renders with jsonb_build_object(...)::text. The
+database-side cost (the same jsonb -> text output in both cases) is not measured.
+
+Usage (from the backend dir; no database needed):
+    python scripts/bench_roadmap_response.py --nodes 10 100 1000
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+from fastapi import FastAPI, Response
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.schemas.roadmap import RoadmapFullSchema  # noqa: E402
+
+
+def _stored(n_nodes: int, seed: int) -> tuple[str, str]:
+    """nodes and edges as the JSON text Postgres sends for the two JSONB columns."""
+    rnd = random.Random(seed)
+    nodes = [
+        {
+            "id": f"n{i}",
+            "type": "concept",
+            "position": {"x": rnd.randint(0, 2000), "y": i * 120},
+            "data": {
+                "label": f"Concept {i}",
+                "description": "A short explanation of the concept and why it matters. " * 2,
+                "resources": [f"https://example.com/docs/{i}"],
+            },
+        }
+        for i in range(n_nodes)
+    ]
+    edges = [
+        {"id": f"e{i}", "source": f"n{rnd.randrange(i)}", "target": f"n{i}"}
+        for i in range(1, n_nodes)
+    ]
+    return json.dumps(nodes), json.dumps(edges)
+
+
+def _app(nodes_text: str, edges_text: str) -> FastAPI:
+    app = FastAPI()
+    created_at = "2026-01-01T12:00:00.000000+00:00"
+    document = (
+        f'{{"id": "00000000-0000-0000-0000-000000000001", "edges": {edges_text}, "nodes": {nodes_text}, '
+        f'"title": "Bench", "version": 1, "created_at": "{created_at}", "topic_query": "bench"}}'
+    )
+
+    @app.get("/legacy", response_model=RoadmapFullSchema)
+    async def legacy() -> RoadmapFullSchema:
+        return RoadmapFullSchema(
+            id="00000000-0000-0000-0000-000000000001",
+            title="Bench",
+            topic_query="bench",
+            nodes=json.loads(nodes_text) or [],
+            edges=json.loads(edges_text) or [],
+            created_at=created_at,
+            version=1,
+        )
+
+    @app.get("/passthrough", response_model=RoadmapFullSchema)
+    async def passthrough() -> Response:
+        return Response(content=document, media_type="application/json")
+
+    return app
+
+
+async def _call(app: FastAPI, path: str) -> bytes:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "root_path": "", "headers": [], "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80),
+    }
+    body = bytearray()
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return bytes(body)
+
+
+async def _measure(app: FastAPI, path: str, repeat: int) -> tuple[float, int]:
+    """Mean CPU seconds per request over `repeat` calls (after one warm-up), response size."""
+    size = len(await _call(app, path))
+    start = time.process_time()
+    for _ in range(repeat):
+        await _call(app, path)
+    return (time.process_time() - start) / repeat, size
+
+
+async def run(args: argparse.Namespace) -> None:
+    print(f"{'nodes':>7}{'bytes':>10}{'legacy us':>12}{'passthrough us':>16}{'speedup':>9}")
+    for n in args.nodes:
+        app = _app(*_stored(n, args.seed))
+        legacy_body = json.loads(await _call(app, "/legacy"))
+        if legacy_body != json.loads(await _call(app, "/passthrough")):
+            raise SystemExit(f"response mismatch at {n} nodes")
+        repeat = max(5, args.repeat // max(1, n // 10))
+        old, size = await _measure(app, "/legacy", repeat)
+        new, _ = await _measure(app, "/passthrough", repeat)
+        print(f"{n:>7}{size:>10}{old * 1e6:>12.0f}{new * 1e6:>16.0f}{old / new:>8.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=2000, help="requests at 10 nodes (scaled down for larger)")
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
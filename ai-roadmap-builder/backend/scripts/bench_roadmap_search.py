@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+"""Benchmark /roadmaps/search: hybrid_search latency and the vector shortlist's recall.
+
+Generates --roadmaps synthetic roadmaps for one bench user (kept between runs unless
+--drop): titles and labels from a small vocabulary, embeddings clustered around --topics
+random centers the way real roadmaps cluster by subject. Each query runs the real
+hybrid_search (full-text + sign-code shortlist + exact re-rank, fused), and the vector
+signal's top --k is compared with an exact scan over all of the user's embeddings.
+
+Usage (from the backend dir, against a scratch database):
+    python scripts/bench_roadmap_search.py --roadmaps 10000
+    python scripts/bench_roadmap_search.py --roadmaps 10000 --rerank 1 2 4 8 --drop
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import text  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import async_session_factory, dispose_engine, init_db  # noqa: E402
+from app.models.resource import EMBEDDING_DIM  # noqa: E402
+from app.services.roadmap_search import EMBEDDING_BITS_SQL, hybrid_search  # noqa: E402
+
+BENCH_EMAIL = "bench-roadmap-search@example.invalid"
+BENCH_MODEL = "bench"
+WORDS = (
+    "python rust go typescript react kubernetes docker postgres sql statistics linear algebra "
+    "calculus machine learning deep networks compilers operating systems security cryptography "
+    "design testing cloud networking graphics audio mobile android ios data pipelines spark"
+).split()
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _vector(center: list[float], noise: float) -> list[float]:
+    return [c + random.gauss(0, noise) for c in center]
+
+
+async def _prepare(user_id: uuid.UUID, n: int, centers: list[list[float]], noise: float) -> None:
+    async with async_session_factory() as db:
+        await db.execute(
+            text("INSERT INTO users (id, email, created_at) VALUES (:id, :email, now()) ON CONFLICT (email) DO NOTHING"),
+            {"id": user_id, "email": BENCH_EMAIL},
+        )
+        existing = (
+            await db.execute(text("SELECT count(*) FROM roadmaps WHERE user_id = :u"), {"u": user_id})
+        ).scalar_one()
+        if existing == n:
+            print(f"  reusing {n} roadmaps")
+            return
+        await db.execute(text("DELETE FROM roadmaps WHERE user_id = :u"), {"u": user_id})
+        start = time.perf_counter()
+        for lo in range(0, n, 1000):
+            rows = []
+            for _ in range(lo, min(n, lo + 1000)):
+                words = random.sample(WORDS, 4)
+                labels = [{"id": f"n{i}", "data": {"label": w}} for i, w in enumerate(random.sample(WORDS, 8))]
+                rows.append({
+                    "id": uuid.uuid4(),
+                    "title": " ".join(words[:2]),
+                    "query": " ".join(words),
+                    "nodes": json.dumps(labels),
+                    "embedding": str(_vector(random.choice(centers), noise)),
+                })
+            await db.execute(
+                text(
+                    "INSERT INTO roadmaps (id, user_id, title, topic_query, nodes, edges, created_at, "
+                    "embedding, embedding_model) VALUES (:id, :user_id, :title, :query, CAST(:nodes AS jsonb), "
+                    "'[]'::jsonb, now(), CAST(:embedding AS vector), :model)"
+                ),
+                [{**row, "user_id": user_id, "model": BENCH_MODEL} for row in rows],
+            )
+        await db.execute(
+            text(
+                f"UPDATE roadmaps SET embedding_bits = CAST({EMBEDDING_BITS_SQL} AS bit({EMBEDDING_DIM})) "
+                "WHERE user_id = :u"
+            ),
+            {"u": user_id},
+        )
+        await db.execute(text("ANALYZE roadmaps"))
+        await db.commit()
+        print(f"  generated {n} roadmaps in {time.perf_counter() - start:.1f}s")
+
+
+async def _exact_top(user_id: uuid.UUID, vector: list[float], k: int) -> set[uuid.UUID]:
+    async with async_session_factory() as db:
+        rows = await db.execute(
+            text(
+                "SELECT id FROM roadmaps WHERE user_id = :u AND embedding_model = :m "
+                "ORDER BY embedding <=> CAST(:e AS vector), id LIMIT :k"
+            ),
+            {"u": user_id, "m": BENCH_MODEL, "e": str(vector), "k": k},
+        )
+        return {row.id for row in rows}
+
+
+async def _shortlist_top(user_id: uuid.UUID, vector: list[float], k: int) -> set[uuid.UUID]:
+    # The vector signal on its own: an empty full-text query ranks nothing
+    async with async_session_factory() as db:
+        hits = await hybrid_search(db, user_id, "", k, query_embedding=(vector, BENCH_MODEL))
+    return {hit.id for hit in hits}
+
+
+async def run(args: argparse.Namespace) -> None:
+    random.seed(args.seed)
+    await init_db()
+    centers = [[random.gauss(0, 1) for _ in range(EMBEDDING_DIM)] for _ in range(args.topics)]
+    async with async_session_factory() as db:
+        found = (await db.execute(text("SELECT id FROM users WHERE email = :e"), {"e": BENCH_EMAIL})).scalar()
+    user_id = found or uuid.uuid4()
+    print(f"== {args.roadmaps} roadmaps, {args.topics} topics, dim={EMBEDDING_DIM}")
+    await _prepare(user_id, args.roadmaps, centers, args.noise)
+
+    queries = [(" ".join(random.sample(WORDS, 2)), _vector(random.choice(centers), args.noise)) for _ in range(args.queries)]
+    truths = [await _exact_top(user_id, vector, args.k) for _, vector in queries]
+    print(f"  {'rerank':<10}{'recall@' + str(args.k):>10}{'p50 ms':>10}{'p99 ms':>10}")
+    try:
+        for rerank in args.rerank:
+            settings.roadmap_search_rerank = rerank
+            recalls = [
+                len(await _shortlist_top(user_id, vector, args.k) & truth) / max(1, len(truth))
+                for (_, vector), truth in zip(queries, truths)
+            ]
+            latencies = []
+            for q, vector in queries:
+                async with async_session_factory() as db:
+                    start = time.perf_counter()
+                    await hybrid_search(db, user_id, q, args.k, query_embedding=(vector, BENCH_MODEL))
+                    latencies.append(time.perf_counter() - start)
+            print(
+                f"  {rerank:<10}{statistics.mean(recalls):>10.3f}"
+                f"{_percentile(latencies, 0.5) * 1000:>10.2f}{_percentile(latencies, 0.99) * 1000:>10.2f}"
+            )
+    finally:
+        if args.drop:
+            async with async_session_factory() as db:
+                await db.execute(text("DELETE FROM users WHERE id = :u"), {"u": user_id})
+                await db.commit()
+        await dispose_engine()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--roadmaps", type=int, default=10_000)
+    parser.add_argument("--topics", type=int, default=50, help="embedding clusters")
+    parser.add_argument("--noise", type=float, default=0.6, help="spread of a cluster around its center")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rerank", type=int, nargs="+", default=[settings.roadmap_search_rerank])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--drop", action="store_true", help="delete the bench user and roadmaps afterwards")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
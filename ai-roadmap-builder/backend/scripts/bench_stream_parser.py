@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+"""Benchmark the /generate stream parser: legacy buffer-splitting loop vs LineScanner + StreamEvent.
+
+Feeds synthetic JSON-lines model output (nodes then edges) in small chunks, the way the LLM
+streams it, and reports CPU time and peak traced memory per emitted event. Both paths produce
+the SSE frames and the records saved to the roadmap, so the comparison covers the whole
+per-event work between the LLM and the socket.
+
+Usage (from the backend dir; no database or API key needed):
+    python scripts/bench_stream_parser.py --nodes 50 200 1000 --chunk 16 64
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.schemas.roadmap import EdgeSchema, NodeSchema  # noqa: E402
+from app.services.sse import json_array  # noqa: E402
+from app.services.stream_parser import LineScanner, parse_line  # noqa: E402
+
+
+def _synthetic_output(n_nodes: int, seed: int) -> str:
+    rnd = random.Random(seed)
+    lines = []
+    for i in range(n_nodes):
+        lines.append(json.dumps({
+            "id": f"n{i}",
+            "type": "concept",
+            "position": {"x": rnd.randint(0, 2000), "y": i * 120},
+            "data": {
+                "label": f"Concept {i}",
+                "description": "A short explanation of the concept and why it matters. " * 2,
+                "resources": [f"https://example.com/docs/{i}"],
+            },
+        }))
+    for i in range(1, n_nodes):
+        lines.append(json.dumps({"id": f"e{i}", "source": f"n{rnd.randrange(i)}", "target": f"n{i}"}))
+    return "\n".join(lines) + "\n"
+
+
+def _chunks(text: str, size: int) -> Iterator[str]:
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+
+def legacy(chunks: list[str]) -> int:
+    """The pre-StreamEvent loop: re-split the buffer, model_dump, copy edges, json.dumps per frame."""
+    buffer = ""
+    frames: list[str] = []
+    nodes: list[dict] = []
+    edges: list[dict] = []
+    for chunk in chunks:
+        buffer += chunk
+        while "\n" in buffer:
+            line, buffer = buffer.split("\n", 1)
+            line = line.strip()
+            if not line or line.startswith("```"):
+                continue
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(obj, dict):
+                continue
+            if obj.get("type") == "concept" and "id" in obj and "data" in obj:
+                payload = NodeSchema(
+                    id=obj["id"],
+                    type=obj.get("type", "concept"),
+                    position=obj.get("position", {"x": 0, "y": 0}),
+                    data=obj.get("data", {"label": ""}),
+                ).to_sse_payload()
+                nodes.append(payload)
+            elif "source" in obj and "target" in obj and "id" in obj:
+                edge = EdgeSchema(
+                    id=obj["id"],
+                    source=obj["source"],
+                    target=obj["target"],
+                    source_handle=obj.get("source_handle"),
+                    target_handle=obj.get("target_handle"),
+                )
+                payload = {"type": "edge", **edge.model_dump(mode="json")}
+                edges.append({k: payload.get(k) for k in ("id", "source", "target", "source_handle", "target_handle")})
+            else:
+                continue
+            frames.append(f"data: {json.dumps(payload)}\n\n")
+    # The save path serialized the collected dicts once more
+    json.dumps(nodes), json.dumps(edges)
+    return len(frames)
+
+
+def current(chunks: list[str]) -> int:
+    scanner = LineScanner()
+    frames: list[bytes] = []
+    nodes: list[bytes] = []
+    edges: list[bytes] = []
+
+    def emit(line: str) -> None:
+        event = parse_line(line)
+        if event is None:
+            return
+        (nodes if event.type == "concept" else edges).append(event.record)
+        frames.append(event.frame)
+
+    for chunk in chunks:
+        for line in scanner.feed(chunk):
+            emit(line)
+    emit(scanner.flush())
+    json_array(nodes), json_array(edges)
+    return len(frames)
+
+
+def _measure(fn: Callable[[list[str]], int], chunks: list[str], repeat: int) -> tuple[float, float, int]:
+    """Best-of CPU seconds per event, peak traced bytes per event, events emitted."""
+    best = float("inf")
+    events = 0
+    for _ in range(repeat):
+        start = time.process_time()
+        events = fn(chunks)
+        best = min(best, time.process_time() - start)
+    tracemalloc.start()
+    fn(chunks)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best / max(1, events), peak / max(1, events), events
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--chunk", type=int, nargs="+", default=[16, 64], help="chars per streamed chunk")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>7}{'chunk':>7}{'events':>8}{'legacy us/ev':>14}{'new us/ev':>11}{'legacy peak B/ev':>18}{'new peak B/ev':>15}")
+    for n in args.nodes:
+        text = _synthetic_output(n, args.seed)
+        for size in args.chunk:
+            chunks = list(_chunks(text, size))
+            old_cpu, old_mem, old_events = _measure(legacy, chunks, args.repeat)
+            new_cpu, new_mem, new_events = _measure(current, chunks, args.repeat)
+            if old_events != new_events:
+                raise SystemExit(f"event count mismatch: legacy={old_events} new={new_events}")
+            print(
+                f"{n:>7}{size:>7}{new_events:>8}{old_cpu * 1e6:>14.1f}{new_cpu * 1e6:>11.1f}"
+                f"{old_mem:>18.0f}{new_mem:>15.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+"""Benchmark pgvector ANN search: recall@k vs exact search and p50/p99 latency.
+
+Synthetic vectors are generated server-side into bench_vectors_<n> tables (kept between
+runs unless --drop), indexed like resources.embedding, then queried with a sweep of
+hnsw.ef_search / ivfflat.probes values.
+
+Usage (from the backend dir, against a scratch database):
+    python scripts/bench_vector_search.py --sizes 10000 100000 1000000 --index hnsw
+    python scripts/bench_vector_search.py --sizes 100000 --index ivfflat --probes 1 5 10 40
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncConnection  # noqa: E402
+
+from app.core.database import engine  # noqa: E402
+from app.core.vector_index import index_ddl, ivfflat_lists_for  # noqa: E402
+
+INSERT_BATCH = 50_000
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _random_vector(dim: int) -> str:
+    return "[" + ",".join(f"{random.random() - 0.5:.6f}" for _ in range(dim)) + "]"
+
+
+async def _prepare_table(conn: AsyncConnection, table: str, n: int, dim: int) -> None:
+    await conn.execute(text(f"CREATE TABLE IF NOT EXISTS {table} (id bigint PRIMARY KEY, embedding vector({dim}))"))
+    existing = (await conn.execute(text(f"SELECT count(*) FROM {table}"))).scalar_one()
+    if existing == n:
+        print(f"  reusing {table} ({n} rows)")
+        return
+    await conn.execute(text(f"TRUNCATE {table}"))
+    start = time.perf_counter()
+    for lo in range(1, n + 1, INSERT_BATCH):
+        hi = min(n, lo + INSERT_BATCH - 1)
+        # 0 * i makes the inner subquery correlated so each row gets fresh random values
+        await conn.execute(
+            text(
+                f"INSERT INTO {table} (id, embedding) "
+                f"SELECT i, (SELECT array_agg(random() - 0.5 + 0 * i) FROM generate_series(1, {dim}))::vector "
+                f"FROM generate_series(:lo, :hi) AS i"
+            ),
+            {"lo": lo, "hi": hi},
+        )
+    print(f"  generated {n} vectors in {time.perf_counter() - start:.1f}s")
+
+
+async def _build_index(conn: AsyncConnection, table: str, index: str, n: int) -> None:
+    for kind in ("hnsw", "ivfflat"):
+        await conn.execute(text(f"DROP INDEX IF EXISTS {table}_{kind}"))
+    if index == "none":
+        return
+    ddl = index_ddl(index, table=table, name=f"{table}_{index}", lists=ivfflat_lists_for(n))
+    start = time.perf_counter()
+    await conn.execute(text(ddl))
+    await conn.execute(text(f"ANALYZE {table}"))
+    print(f"  {ddl}\n  index built in {time.perf_counter() - start:.1f}s")
+
+
+async def _search(
+    conn: AsyncConnection,
+    table: str,
+    q: str,
+    k: int,
+    settings_sql: str,
+    params: dict,
+) -> tuple[list[int], float]:
+    async with conn.begin():
+        await conn.execute(text(settings_sql), params)
+        start = time.perf_counter()
+        result = await conn.execute(
+            text(f"SELECT id FROM {table} ORDER BY embedding <=> CAST(:q AS vector) LIMIT :k"),
+            {"q": q, "k": k},
+        )
+        ids = [row[0] for row in result]
+        return ids, time.perf_counter() - start
+
+
+async def bench_size(conn: AsyncConnection, args: argparse.Namespace, n: int) -> None:
+    table = f"bench_vectors_{n}"
+    print(f"\n== {n} vectors, dim={args.dim}, index={args.index}")
+    async with conn.begin():
+        await _prepare_table(conn, table, n, args.dim)
+        await _build_index(conn, table, args.index, n)
+
+    queries = [_random_vector(args.dim) for _ in range(args.queries)]
+    exact_ids: list[list[int]] = []
+    exact_lat: list[float] = []
+    for q in queries:
+        # Disabling index scans forces the exact (sequential) plan for ground truth
+        ids, dt = await _search(conn, table, q, args.k, "SET LOCAL enable_indexscan = off", {})
+        exact_ids.append(ids)
+        exact_lat.append(dt)
+    print(f"  {'mode':<22}{'recall@' + str(args.k):>10}{'p50 ms':>10}{'p99 ms':>10}")
+    print(f"  {'exact':<22}{1.0:>10.3f}{_percentile(exact_lat, 0.5) * 1000:>10.2f}{_percentile(exact_lat, 0.99) * 1000:>10.2f}")
+    if args.index == "none":
+        return
+
+    if args.index == "hnsw":
+        sweep = [("ef_search", v, "SELECT set_config('hnsw.ef_search', :v, true)") for v in args.ef_search]
+    else:
+        sweep = [("probes", v, "SELECT set_config('ivfflat.probes', :v, true)") for v in args.probes]
+    for label, value, sql in sweep:
+        recalls: list[float] = []
+        lat: list[float] = []
+        for q, truth in zip(queries, exact_ids):
+            ids, dt = await _search(conn, table, q, args.k, sql, {"v": str(value)})
+            lat.append(dt)
+            recalls.append(len(set(ids) & set(truth)) / max(1, len(truth)))
+        mode = f"{label}={value}"
+        print(
+            f"  {mode:<22}{statistics.mean(recalls):>10.3f}"
+            f"{_percentile(lat, 0.5) * 1000:>10.2f}{_percentile(lat, 0.99) * 1000:>10.2f}"
+        )
+
+
+async def run(args: argparse.Namespace) -> None:
+    random.seed(args.seed)
+    async with engine.connect() as conn:
+        if args.maintenance_work_mem:
+            await conn.execute(
+                text("SELECT set_config('maintenance_work_mem', :v, false)"),
+                {"v": args.maintenance_work_mem},
+            )
+            await conn.commit()
+        for n in args.sizes:
+            await bench_size(conn, args, n)
+            if args.drop:
+                async with conn.begin():
+                    await conn.execute(text(f"DROP TABLE IF EXISTS bench_vectors_{n}"))
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--index", choices=("hnsw", "ivfflat", "none"), default="hnsw")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[10, 20, 40, 80, 160])
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 5, 10, 20, 40])
+    parser.add_argument("--maintenance-work-mem", default="1GB")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--drop", action="store_true", help="drop bench tables afterwards")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
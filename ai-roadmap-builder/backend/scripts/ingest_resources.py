@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""Bulk-load RAG resources from a JSONL or CSV file (title, url, content_summary).
+
+Embeds in batches with bounded concurrency and writes with asyncpg COPY. Existing URLs are
+skipped. Progress is checkpointed next to the input, so rerunning the same command after a
+crash or Ctrl-C resumes where it stopped. Rebuild the vector index afterwards for IVFFlat
+(scripts/vector_index.py --rebuild).
+
+Usage (from the backend dir):
+    python scripts/ingest_resources.py data/resources.jsonl
+    python scripts/ingest_resources.py data/resources.csv --batch-size 1000 --concurrency 8
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings  # noqa: E402
+from app.services.ingest import FORMATS, IngestStats, ingest_file  # noqa: E402
+
+
+async def _report(stats: IngestStats, every: float) -> None:
+    while True:
+        await asyncio.sleep(every)
+        d = stats.as_dict()
+        print(
+            f"  read={d['read']} inserted={d['inserted']} duplicates={d['duplicates']} "
+            f"invalid={d['invalid']} ({d['rows_per_second']} rows/s)",
+            flush=True,
+        )
+
+
+async def run(args: argparse.Namespace) -> None:
+    fmt = args.format or Path(args.path).suffix.lstrip(".").lower()
+    if fmt == "ndjson":
+        fmt = "jsonl"
+    checkpoint = None if args.no_checkpoint else (args.checkpoint or f"{args.path}.checkpoint.json")
+    stats = IngestStats()
+    reporter = asyncio.create_task(_report(stats, args.progress_every))
+    try:
+        await ingest_file(
+            args.path,
+            fmt,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            checkpoint_path=checkpoint,
+            stats=stats,
+        )
+    finally:
+        reporter.cancel()
+    print(stats.as_dict())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, default=None, help="default: from file extension")
+    parser.add_argument("--batch-size", type=int, default=settings.ingest_batch_size)
+    parser.add_argument("--concurrency", type=int, default=settings.ingest_concurrency)
+    parser.add_argument("--checkpoint", default=None, help="default: <path>.checkpoint.json")
+    parser.add_argument("--no-checkpoint", action="store_true")
+    parser.add_argument("--progress-every", type=float, default=5.0, help="seconds between progress lines")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
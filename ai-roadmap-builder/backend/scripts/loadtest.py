@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+"""Load-test a running backend: /generate (SSE), /roadmaps and /auth/login with N concurrent clients.
+
+Reports throughput, time to first SSE event / first node and p50/p95/p99 latency per
+scenario. Run the server with LLM_PROVIDER=replay to benchmark without calling Gemini
+(REPLAY_TOKENS_PER_SECOND sets the simulated model speed). Tokens are minted locally with
+AUTH_SECRET, one per simulated user, the same way the frontend's NextAuth tokens are signed.
+Admission control applies as in production: raise the ADMISSION_* rate limits on the server
+to measure raw capacity rather than 429s.
+
+Usage (from the backend dir, server on :8000):
+    LLM_PROVIDER=replay uvicorn main:app --port 8000 &
+    python scripts/loadtest.py --clients 50 --duration 30 --scenario mixed
+    python scripts/loadtest.py --clients 20 --requests 200 --scenario generate --distinct-queries 10
+    python scripts/loadtest.py --scenario roadmaps --clients 100 --duration 20 --json results.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import httpx
+from jose import jwt
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings  # noqa: E402
+
+SCENARIOS = ("generate", "roadmaps", "login", "mixed")
+# Share of each scenario in "mixed" (roughly a browsing user: lists far outnumber generations)
+MIX = {"roadmaps": 0.7, "generate": 0.2, "login": 0.1}
+TOPICS = (
+    "Rust", "Kubernetes", "Linear algebra", "React", "PostgreSQL internals", "Distributed systems",
+    "Machine learning", "Go concurrency", "TypeScript", "Compilers", "Computer networks", "Docker",
+)
+
+
+@dataclass
+class Sample:
+    scenario: str
+    status: int
+    latency: float
+    first_event: float | None = None
+    first_node: float | None = None
+    events: int = 0
+    error: str | None = None
+
+
+@dataclass
+class Report:
+    scenario: str
+    requests: int
+    ok: int
+    throughput_rps: float
+    status_counts: dict[str, int] = field(default_factory=dict)
+    latency_ms: dict[str, float] = field(default_factory=dict)
+    first_event_ms: dict[str, float] = field(default_factory=dict)
+    first_node_ms: dict[str, float] = field(default_factory=dict)
+    events_per_request: float = 0.0
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _summary(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {}
+    return {
+        "p50": round(_percentile(values, 0.5) * 1000, 1),
+        "p95": round(_percentile(values, 0.95) * 1000, 1),
+        "p99": round(_percentile(values, 0.99) * 1000, 1),
+        "mean": round(statistics.mean(values) * 1000, 1),
+    }
+
+
+def _mint_token(email: str) -> str:
+    now = int(time.time())
+    payload = {"sub": email, "email": email, "iat": now, "exp": now + 24 * 3600}
+    return jwt.encode(payload, settings.auth_secret, algorithm=settings.jwt_algorithm)
+
+
+async def _generate(client: httpx.AsyncClient, token: str | None, query: str) -> Sample:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    start = time.perf_counter()
+    sample = Sample("generate", 0, 0.0)
+    async with client.stream("POST", "/api/generate", json={"query": query}, headers=headers) as resp:
+        sample.status = resp.status_code
+        if resp.status_code != 200:
+            await resp.aread()
+        else:
+            async for line in resp.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                now = time.perf_counter() - start
+                if sample.first_event is None:
+                    sample.first_event = now
+                event = json.loads(line[5:])
+                kind = event.get("type")
+                if kind == "concept" and sample.first_node is None:
+                    sample.first_node = now
+                elif kind == "error":
+                    sample.error = event.get("message", "error")
+                if kind in ("concept", "edge"):
+                    sample.events += 1
+    sample.latency = time.perf_counter() - start
+    return sample
+
+
+async def _roadmaps(client: httpx.AsyncClient, token: str | None, _: str) -> Sample:
+    start = time.perf_counter()
+    resp = await client.get("/api/roadmaps", headers={"Authorization": f"Bearer {token}"})
+    return Sample("roadmaps", resp.status_code, time.perf_counter() - start)
+
+
+async def _login(client: httpx.AsyncClient, token: str | None, email: str) -> Sample:
+    start = time.perf_counter()
+    resp = await client.post("/api/auth/login", json={"email": email})
+    return Sample("login", resp.status_code, time.perf_counter() - start)
+
+
+async def run(args: argparse.Namespace) -> list[Report]:
+    rnd = random.Random(args.seed)
+    users = [f"loadtest-{i}@example.com" for i in range(args.users)]
+    tokens = [_mint_token(u) for u in users]
+    queries = [f"{TOPICS[i % len(TOPICS)]} (variant {i})" for i in range(args.distinct_queries)]
+    counter = itertools.count()
+    samples: list[Sample] = []
+    deadline = time.perf_counter() + args.duration if args.duration else None
+
+    def next_scenario() -> str:
+        if args.scenario != "mixed":
+            return args.scenario
+        return rnd.choices(list(MIX), weights=list(MIX.values()))[0]
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        while True:
+            n = next(counter)
+            if deadline is None and n >= args.requests:
+                return
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            scenario = next_scenario()
+            user = n % len(users)
+            anonymous = scenario == "generate" and rnd.random() < args.anonymous_share
+            token = None if anonymous else tokens[user]
+            if scenario == "generate":
+                call, arg = _generate, (queries[n % len(queries)] if queries else f"{TOPICS[n % len(TOPICS)]} #{n}")
+            elif scenario == "roadmaps":
+                call, arg = _roadmaps, ""
+            else:
+                call, arg = _login, users[user]
+            start = time.perf_counter()
+            try:
+                samples.append(await call(client, token, arg))
+            except httpx.HTTPError as e:
+                samples.append(Sample(scenario, 0, time.perf_counter() - start, error=type(e).__name__))
+
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    timeout = httpx.Timeout(args.timeout)
+    started = time.perf_counter()
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=timeout) as client:
+        await asyncio.gather(*(worker(client) for _ in range(args.clients)))
+    elapsed = time.perf_counter() - started
+
+    reports = []
+    for scenario in sorted({s.scenario for s in samples}):
+        group = [s for s in samples if s.scenario == scenario]
+        ok = [s for s in group if 200 <= s.status < 300 and s.error is None]
+        statuses: dict[str, int] = {}
+        for s in group:
+            key = str(s.status) if s.error is None else f"{s.status}:{s.error[:40]}"
+            statuses[key] = statuses.get(key, 0) + 1
+        reports.append(Report(
+            scenario=scenario,
+            requests=len(group),
+            ok=len(ok),
+            throughput_rps=round(len(ok) / elapsed, 2) if elapsed > 0 else 0.0,
+            status_counts=statuses,
+            latency_ms=_summary([s.latency for s in ok]),
+            first_event_ms=_summary([s.first_event for s in ok if s.first_event is not None]),
+            first_node_ms=_summary([s.first_node for s in ok if s.first_node is not None]),
+            events_per_request=round(statistics.mean(s.events for s in ok), 1) if ok and scenario == "generate" else 0.0,
+        ))
+    return reports
+
+
+def _print(reports: list[Report]) -> None:
+    def fmt(d: dict[str, float]) -> str:
+        return f"{d['p50']:>8}{d['p95']:>8}{d['p99']:>8}" if d else f"{'-':>8}{'-':>8}{'-':>8}"
+
+    print(f"{'scenario':<10}{'reqs':>7}{'ok':>7}{'rps':>8}   latency ms p50/p95/p99   first event ms p50/p95/p99")
+    for r in reports:
+        print(f"{r.scenario:<10}{r.requests:>7}{r.ok:>7}{r.throughput_rps:>8}   {fmt(r.latency_ms)}   {fmt(r.first_event_ms)}")
+    for r in reports:
+        if r.first_node_ms:
+            print(f"{r.scenario}: first node ms {r.first_node_ms}, events/request {r.events_per_request}")
+        print(f"{r.scenario}: statuses {r.status_counts}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--scenario", choices=SCENARIOS, default="mixed")
+    parser.add_argument("--clients", type=int, default=10, help="concurrent clients")
+    parser.add_argument("--requests", type=int, default=100, help="total requests (ignored with --duration)")
+    parser.add_argument("--duration", type=float, default=0.0, help="run for this many seconds instead")
+    parser.add_argument("--users", type=int, default=20, help="distinct simulated users (tokens)")
+    parser.add_argument("--anonymous-share", type=float, default=0.2, help="fraction of /generate without auth")
+    parser.add_argument(
+        "--distinct-queries", type=int, default=0,
+        help="cycle this many /generate topics (exercises caches/single-flight); 0 = every query unique",
+    )
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="also write the reports to this file")
+    args = parser.parse_args()
+
+    reports = asyncio.run(run(args))
+    _print(reports)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps([asdict(r) for r in reports], indent=2))
+
+
+if __name__ == "__main__":
+    main()
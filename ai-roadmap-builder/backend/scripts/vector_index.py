@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""Create, switch or rebuild the ANN index on resources.embedding.
+
+init_db creates the configured index if missing; use this after bulk loads (IVFFlat lists
+depend on row count) or to switch index types without downtime (builds CONCURRENTLY).
+
+Usage (from the backend dir):
+    python scripts/vector_index.py --type hnsw
+    python scripts/vector_index.py --type ivfflat --rebuild --maintenance-work-mem 2GB
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import text  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import engine  # noqa: E402
+from app.core.vector_index import (  # noqa: E402
+    INDEX_TYPES,
+    RESOURCE_INDEX_NAMES,
+    index_ddl,
+    ivfflat_lists_for,
+)
+
+
+async def run(index_type: str, rebuild: bool, lists: int, work_mem: str | None) -> None:
+    async with engine.connect() as conn:
+        # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        if work_mem:
+            await conn.execute(text("SELECT set_config('maintenance_work_mem', :v, false)"), {"v": work_mem})
+        rows = (await conn.execute(text("SELECT count(*) FROM resources"))).scalar_one()
+        print(f"resources: {rows} rows")
+
+        if index_type != "none":
+            name = RESOURCE_INDEX_NAMES[index_type]
+            if rebuild:
+                # Build under a temporary name first so searches keep an index throughout
+                tmp = f"{name}_new"
+                await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {tmp}"))
+                ddl = index_ddl(
+                    index_type,
+                    name=tmp,
+                    lists=lists or settings.resource_ivfflat_lists or ivfflat_lists_for(rows),
+                    concurrently=True,
+                )
+                print(ddl)
+                start = time.perf_counter()
+                await conn.execute(text(ddl))
+                await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+                await conn.execute(text(f"ALTER INDEX {tmp} RENAME TO {name}"))
+            else:
+                ddl = index_ddl(
+                    index_type,
+                    lists=lists or settings.resource_ivfflat_lists or ivfflat_lists_for(rows),
+                    concurrently=True,
+                )
+                print(ddl)
+                start = time.perf_counter()
+                await conn.execute(text(ddl))
+            print(f"built in {time.perf_counter() - start:.1f}s")
+
+        for other, other_name in RESOURCE_INDEX_NAMES.items():
+            if other != index_type:
+                await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {other_name}"))
+        await conn.execute(text("ANALYZE resources"))
+
+        sizes = await conn.execute(
+            text(
+                "SELECT indexname, pg_size_pretty(pg_relation_size(indexname::regclass)) "
+                "FROM pg_indexes WHERE tablename = 'resources'"
+            )
+        )
+        for name, size in sizes:
+            print(f"  {name}: {size}")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--type", choices=INDEX_TYPES, default=settings.resource_index_type)
+    parser.add_argument("--rebuild", action="store_true", help="rebuild even if the index exists")
+    parser.add_argument("--lists", type=int, default=0, help="IVFFlat lists (default: from row count)")
+    parser.add_argument("--maintenance-work-mem", default=None, help="e.g. 2GB; speeds up index builds")
+    args = parser.parse_args()
+    asyncio.run(run(args.type, args.rebuild, args.lists, args.maintenance_work_mem))
+
+
+if __name__ == "__main__":
+    main()
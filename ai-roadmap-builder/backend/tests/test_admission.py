@@ -0,0 +1,184 @@
+# Admission control for /generate: concurrency slots, queue positions, rejections and the 429 path
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.core.database import get_db
+from app.services.admission import AdmissionController, AdmissionRejected
+from main import app
+
+
+def _controller(
+    max_concurrent: int = 1,
+    max_per_user: int = 1,
+    queue_size: int = 10,
+    rate: float = 0,
+    burst: float = 100,
+    user_rate: float = 0,
+    user_burst: float = 100,
+    anon_rate: float = 0,
+    anon_burst: float = 100,
+) -> AdmissionController:
+    return AdmissionController(
+        max_concurrent, max_per_user, queue_size, rate, burst, user_rate, user_burst, anon_rate, anon_burst
+    )
+
+
+def test_admits_up_to_capacity_then_queues():
+    admission = _controller(max_concurrent=2, max_per_user=2)
+    first = admission.reserve("user:a", authenticated=True)
+    second = admission.reserve("user:b", authenticated=True)
+    third = admission.reserve("user:c", authenticated=True)
+    assert first.admitted and second.admitted and not third.admitted
+    assert admission.position(first) == 0
+    assert admission.position(third) == 1
+
+    admission.release(first)
+    assert third.admitted
+    assert admission.position(third) == 0
+
+
+def test_authenticated_requests_queue_ahead_of_anonymous():
+    admission = _controller()
+    admission.reserve("user:a", authenticated=True)
+    anon = admission.reserve("ip:1", authenticated=False)
+    user = admission.reserve("user:b", authenticated=True)
+    assert admission.position(user) == 1
+    assert admission.position(anon) == 2
+
+
+def test_per_user_limit_does_not_block_others():
+    admission = _controller(max_concurrent=2, max_per_user=1)
+    admission.reserve("user:a", authenticated=True)
+    same_user = admission.reserve("user:a", authenticated=True)
+    other = admission.reserve("user:b", authenticated=True)
+    assert not same_user.admitted
+    assert other.admitted
+
+
+def test_rejects_when_queue_is_full():
+    admission = _controller(queue_size=1)
+    admission.reserve("user:a", authenticated=True)
+    admission.reserve("user:b", authenticated=True)
+    with pytest.raises(AdmissionRejected) as rejected:
+        admission.reserve("user:c", authenticated=True)
+    assert rejected.value.retry_after >= 1
+
+
+def test_rejects_when_rate_limited():
+    admission = _controller(max_concurrent=5, max_per_user=5, user_rate=0.5, user_burst=1)
+    admission.reserve("user:a", authenticated=True)
+    with pytest.raises(AdmissionRejected) as rejected:
+        admission.reserve("user:a", authenticated=True)
+    assert rejected.value.reason == "Rate limit exceeded"
+    assert rejected.value.retry_after == 2
+
+
+def test_release_of_a_queued_ticket_moves_the_ones_behind():
+    admission = _controller()
+    admission.reserve("user:a", authenticated=True)
+    second = admission.reserve("user:b", authenticated=True)
+    third = admission.reserve("user:c", authenticated=True)
+    admission.release(second)
+    admission.release(second)  # idempotent
+    assert admission.position(third) == 1
+
+
+def test_admission_between_reports_is_not_lost():
+    async def run() -> int:
+        admission = _controller(1, 1, 10, 0, 1, 0, 1, 0, 1)
+        first = admission.reserve("user:a", authenticated=True)
+        second = admission.reserve("user:b", authenticated=True)
+        reported = admission.position(second)
+        assert reported == 1
+        # The slot frees while the stream is still yielding its "queue" frame
+        admission.release(first)
+        return await asyncio.wait_for(admission.next_position(second, reported), timeout=1)
+
+    assert asyncio.run(run()) == 0
+
+
+def test_next_position_waits_for_a_change():
+    async def run() -> list[int]:
+        admission = _controller()
+        first = admission.reserve("user:a", authenticated=True)
+        second = admission.reserve("user:b", authenticated=True)
+        third = admission.reserve("user:c", authenticated=True)
+        moved = asyncio.ensure_future(admission.next_position(third, 2))
+        await asyncio.sleep(0)
+        assert not moved.done()
+        admission.release(second)
+        positions = [await asyncio.wait_for(moved, timeout=1)]
+        admission.release(first)
+        positions.append(await asyncio.wait_for(admission.next_position(third, 1), timeout=1))
+        return positions
+
+    assert asyncio.run(run()) == [1, 0]
+
+
+class _Session:
+    async def close(self) -> None:
+        pass
+
+    async def commit(self) -> None:
+        pass
+
+    async def rollback(self) -> None:
+        pass
+
+
+async def _no_db():
+    yield _Session()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(routes, "admission", _controller(queue_size=0))
+    app.dependency_overrides[get_db] = _no_db
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_db, None)
+
+
+def test_generate_returns_429_with_retry_after(client):
+    routes.admission.reserve("ip:other", authenticated=False)
+    response = client.post("/api/generate", json={"query": "learn rust"})
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+
+
+class _RecordingAdmission(AdmissionController):
+    """Rejects every request, recording the admission key it was asked for."""
+
+    def __init__(self) -> None:
+        super().__init__(1, 1, 0, 0, 1, 0, 1, 0, 1)
+        self.keys: list[str] = []
+
+    def reserve(self, key: str, authenticated: bool):
+        self.keys.append(key)
+        raise AdmissionRejected("Rate limit exceeded", 1)
+
+
+@pytest.fixture
+def recording(monkeypatch):
+    recorder = _RecordingAdmission()
+    monkeypatch.setattr(routes, "admission", recorder)
+    app.dependency_overrides[get_db] = _no_db
+    yield recorder
+    app.dependency_overrides.pop(get_db, None)
+
+
+def test_forwarded_clients_get_separate_admission_keys(recording):
+    # The default FORWARDED_ALLOW_IPS trusts 127.0.0.1, where the reverse proxy would be
+    proxy = TestClient(app, client=("127.0.0.1", 50000))
+    for ip in ("203.0.113.1", "203.0.113.2"):
+        response = proxy.post("/api/generate", json={"query": "learn rust"}, headers={"X-Forwarded-For": ip})
+        assert response.status_code == 429
+    assert recording.keys == ["ip:203.0.113.1", "ip:203.0.113.2"]
+
+
+def test_forwarded_for_from_untrusted_hosts_is_ignored(recording):
+    direct = TestClient(app, client=("198.51.100.7", 50000))
+    direct.post("/api/generate", json={"query": "learn rust"}, headers={"X-Forwarded-For": "203.0.113.1"})
+    assert recording.keys == ["ip:198.51.100.7"]
@@ -0,0 +1,16 @@
+# Connection pool instrumentation
+from app.core.database import InstrumentedQueuePool
+
+
+def _pool() -> InstrumentedQueuePool:
+    return InstrumentedQueuePool(lambda: None, pool_size=1, max_overflow=0, timeout=0.01)
+
+
+def test_pool_counters_are_per_instance():
+    first, second = _pool(), _pool()
+    first.timeouts += 1
+    first.waiters += 2
+    assert (second.waiters, second.timeouts) == (0, 0)
+    recreated = first.recreate()
+    assert isinstance(recreated, InstrumentedQueuePool)
+    assert (recreated.waiters, recreated.timeouts) == (0, 0)
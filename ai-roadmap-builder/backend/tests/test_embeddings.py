@@ -0,0 +1,20 @@
+# Provider embedders: requests stay within the provider's per-call limits
+import asyncio
+
+from app.services.embeddings import gemini
+
+
+def test_gemini_splits_large_batches(monkeypatch):
+    calls: list[int] = []
+
+    async def embed_content_async(model, content, task_type):
+        calls.append(len(content))
+        return {"embedding": [[float(len(text))] for text in content]}
+
+    monkeypatch.setattr(gemini.genai, "embed_content_async", embed_content_async)
+    embedder = gemini.GeminiEmbeddingService(api_key="test")
+    texts = ["x" * (i % 7) for i in range(250)]
+    vectors = asyncio.run(embedder.embed_batch(texts, kind="document"))
+    assert calls == [100, 100, 50]
+    assert vectors == [[float(len(t))] for t in texts]
+    assert asyncio.run(embedder.embed_batch([])) == []
@@ -0,0 +1,101 @@
+# /generate must not keep a pooled DB connection checked out while the LLM streams
+import asyncio
+
+import pytest
+
+from app.services import orchestrator
+from app.services.llm import BaseLLMService
+from app.services.sse import StreamEvent
+
+
+class _Session:
+    """Stands in for AsyncSession: a connection is checked out from the first execute until close."""
+
+    def __init__(self, sessions: list["_Session"]) -> None:
+        self.checked_out = False
+        sessions.append(self)
+
+    async def execute(self, *args, **kwargs) -> None:
+        self.checked_out = True
+
+    async def close(self) -> None:
+        self.checked_out = False
+
+    async def __aenter__(self) -> "_Session":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+
+class _LLM(BaseLLMService):
+    model_name = "fake"
+
+    def __init__(self, checkouts: list[int], sessions: list[_Session]) -> None:
+        self._checkouts = checkouts
+        self._sessions = sessions
+
+    async def generate_stream(self, system_prompt: str, user_content: str):
+        for line in (
+            '{"id": "a", "type": "concept", "data": {"label": "A"}}\n',
+            '{"id": "b", "type": "concept", "data": {"label": "B"}}\n',
+            '{"id": "e", "source": "a", "target": "b"}\n',
+        ):
+            await asyncio.sleep(0)
+            self._checkouts.append(sum(s.checked_out for s in self._sessions))
+            yield line
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    sessions: list[_Session] = []
+    checkouts: list[int] = []  # connections checked out at each point that should hold none
+
+    async def lookup(db, *args):
+        await db.execute()
+        return None
+
+    async def embed(intent):
+        checkouts.append(sum(s.checked_out for s in sessions))
+        return [0.1], "fake-embedding"
+
+    async def store(*args):
+        checkouts.append(sum(s.checked_out for s in sessions))
+
+    monkeypatch.setattr(orchestrator, "async_session_factory", lambda: _Session(sessions))
+    monkeypatch.setattr(orchestrator, "get_llm_service", lambda: _LLM(checkouts, sessions))
+    monkeypatch.setattr(orchestrator, "get_cached_events", lookup)
+    monkeypatch.setattr(orchestrator, "find_similar", lookup)
+    monkeypatch.setattr(orchestrator, "_gather_resources", lambda db, embedding: lookup(db))
+    monkeypatch.setattr(orchestrator, "_embed_intent", embed)
+    monkeypatch.setattr(orchestrator, "store_events", store)
+    monkeypatch.setattr(orchestrator, "store_similar", store)
+    return sessions, checkouts, monkeypatch
+
+
+def _run(query: str) -> list[StreamEvent]:
+    async def collect() -> list[StreamEvent]:
+        return [event async for event in orchestrator.stream_roadmap(query)]
+
+    return asyncio.run(collect())
+
+
+def test_no_connection_checked_out_while_the_llm_streams(pipeline):
+    sessions, checkouts, _ = pipeline
+    events = _run("learn rust")
+    assert [e.id for e in events] == ["a", "b", "e"]
+    assert sessions and checkouts
+    assert checkouts == [0] * len(checkouts)
+
+
+def test_no_connection_checked_out_while_replaying_a_similar_generation(pipeline):
+    sessions, checkouts, monkeypatch = pipeline
+    replayed = [StreamEvent.from_payload({"type": "concept", "id": "a", "data": {"label": "A"}})]
+
+    async def similar(db, *args):
+        await db.execute()
+        return replayed
+
+    monkeypatch.setattr(orchestrator, "find_similar", similar)
+    assert _run("learn go") == replayed
+    assert checkouts == [0, 0]  # embedding, then storing under the exact key
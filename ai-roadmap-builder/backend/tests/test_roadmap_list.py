@@ -0,0 +1,89 @@
+# GET /roadmaps: one query per page, with an ETag derived from the page's rows
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_current_user_id
+from app.core.database import get_db
+from main import app
+
+_USER = uuid.uuid4()
+_NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class _Result:
+    def __init__(self, rows: list) -> None:
+        self._rows = rows
+
+    def all(self) -> list:
+        return self._rows
+
+
+class _Session:
+    """Serves the list query from `rows` and counts the statements executed."""
+
+    def __init__(self) -> None:
+        self.rows = [
+            SimpleNamespace(id=uuid.uuid4(), title=f"Roadmap {i}", created_at=_NOW - timedelta(days=i), updated_at=_NOW)
+            for i in range(3)
+        ]
+        self.statements = 0
+
+    async def execute(self, stmt, *args, **kwargs) -> _Result:
+        self.statements += 1
+        return _Result(list(self.rows))
+
+    async def scalar(self, stmt, *args, **kwargs) -> int:
+        self.statements += 1
+        return len(self.rows)
+
+    async def commit(self) -> None:
+        pass
+
+    async def rollback(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def session():
+    db = _Session()
+
+    async def override():
+        yield db
+
+    app.dependency_overrides[get_db] = override
+    app.dependency_overrides[get_current_user_id] = lambda: _USER
+    yield db
+    app.dependency_overrides.pop(get_db, None)
+    app.dependency_overrides.pop(get_current_user_id, None)
+
+
+def test_plain_list_runs_one_query(session):
+    response = TestClient(app).get("/api/roadmaps")
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    assert response.headers["etag"]
+    assert session.statements == 1
+
+
+def test_matching_etag_gets_304_until_a_row_changes(session):
+    client = TestClient(app)
+    etag = client.get("/api/roadmaps").headers["etag"]
+    assert client.get("/api/roadmaps", headers={"If-None-Match": etag}).status_code == 304
+
+    session.rows[1].updated_at = _NOW + timedelta(seconds=1)
+    assert client.get("/api/roadmaps", headers={"If-None-Match": etag}).status_code == 200
+    session.rows.pop()
+    assert client.get("/api/roadmaps", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_total_is_counted_only_when_asked(session):
+    response = TestClient(app).get("/api/roadmaps", params={"include_total": "true"})
+    assert response.headers["x-total-count"] == "3"
+    assert session.statements == 2
@@ -0,0 +1,23 @@
+# Sign codes used to shortlist roadmaps before the exact vector re-rank
+import random
+
+from app.models.resource import EMBEDDING_DIM
+from app.services.roadmap_search import embedding_bits
+
+
+def _hamming(a: str, b: str) -> int:
+    return sum(x != y for x, y in zip(a, b))
+
+
+def test_embedding_bits_is_one_sign_bit_per_dimension():
+    assert embedding_bits([0.5, -0.1, 0.0, 2.0]) == "1001"
+    assert len(embedding_bits([0.1] * EMBEDDING_DIM)) == EMBEDDING_DIM
+
+
+def test_hamming_distance_of_codes_tracks_vector_similarity():
+    rnd = random.Random(0)
+    center = [rnd.gauss(0, 1) for _ in range(EMBEDDING_DIM)]
+    near = [c + rnd.gauss(0, 0.3) for c in center]
+    far = [rnd.gauss(0, 1) for _ in range(EMBEDDING_DIM)]
+    code = embedding_bits(center)
+    assert _hamming(code, embedding_bits(near)) < _hamming(code, embedding_bits(far)) / 2
@@ -29,10 +29,6 @@ function getLayoutedElements(
   roadmapNodes: RoadmapNode[],
   roadmapEdges: RoadmapEdge[]
 ): { nodes: Node[]; edges: Edge[] } {
-  const g = new dagre.graphlib.Graph()
-  g.setDefaultEdgeLabel(() => ({}))
-  g.setGraph({ rankdir: "TB", nodesep: 80, ranksep: 100 })
-
   const nodes: Node[] = roadmapNodes.map((n) => ({
     id: n.id,
     type: "roadmapNode",
@@ -47,6 +43,15 @@ function getLayoutedElements(
     pathOptions: { borderRadius: 24 },
   }))
 
+  // Streamed roadmaps are laid out by the server; only fall back to dagre for the rest
+  if (roadmapNodes.length > 0 && roadmapNodes.every((n) => n.laidOut)) {
+    return { nodes, edges }
+  }
+
+  const g = new dagre.graphlib.Graph()
+  g.setDefaultEdgeLabel(() => ({}))
+  g.setGraph({ rankdir: "TB", nodesep: 80, ranksep: 100 })
+
   nodes.forEach((node) => g.setNode(node.id, { width: NODE_WIDTH, height: NODE_HEIGHT }))
   edges.forEach((edge) => g.setEdge(edge.source, edge.target))
 
@@ -3,7 +3,7 @@
 import { useCallback } from "react";
 import { fetchEventSource } from "@microsoft/fetch-event-source";
 import { useRoadmapStore } from "@/store/roadmapStore";
-import type { RoadmapNode } from "@/types";
+import type { NodePositionUpdate, RoadmapNode } from "@/types";
 
 const getApiBaseUrl = (): string => {
   if (typeof window !== "undefined") {
@@ -12,9 +12,16 @@ const getApiBaseUrl = (): string => {
   return process.env.NEXT_PUBLIC_API_URL ?? "http://localhost:8000";
 };
 
+// Thrown for HTTP errors (429, 410, ...) so they are not retried like dropped connections
+class FatalStreamError extends Error {}
+
+// Reconnects after a dropped connection; the server replays what was missed since Last-Event-ID
+const MAX_RECONNECTS = 3;
+
 export function useRoadmapStream() {
   const addNode = useRoadmapStore((s) => s.addNode);
   const addEdge = useRoadmapStore((s) => s.addEdge);
+  const setNodePositions = useRoadmapStore((s) => s.setNodePositions);
   const setGenerating = useRoadmapStore((s) => s.setGenerating);
   const setShowCanvasView = useRoadmapStore((s) => s.setShowCanvasView);
   const resetRoadmap = useRoadmapStore((s) => s.resetRoadmap);
@@ -36,6 +43,10 @@ export function useRoadmapStream() {
       // @ts-ignore
       const token = session?.accessToken
 
+      let reconnects = 0;
+      // Set once the server has numbered an event; only then can a retry resume instead of
+      // re-POSTing a brand-new generation (second LLM call, second admission slot)
+      let lastEventId = "";
       try {
         await fetchEventSource(url, {
           method: "POST",
@@ -45,7 +56,18 @@ export function useRoadmapStream() {
             ...(token && { "Authorization": `Bearer ${token}` }),
           },
           body: JSON.stringify({ query }),
+          async onopen(res) {
+            const contentType = res.headers.get("content-type") ?? "";
+            if (res.ok && contentType.startsWith("text/event-stream")) {
+              reconnects = 0;
+              return;
+            }
+            throw new FatalStreamError(`${res.status} ${await res.text()}`);
+          },
           onmessage(ev) {
+            if (ev.id) {
+              lastEventId = ev.id;
+            }
             try {
               const parsedData = JSON.parse(ev.data) as Record<string, unknown>;
 
@@ -64,6 +86,9 @@ export function useRoadmapStream() {
               if (parsedData.type === "edge") {
                 addEdge(parsedData as Parameters<typeof addEdge>[0]);
               }
+              if (parsedData.type === "position") {
+                setNodePositions(parsedData.nodes as NodePositionUpdate[]);
+              }
             } catch {
               // Ignore malformed chunks
             }
@@ -72,6 +97,10 @@ export function useRoadmapStream() {
             setGenerating(false);
           },
           onerror(err) {
+            if (!(err instanceof FatalStreamError) && lastEventId && reconnects < MAX_RECONNECTS) {
+              reconnects += 1;
+              return 1000 * reconnects;
+            }
             setGenerating(false);
             const msg = err?.message ?? String(err);
             if (msg.includes("429") || msg.toLowerCase().includes("rate limit")) {
@@ -87,6 +116,7 @@ export function useRoadmapStream() {
     [
       addNode,
       addEdge,
+      setNodePositions,
       resetRoadmap,
       setGenerating,
       setShowCanvasView,
@@ -1,6 +1,6 @@
 import { create } from "zustand";
 import { persist } from "zustand/middleware";
-import type { RoadmapNode, RoadmapEdge } from "@/types";
+import type { NodePositionUpdate, RoadmapNode, RoadmapEdge } from "@/types";
 
 const STORAGE_KEY = "roadmap-store";
 
@@ -15,6 +15,8 @@ type RoadmapState = {
   currentRoadmapId: string | null;
   addNode: (node: RoadmapNode) => void;
   addEdge: (edge: RoadmapEdge) => void;
+  /** Apply server layout updates ("position" events); marks the nodes as laid out */
+  setNodePositions: (updates: NodePositionUpdate[]) => void;
   setGenerating: (status: boolean) => void;
   setShowCanvasView: (show: boolean) => void;
   setSelectedNode: (node: RoadmapNode | null) => void;
@@ -47,6 +49,17 @@ export const useRoadmapStore = create<RoadmapState>()(
           return { edges: [...state.edges, edge] };
         }),
 
+      setNodePositions: (updates) =>
+        set((state) => {
+          const byId = new Map(updates.map((u) => [u.id, u.position]));
+          return {
+            nodes: state.nodes.map((n) => {
+              const position = byId.get(n.id);
+              return position ? { ...n, position, laidOut: true } : n;
+            }),
+          };
+        }),
+
       setGenerating: (status) => set({ isGenerating: status }),
 
       setShowCanvasView: (show) => set({ showCanvasView: show }),
@@ -14,10 +14,18 @@ export interface RoadmapNode {
   /** Display label (may be at top level or inside data) */
   label: string;
   position?: { x: number; y: number };
+  /** True once the server's layout has positioned this node */
+  laidOut?: boolean;
   data?: RoadmapNodeData;
   [key: string]: unknown;
 }
 
+/** One entry of a streamed "position" event (server-side layout) */
+export interface NodePositionUpdate {
+  id: string;
+  position: { x: number; y: number };
+}
+
 /** Edge between two roadmap nodes (source -> target) */
 export interface RoadmapEdge {
   id: string;